@@ -1,86 +1,173 @@
 import os
 import pkgutil
+import inspect
+import signal
+import asyncio
 import importlib
-from app.commands import CommandHandler, Command ,CommandHistoryManager
+from app.commands import CommandHandler, Command ,CommandHistoryManager, Singleton, current_history
 from app.plugins.menu import MenuCommand
+from app.reloader import PluginReloader
+from app.jobs import JobManager
+from app.pipeline import Pipeline
+from app.snapshot import save_snapshot, load_snapshot
+from app.cancellation import CommandCancelled, cancel_scope, command_token
+from app.settings import get_settings
+from app.output import echo, prompt, flushes
+from app.logger import get_logger, configure_levels, JsonFormatter, RotatingLogHandler, LOG_FILES, TEXT_FORMAT
 import logging
-from dotenv import load_dotenv
-from dotenv import find_dotenv
+import pandas as pd
+
+log = get_logger(None)
 
 class App:
     def __init__(self):  
         os.makedirs('logs', exist_ok=True)  # Ensure the logs directory exists
         self.configure_logging()
-        load_dotenv(override=True)
         self.settings = self.load_environment_variables()
-        self.settings.setdefault('ENVIRONMENT', 'DEVELOPMENT')
         self.command_handler = CommandHandler()
+        self.reloader = None
+        self.quiet = self.settings.quiet  # Suppress menus for piped or scripted sessions
+        self.__menu = (None, '')
         
     def load_environment_variables(self):
-         settings = {key: value for key, value in os.environ.items()}
-         logging.info("Environment variables loaded.")
-         environment = settings.get('ENVIRONMENT', None)
-         logging.info(f"ENVIRONMENT variable is set to: '{environment}'")
+         # Parsed once per process and shared; rebuilt when .env is edited or on reload_settings()
+         settings = get_settings()
+         log.info("Environment variables loaded.")
+         environment = settings.environment
+         log.info("ENVIRONMENT variable is set to: '%s'", environment)
          if(environment == "PRODUCTION"):
-             logging.info("PRODUCTION ENVIRONMENT")
+             log.info("PRODUCTION ENVIRONMENT")
          elif(environment == "TESTING"):
-             logging.info("TESTING ENVIRONMENT")
+             log.info("TESTING ENVIRONMENT")
          elif(environment == "DEVELOPMENT"):
-             logging.info("DEVELOPMENT ENVIRONMENT")
-             logging.info(f"DB_HOST: {settings.get('DB_HOST', None)}")
-             logging.info(f"DB_USER: {settings.get('DB_USER', None)}")
+             log.info("DEVELOPMENT ENVIRONMENT")
+             log.info("DB_HOST: %s", settings.db_host)
+             log.info("DB_USER: %s", settings.db_user)
          return settings
 
     def get_environment_variable(self, env_var: str = 'ENVIRONMENT'):
-         return self.settings.get(env_var, None)
+         # Typed settings take precedence; anything else is looked up in the raw environment
+         name = env_var.lower()
+         if hasattr(self.settings, name):
+             return getattr(self.settings, name)
+         return os.environ.get(env_var)
 
     def configure_logging(self):
-        log_file_path = 'logs/app.log'
-        logging.basicConfig(filename=log_file_path, level=logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s', filemode='a')
-        logging.info("Logging configured.")
+        settings = get_settings()
+        log_file_path = LOG_FILES.get(settings.log_format, LOG_FILES['text'])
+        # Bounded on disk: rotated by size and/or age, keeping log_backup_count segments
+        handler = RotatingLogHandler(log_file_path, max_bytes=settings.log_max_bytes,
+                                     backup_count=settings.log_backup_count,
+                                     interval=settings.log_rotate_seconds, compress=settings.log_compress)
+        handler.setFormatter(JsonFormatter() if settings.log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+        logging.basicConfig(handlers=[handler], level=settings.log_level.upper())
+        configure_levels(settings.log_levels)  # e.g. LOG_LEVELS=calculator=WARNING,csv=DEBUG
+        log.info("Logging configured.")
 
     def load_plugins(self):
         plugins_package = 'app.plugins'
         for _, plugin_name, is_pkg in pkgutil.iter_modules([plugins_package.replace('.', '/')]):
-            logging.info(f"Found plugin: {plugin_name}")  # Log for debugging/record-keeping
+            log.info("Found plugin: %s", plugin_name)  # Log for debugging/record-keeping
             if is_pkg and plugin_name != "menu":  # Ensure it's a package
                 try:
                     plugin_module = importlib.import_module(f'{plugins_package}.{plugin_name}')
-                    for item_name in dir(plugin_module):
-                        item = getattr(plugin_module, item_name)
-                        try:
-                            if isinstance(item, type) and issubclass(item, Command) and item is not Command:
-                                self.command_handler.register_command(plugin_name, item())
-                                logging.info(f"Registered command: {plugin_name}")  # Logging
-                        except TypeError as e:
-                            # Check the exception message to determine if it's the specific TypeError we want to ignore
-                            if str(e) == "issubclass() arg 1 must be a class":
-                                continue  # Ignore this specific TypeError
-                            else:
-                                raise  # Move on to the next item without logging this specific error
+                    self.register_plugin(plugin_name, plugin_module)
                 except Exception as e:
-                    logging.error(f"Error loading plugin {plugin_name}: {e}")  # Logging errors
+                    log.error("Error loading plugin %s: %s", plugin_name, e)  # Logging errors
         # Since menu command would need a separate argument - which is list of all registered commands, we have to manually register it.
         self.command_handler.register_command("menu", MenuCommand(self.command_handler))
 
+    def register_plugin(self, plugin_name, plugin_module):
+        """Registers the Command subclasses of an imported plugin module under the plugin name."""
+        for item_name in dir(plugin_module):
+            item = getattr(plugin_module, item_name)
+            try:
+                if isinstance(item, type) and issubclass(item, Command) and item is not Command and not inspect.isabstract(item):
+                    self.command_handler.register_command(plugin_name, item())
+                    log.info("Registered command: %s", plugin_name)  # Logging
+            except TypeError as e:
+                # Check the exception message to determine if it's the specific TypeError we want to ignore
+                if str(e) == "issubclass() arg 1 must be a class":
+                    continue  # Ignore this specific TypeError
+                else:
+                    raise  # Move on to the next item without logging this specific error
+
+    def restore_session(self):
+        """
+        Restores the registered commands and the history buffer from the session snapshot, in place of
+        plugin discovery and parsing the history CSV. Returns False (start cold) when snapshots are
+        off or the snapshot is missing or stale.
+        """
+        if not self.settings.session_snapshot:
+            return False
+        state = load_snapshot(self.settings.snapshot_file, self.settings)
+        if state is None:
+            return False
+        self.command_handler = state['command_handler']
+        Singleton._instances[CommandHistoryManager] = state['history']
+        log.info("Restored session snapshot with %s commands.", len(self.command_handler.commands))
+        return True
+
+    def save_session(self):
+        """Snapshots the warm state on exit so the next start can skip discovery."""
+        if not self.settings.session_snapshot:
+            return
+        state = {'command_handler': self.command_handler, 'history': CommandHistoryManager()}
+        try:
+            save_snapshot(self.settings.snapshot_file, state, self.settings)
+        except Exception as e:  # Never fail an exit over a snapshot; the next start is just cold
+            log.warning("Could not save the session snapshot: %s", e)
 
+    def start_hot_reload(self):
+        """Starts watching app/plugins for changes when HOT_RELOAD is enabled."""
+        if not self.settings.hot_reload:
+            return None
+        self.reloader = PluginReloader(self, interval=self.settings.hot_reload_interval)
+        self.reloader.start()
+        return self.reloader
+
+    def render_main_menu(self):
+        """Returns the full main menu text, rebuilt only when a command has been registered since."""
+        version, menu = self.__menu
+        if version != self.command_handler.version:
+            menu = ("\nAvailable commands:\n"
+                    f"{self.command_handler.render_commands()}"
+                    "Type the number of the command to execute, or type 'exit' to exit.\n")
+            self.__menu = (self.command_handler.version, menu)
+        return menu
+
+    @flushes
     def print_main_menu(self):
-        print("\nAvailable commands:")  # Retained for user interaction
-        self.command_handler.list_commands()
-        print("Type the number of the command to execute, or type 'exit' to exit.")
+        if self.quiet:
+            return
+        echo(self.render_main_menu(), end='')  # One write for the whole menu
 
     def start(self):
-        self.load_plugins()
-        logging.info("Application starting...")  # Log application start
+        if not self.restore_session():
+            self.load_plugins()
+        self.start_hot_reload()
+        log.info("Application starting...")  # Log application start
         self.print_main_menu()
-        command_history = CommandHistoryManager() 
+        if self.settings.async_repl:
+            return asyncio.run(self.start_async())
+        command_history = current_history()  # The session's own history when run under session_scope
         while True:
-            user_input = input(">>> ").strip()
+            user_input = prompt(">>> ").strip()
             if user_input.lower() == 'exit':
-                logging.info("Exiting application.")  # Log exiting application
-                print("Exiting application.")  # User feedback
+                log.info("Exiting application.")  # Log exiting application
+                echo("Exiting application.", flush=True)  # User feedback
+                if self.reloader:
+                    self.reloader.stop()
+                self.save_session()
                 break
+            if '|' in user_input:
+                try:
+                    self.run_pipeline(user_input)
+                except KeyboardInterrupt:  # Ctrl-C stops the pipeline, not the REPL
+                    log.warning("Pipeline %s interrupted by the user", user_input)
+                    echo("\nPipeline was cancelled.")
+                command_history.add_command(user_input)
+                continue
             try:
                 index = int(user_input) - 1
                 if index < 0:  # Refresh the main menu if '0' or an invalid negative number is entered
@@ -88,15 +175,105 @@ class App:
                     continue
                 command_name = self.command_handler.get_command_by_index(index)
                 if command_name:
-                    self.command_handler.execute_command(command_name)
+                    try:
+                        self.command_handler.execute_command(command_name)
+                    except KeyboardInterrupt:  # Ctrl-C stops the command, not the REPL
+                        log.warning("Command %s interrupted by the user", command_name)
+                        echo(f"\nCommand '{command_name}' was cancelled.")
                     command_history.add_command(command_name) 
                     self.print_main_menu()  # Print the main menu again after command execution for user
                 else:
-                    logging.warning("Invalid selection. Please enter a valid number.")  # Logging warning
-                    print("Invalid selection. Please enter a valid number.")  # User feedback
+                    log.warning("Invalid selection. Please enter a valid number.")  # Logging warning
+                    echo("Invalid selection. Please enter a valid number.")  # User feedback
+            except ValueError:
+                log.error("Only numbers are allowed, wrong input.")  # Logging error
+                echo("Only numbers are allowed, wrong input.")  # User feedback
+
+    @flushes
+    def run_pipeline(self, text):
+        """Runs a pipeline such as 'csv | calc mul Population 2 | save out.parquet' and prints its result."""
+        try:
+            with cancel_scope(command_token()):
+                result = Pipeline(self.command_handler).run(text)
+        except CommandCancelled as e:
+            log.warning("Pipeline %s", e)
+            echo(f"Pipeline {e}.")
+            return None
+        except (ValueError, KeyError, NotImplementedError, OSError) as e:
+            log.error("Pipeline failed: %s", e)
+            echo(f"Pipeline failed: {e}")
+            return None
+        if isinstance(result, pd.DataFrame):
+            echo(result.to_string(max_rows=20))
+        elif result is not None:
+            echo(result)
+        return result
+
+    async def start_async(self):
+        """
+        REPL in which every command runs as a job on the JobManager's executor. A selection ending in
+        '&' (e.g. '2 &') runs in the background and the prompt returns at once; others are awaited.
+        """
+        loop = asyncio.get_running_loop()
+        jobs = JobManager()
+        command_history = current_history()
+        foreground = None
+
+        def interrupt():
+            # Ctrl-C cancels the command being waited on; background jobs and the REPL keep running
+            if foreground is not None and foreground.finished is None:
+                foreground.cancel()
+            else:
+                echo("\nType 'exit' to leave the application.", flush=True)
+        try:
+            loop.add_signal_handler(signal.SIGINT, interrupt)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass  # No signal handlers on this platform or outside the main thread
+        while True:
+            # Read on a helper thread so background jobs keep running while the prompt waits
+            user_input = (await loop.run_in_executor(None, prompt, ">>> ")).strip()
+            if user_input.lower() == 'exit':
+                if jobs.running():
+                    echo(f"Waiting for {len(jobs.running())} running job(s) to finish...")
+                    await jobs.wait()
+                log.info("Exiting application.")
+                echo("Exiting application.", flush=True)
+                if self.reloader:
+                    self.reloader.stop()
+                self.save_session()
+                break
+            background = user_input.endswith('&')
+            if '|' in user_input:
+                job = jobs.submit('pipeline', self.run_pipeline, user_input.rstrip('&').strip())
+                command_history.add_command(user_input)
+                if background:
+                    echo(f"[{job.id}] pipeline started in the background")
+                else:
+                    foreground = job
+                    await job.task
+                continue
+            try:
+                index = int(user_input.rstrip('&').strip()) - 1
             except ValueError:
-                logging.error("Only numbers are allowed, wrong input.")  # Logging error
-                print("Only numbers are allowed, wrong input.")  # User feedback
+                log.error("Only numbers are allowed, wrong input.")
+                echo("Only numbers are allowed, wrong input.")
+                continue
+            if index < 0:
+                self.print_main_menu()
+                continue
+            command_name = self.command_handler.get_command_by_index(index)
+            if not command_name:
+                log.warning("Invalid selection. Please enter a valid number.")
+                echo("Invalid selection. Please enter a valid number.")
+                continue
+            job = jobs.submit(command_name, self.command_handler.execute_command, command_name)
+            command_history.add_command(command_name)
+            if background:
+                echo(f"[{job.id}] {command_name} started in the background")
+                continue
+            foreground = job
+            await job.task
+            self.print_main_menu()
 
 if __name__ == "__main__":
     app = App()
@@ -0,0 +1,151 @@
+import io
+import os
+import gzip
+import json
+import time
+import itertools
+import pandas as pd
+from app import storage
+from app.cancellation import check_cancelled
+from app.logger import get_logger
+
+log = get_logger('batch')
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+
+def parse_chunk_range(text):
+    """Parses '10:20' (chunks 10 to 19), '10:' or '' (all) into (first, stop)."""
+    text = (text or '').strip()
+    if not text:
+        return 0, None
+    first, _, stop = text.partition(':')
+    try:
+        first, stop = int(first or 0), int(stop) if stop.strip() else None
+    except ValueError:
+        raise ValueError(f"Invalid chunk range: '{text}' (expected e.g. 10:20)") from None
+    if first < 0 or stop is not None and stop <= first:
+        raise ValueError(f"Invalid chunk range: '{text}'")
+    return first, stop
+
+def skip_records(file, count):
+    """
+    Advances a binary CSV file past count records without parsing them: lines are only scanned for
+    quotes, so a quoted field spanning lines still counts as one record. Returns the records skipped.
+    """
+    skipped, quoted = 0, False
+    while skipped < count:
+        lines = list(itertools.islice(file, min(count - skipped, 65536)))
+        if not lines:
+            break
+        if not quoted and b'"' not in b''.join(lines):
+            skipped += len(lines)  # The usual case: one line per record
+            continue
+        for line in lines:
+            if line.count(b'"') % 2:  # Escaped quotes ("") come in pairs and never flip this
+                quoted = not quoted
+            if not quoted:
+                skipped += 1
+    return skipped
+
+class BatchJob:
+    """
+    Runs process(chunk) over a CSV in numbered chunks of chunksize rows, appending each result to
+    output_path. After every chunk the output is flushed to disk and a checkpoint (next chunk, committed
+    output size, running totals) is written atomically, so a job that dies resumes after its last
+    committed chunk. A chunk range [first_chunk, stop_chunk) lets several machines split one input.
+    """
+
+    def __init__(self, input_path, output_path, process, chunksize, first_chunk=0, stop_chunk=None,
+                 count=None, reader_options=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.process = process
+        self.chunksize = chunksize
+        self.first_chunk = first_chunk
+        self.stop_chunk = stop_chunk
+        self.count = count  # Optional chunk -> {name: number} added to the checkpointed totals
+        self.reader_options = dict(reader_options or {})
+        self.checkpoint_path = f"{output_path}{CHECKPOINT_SUFFIX}"
+
+    def identity(self):
+        """What a checkpoint must match to be resumed: the same input file, chunking and range."""
+        stat = os.stat(self.input_path)
+        return {'input': os.path.abspath(self.input_path), 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                'chunksize': self.chunksize, 'first_chunk': self.first_chunk, 'stop_chunk': self.stop_chunk}
+
+    def load_checkpoint(self, job=None):
+        try:
+            with open(self.checkpoint_path) as file:
+                checkpoint = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring unreadable checkpoint '%s': %s", self.checkpoint_path, e)
+            return None
+        if checkpoint.get('job') != (job or self.identity()):
+            log.warning("Checkpoint '%s' is for a different input or chunk range; starting over", self.checkpoint_path)
+            return None
+        if not os.path.exists(self.output_path) or os.path.getsize(self.output_path) < checkpoint['output_bytes']:
+            log.warning("Output '%s' is shorter than its checkpoint; starting over", self.output_path)
+            return None
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint):
+        with storage.atomic_write(self.checkpoint_path) as file:
+            json.dump(checkpoint, file)
+
+    def read_chunks(self, skipped=0):
+        """
+        Yields the input's chunks after its first `skipped` rows. Skipped rows are scanned, not parsed,
+        and nothing is kept for them (pandas' skiprows would build a set of every skipped row number),
+        so starting deep into a file costs one read of the bytes before it.
+        """
+        if not skipped:
+            with pd.read_csv(self.input_path, chunksize=self.chunksize, **self.reader_options) as reader:
+                yield from reader
+            return
+        opener = gzip.open if storage.detect_format(self.input_path) == 'csv.gz' else open
+        with opener(self.input_path, 'rb') as source:
+            header = source.readline()
+            skip_records(source, skipped)
+            names = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+            with pd.read_csv(source, chunksize=self.chunksize, header=None, names=names,
+                             **self.reader_options) as reader:
+                yield from reader
+
+    def run(self):
+        """Processes the remaining chunks; returns the totals, the chunk resumed from (or None) and the time taken."""
+        started = time.perf_counter()
+        job = self.identity()  # Fails on a missing input before the output is touched
+        checkpoint = self.load_checkpoint(job)
+        if checkpoint:
+            next_chunk, totals = checkpoint['next_chunk'], checkpoint['totals']
+            # Drops whatever a crashed run wrote after its last committed chunk
+            os.truncate(self.output_path, checkpoint['output_bytes'])
+            log.info("Resuming '%s' at chunk %s", self.input_path, next_chunk)
+        else:
+            next_chunk, totals = self.first_chunk, {'chunks': 0, 'rows': 0}
+            open(self.output_path, 'w').close()
+        resumed_from = next_chunk if checkpoint else None
+
+        if self.stop_chunk is None or next_chunk < self.stop_chunk:
+            chunks = self.read_chunks(next_chunk * self.chunksize)
+            with open(self.output_path, 'a', newline='') as output:
+                for index, chunk in enumerate(chunks, start=next_chunk):
+                    if self.stop_chunk is not None and index >= self.stop_chunk:
+                        break
+                    check_cancelled()
+                    result = self.process(chunk)
+                    result.to_csv(output, header=output.tell() == 0, index=False)
+                    output.flush()
+                    os.fsync(output.fileno())
+                    totals['chunks'] += 1
+                    totals['rows'] += len(result)
+                    for name, value in (self.count(result) if self.count else {}).items():
+                        totals[name] = totals.get(name, 0) + value
+                    self.save_checkpoint({'job': job, 'next_chunk': index + 1, 'output_bytes': output.tell(),
+                                          'totals': totals})
+                    log.info("Committed chunk %s (%s rows) of '%s'", index, len(result), self.input_path)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)  # Done: a rerun starts a fresh job
+        return {'totals': totals, 'resumed_from': resumed_from, 'seconds': time.perf_counter() - started}
@@ -0,0 +1,28 @@
+"""
+Runs a checkpointed calculation import outside the REPL, e.g. one chunk range per machine:
+
+    python -m app.batch calculations.csv part-0.csv --chunks 0:40
+    python -m app.batch calculations.csv part-1.csv --chunks 40:
+
+Rerunning the same command after a crash resumes from the last committed chunk.
+"""
+import argparse
+from app.batch import parse_chunk_range
+from app.plugins.importer import ImportCommand
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.batch', description="Checkpointed calculation import")
+    parser.add_argument('input_path', help="CSV of operation,a,b rows")
+    parser.add_argument('output_path')
+    parser.add_argument('--chunks', default='', help="chunk range first:stop, e.g. 0:40 (default: all)")
+    parser.add_argument('--chunksize', type=int, default=None, help="rows per chunk (default: IMPORT_CHUNK_SIZE)")
+    options = parser.parse_args(argv)
+    first_chunk, stop_chunk = parse_chunk_range(options.chunks)
+    stats = ImportCommand(options.chunksize).import_file(options.input_path, options.output_path, first_chunk, stop_chunk)
+    if stats['resumed_from'] is not None:
+        print(f"Resumed at chunk {stats['resumed_from']}")
+    print(f"Imported {stats['rows']} calculations ({stats['errors']} errors) to '{options.output_path}' "
+          f"in {stats['seconds']:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from app.settings import get_settings
+
+class CommandCancelled(BaseException):
+    """
+    Raised at a cancellation check point. Like asyncio.CancelledError it is a BaseException, so the
+    broad `except Exception` handlers inside commands do not swallow it.
+    """
+
+class CommandTimeout(CommandCancelled):
+    """Raised at a check point once the command's deadline has passed."""
+
+class CancelToken:
+    """Cancellation flag plus an optional deadline, shared by a command and whoever may stop it."""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or None  # 0 means no deadline
+        self.deadline = time.monotonic() + self.timeout if self.timeout else None
+        self.__cancelled = threading.Event()
+        self.stopped = None  # The exception raised at the check point that stopped the command
+
+    def cancel(self):
+        """Requests cancellation; the command stops at its next check point."""
+        self.__cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self.__cancelled.is_set()
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self):
+        """Seconds left before the deadline, or None without one."""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self.__cancelled.is_set():
+            self.stopped = CommandCancelled("was cancelled")
+        elif self.expired:
+            self.stopped = CommandTimeout(f"timed out after {self.timeout:g}s")
+        else:
+            return
+        raise self.stopped
+
+current_token = contextvars.ContextVar('cancel_token', default=None)
+
+def command_token(timeout=None):
+    """The caller's current token (e.g. a job's), or a new one with timeout, defaulting to COMMAND_TIMEOUT."""
+    token = current_token.get()
+    if token is None or timeout is not None:
+        token = CancelToken(timeout if timeout is not None else get_settings().command_timeout)
+    return token
+
+def check_cancelled():
+    """Check point for long loops: raises if the current command was cancelled or ran out of time."""
+    token = current_token.get()
+    if token is not None:
+        token.check()
+
+@contextmanager
+def cancel_scope(token):
+    """Makes token the current one for the duration of the block (and this thread or task only)."""
+    reset = current_token.set(token)
+    try:
+        yield token
+    finally:
+        current_token.reset(reset)
@@ -1,30 +1,89 @@
 from abc import ABC, abstractmethod
+import re
+import csv
+import hashlib
+import functools
+import threading
+import contextlib
+import contextvars
+from collections import deque, OrderedDict
 import pandas as pd
 from datetime import datetime
 import os
+from app.settings import get_settings
+from app.cancellation import CommandCancelled, cancel_scope, command_token
+from app.journal import Journal, Append, Clear, Delete
+from app.profiler import get_profiler
+from app.output import echo, flushes
+from app.logger import get_logger
+
+log = get_logger('commands')
+
+SESSION_NAME_PATTERN = re.compile(r'[^A-Za-z0-9_.-]')
 
 class Command(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Console output is buffered; whatever a command wrote is shown as soon as it returns
+        if 'execute' in cls.__dict__:
+            cls.execute = flushes(cls.execute)
+
     @abstractmethod
     def execute(self):
         pass
 
+    def run(self, data, *args):
+        """
+        Pipeline stage hook: receives the previous stage's output (None for the first stage) and the
+        stage's arguments, and returns the data for the next stage, usually a DataFrame.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} cannot be used in a pipeline")
+
 class CommandHandler:
     def __init__(self):
         self.commands = {}
+        self.version = 0  # Bumped on every registration so rendered menus know when they are stale
+        self.__listing = (None, '')
 
     def register_command(self, command_name: str, command_instance: Command):
-        self.commands[command_name] = command_instance
+        # Copy-on-write so a reload thread never mutates the dict a running loop iterates over
+        commands = dict(self.commands)
+        commands[command_name] = command_instance
+        self.commands = commands
+        self.version += 1
 
-    def execute_command(self, command_name: str):
+    @flushes
+    def execute_command(self, command_name: str, timeout=None):
+        """
+        Runs a command under a CancelToken: the caller's current one (e.g. a job's), otherwise a new one
+        with `timeout` or the COMMAND_TIMEOUT setting. Commands stop cooperatively at check points.
+        """
+        token = command_token(timeout)
+        # Opt-in: tracemalloc slows allocation-heavy commands down noticeably
+        measure = contextlib.nullcontext()
+        if get_settings().memory_profile and command_name in self.commands:
+            measure = get_profiler().measure(command_name)
         # Easier to Ask for Forgiveness than Permission (EAFP)
         try:
-            self.commands[command_name].execute()
+            with cancel_scope(token), measure:
+                self.commands[command_name].execute()
         except KeyError: # Catch the exception if the operation fails
-            print(f"No such command: {command_name}") # Exception caught and handled gracefully
+            echo(f"No such command: {command_name}") # Exception caught and handled gracefully
+        except CommandCancelled as e:
+            log.warning("Command %s %s", command_name, e)
+            echo(f"Command '{command_name}' {e}.")
 
+    def render_commands(self):
+        """Returns the numbered command listing, formatted once per registry version."""
+        version, listing = self.__listing
+        if version != self.version:
+            listing = ''.join(f"{index}. {command_name}\n" for index, command_name in enumerate(self.commands, start=1))
+            self.__listing = (self.version, listing)
+        return listing
+
+    @flushes
     def list_commands(self):
-        for index, command_name in enumerate(self.commands, start=1):
-            print(f"{index}. {command_name}")
+        echo(self.render_commands(), end='')
 
     def get_command_by_index(self, index: int):
         try:
@@ -40,38 +99,203 @@ class Singleton(type):
             cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
-class CommandHistoryManager(metaclass=Singleton):
+def synchronized(method):
+    """Runs a HistoryStore method under the store's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class HistoryStore:
+    """
+    One command history: a bounded, journaled buffer of the latest records, persisted to history_file.
+    Commands in one session may run concurrently (e.g. background jobs), so every read and change of
+    the buffer and file happens under the store's lock.
+    """
     TOTAL_RECORDS = 50  #  last 50 commands
+    COLUMNS = ['Timestamp', 'Command']
 
-    def __init__(self):
-        self.history_file = 'data/command_history.csv'
-        if os.path.exists(self.history_file):
-            self.history = pd.read_csv(self.history_file)
+    def __init__(self, history_file=None, backend=None):
+        settings = get_settings()
+        self.history_file = history_file or settings.history_file
+        self.backend = backend or settings.history_backend
+        self.TOTAL_RECORDS = settings.history_records
+        self.lock = threading.RLock()  # Reentrant: a change persists itself through save_history
+        # Every mutation goes through the journal as a delta, so undo/redo never copy the history
+        self.journal = Journal(settings.undo_limit)
+        self.version = 0
+        self.__frame = (None, None)  # (version, DataFrame) rendered on demand
+        self.__file_rows = 0  # Rows in the CSV, which appends let run ahead of the in-memory tail
+        if self.backend == 'csv' and os.path.exists(self.history_file):
+            history = pd.read_csv(self.history_file)
+            self.__file_rows = len(history)
             # Ensure that only the latest TOTAL_RECORDS are loaded
-            self.history = self.history.tail(self.TOTAL_RECORDS)
+            self.history = history.tail(self.TOTAL_RECORDS)
         else:
-            self.history = pd.DataFrame(columns=['Timestamp', 'Command'])
+            self.rows = deque(maxlen=self.TOTAL_RECORDS)
 
+    @property
+    @synchronized
+    def history(self):
+        """The history as a Timestamp/Command DataFrame, built once per change."""
+        version, frame = self.__frame
+        if version != self.version:
+            frame = pd.DataFrame(list(self.rows), columns=self.COLUMNS)
+            self.__frame = (self.version, frame)
+        return frame
+
+    @history.setter
+    @synchronized
+    def history(self, frame):
+        self.rows = deque(frame[self.COLUMNS].itertuples(index=False, name=None), maxlen=self.TOTAL_RECORDS)
+        self.version += 1
+
+    @synchronized
     def add_command(self, command_name):
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        new_entry = pd.DataFrame([[now, command_name]], columns=['Timestamp', 'Command'])
-        self.history = pd.concat([self.history, new_entry], ignore_index=True).tail(self.TOTAL_RECORDS)
-        self.save_history()
+        self.journal.apply(Append(self, (now, command_name)))
 
+    @synchronized
     def get_history(self):
         # Return a list of command names for backward compatibility
-        return self.history['Command'].tolist()
+        return [command_name for _, command_name in self.rows]
 
+    @synchronized
     def clear_history(self):
-        self.history = pd.DataFrame(columns=['Timestamp', 'Command'])
-        self.save_history()
+        self.journal.apply(Clear(self))
+
+    @synchronized
+    def delete_record(self, position):
+        """Deletes the record at a zero-based position; undo puts it back."""
+        return self.journal.apply(Delete(self, position))
+
+    @synchronized
+    def undo(self):
+        """Reverts the latest change; returns it, or None when there is nothing to undo."""
+        return self.journal.undo()
+
+    @synchronized
+    def redo(self):
+        return self.journal.redo()
+
+    def changed(self, delta):
+        """Persists a change: an added record is appended to the file, anything else rewrites it."""
+        self.version += 1
+        if self.backend == 'memory':
+            return
+        if isinstance(delta, Append) and 0 < self.__file_rows < 2 * self.TOTAL_RECORDS:
+            with open(self.history_file, 'a', newline='') as file:
+                csv.writer(file).writerow(delta.row)
+            self.__file_rows += 1
+        else:
+            self.save_history()  # Also compacts a file that appends have grown past the in-memory tail
 
+    @synchronized
     def save_history(self):
         """Saves the current command history to a CSV file."""
-        self.history.to_csv(self.history_file, index=False)
+        if self.backend == 'memory':
+            return  # In-memory history is never persisted
+        history = self.history
+        history.to_csv(self.history_file, index=False)
+        self.__file_rows = len(history)
 
     def load_history(self):
         """Loads the command history from a CSV file into a DataFrame."""
         if os.path.exists(self.history_file):
             return pd.read_csv(self.history_file)
-        return pd.DataFrame(columns=['Timestamp', 'Command'])
\ No newline at end of file
+        return pd.DataFrame(columns=self.COLUMNS)
+
+class CommandHistoryManager(HistoryStore, metaclass=Singleton):
+    """The process-wide history used outside any session (see session_scope)."""
+
+class HistoryPartitions:
+    """
+    Per-session histories, one file each under directory. Partitions are loaded on first use and at
+    most `capacity` stay open, least recently used first out; every change is already on disk, so
+    closing one only frees its memory. With the memory backend a closed partition's history is lost.
+    A session inside session_scope holds a lease and is never closed: a second store for the same file
+    would overwrite the first one's records on its next rewrite. While every open session is leased,
+    more than `capacity` stay open.
+    """
+
+    def __init__(self, directory=None, capacity=None):
+        settings = get_settings()
+        self.directory = directory or settings.history_partitions_dir
+        self.capacity = capacity or settings.history_open_partitions
+        self.__open = OrderedDict()  # session -> HistoryStore, least recently used first
+        self.__leases = {}  # session -> scopes currently using it
+        self.__lock = threading.Lock()
+
+    def path_for(self, session):
+        """A file name safe for any session id; ids that had to be changed get a hash to stay distinct."""
+        name = SESSION_NAME_PATTERN.sub('_', str(session))[:64]
+        if name != str(session):
+            name = f"{name}-{hashlib.sha1(str(session).encode()).hexdigest()[:10]}"
+        return os.path.join(self.directory, f"{name}.csv")
+
+    def get(self, session):
+        with self.__lock:
+            store = self.__open.get(session)
+            if store is not None:
+                self.__open.move_to_end(session)
+                return store
+        # Loaded outside the lock so one slow file never blocks every other session
+        os.makedirs(self.directory, exist_ok=True)
+        store = HistoryStore(self.path_for(session))
+        with self.__lock:
+            store = self.__open.setdefault(session, store)  # Another thread may have opened it meanwhile
+            self.__open.move_to_end(session)
+            self.__close_idle()
+        return store
+
+    def acquire(self, session):
+        """Keeps session's partition open until the matching release()."""
+        with self.__lock:
+            self.__leases[session] = self.__leases.get(session, 0) + 1
+
+    def release(self, session):
+        with self.__lock:
+            self.__leases[session] -= 1
+            if not self.__leases[session]:
+                del self.__leases[session]
+            self.__close_idle()
+
+    def __close_idle(self):
+        """Closes least recently used partitions without a lease until at most capacity are open."""
+        excess = len(self.__open) - self.capacity
+        for session in [session for session in self.__open if session not in self.__leases][:max(excess, 0)]:
+            del self.__open[session]
+            log.debug("Closed history partition %s", session)
+
+    def __len__(self):
+        return len(self.__open)
+
+    def __contains__(self, session):
+        return session in self.__open
+
+current_session = contextvars.ContextVar('history_session', default=None)
+_partitions = None
+
+def history_partitions():
+    global _partitions
+    if _partitions is None:
+        _partitions = HistoryPartitions()
+    return _partitions
+
+@contextlib.contextmanager
+def session_scope(session):
+    """Makes `session`'s history partition the current history for the enclosed commands."""
+    partitions = history_partitions()
+    partitions.acquire(session)
+    reset = current_session.set(session)
+    try:
+        yield
+    finally:
+        current_session.reset(reset)
+        partitions.release(session)
+
+def current_history():
+    """The history of the current session, or the process-wide one outside any session."""
+    session = current_session.get()
+    return CommandHistoryManager() if session is None else history_partitions().get(session)
@@ -0,0 +1,92 @@
+import time
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from app.commands import Singleton
+from app.settings import get_settings
+from app.cancellation import CancelToken, CommandTimeout, current_token
+from app.output import echo
+from app.logger import get_logger
+
+log = get_logger('jobs')
+
+class Job:
+    """A command running as an asyncio task; the blocking work itself happens on the executor."""
+
+    def __init__(self, job_id, command_name, timeout=None):
+        self.id = job_id
+        self.command_name = command_name
+        self.token = CancelToken(timeout)
+        self.started = time.monotonic()
+        self.finished = None
+        self.status = 'running'  # Then 'done', 'failed', 'cancelled' or 'timed out'
+        self.error = None
+        self.task = None
+
+    def cancel(self):
+        """Asks the command to stop at its next check point; the worker thread itself cannot be killed."""
+        self.token.cancel()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+class JobManager(metaclass=Singleton):
+    def __init__(self, workers=None):
+        """Commands are synchronous, so each job runs on a shared pool of worker_count threads"""
+        # At least two, so a foreground command never queues behind a single background job
+        self.workers = max(2, workers or get_settings().worker_count)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self.jobs = {}
+        self.__next_id = 1
+
+    def submit(self, command_name, function, *args, timeout=None):
+        """
+        Schedules function(*args) on the running event loop and returns its Job immediately. The job's
+        CancelToken (deadline `timeout`, or COMMAND_TIMEOUT) is current while function runs.
+        """
+        if timeout is None:
+            timeout = get_settings().command_timeout
+        job = Job(self.__next_id, command_name, timeout)
+        self.__next_id += 1
+        job.task = asyncio.get_running_loop().create_task(self.run(job, function, *args))
+        self.jobs[job.id] = job
+        log.info("Started job %s: %s", job.id, command_name)
+        return job
+
+    async def run(self, job, function, *args):
+        # run_in_executor does not carry context variables over, so the token travels in a copied context
+        context = contextvars.copy_context()
+        context.run(current_token.set, job.token)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, context.run, function, *args)
+            if isinstance(job.token.stopped, CommandTimeout):
+                job.status = 'timed out'
+            elif job.token.stopped is not None:
+                job.status = 'cancelled'
+            else:
+                job.status = 'done'
+            return result
+        except asyncio.CancelledError:
+            job.token.cancel()  # Also stop the worker thread, which the task no longer waits for
+            job.status = 'cancelled'
+            raise
+        except Exception as e:
+            job.status, job.error = 'failed', e
+            log.error("Job %s (%s) failed: %s", job.id, job.command_name, e)
+            echo(f"Job {job.id} ({job.command_name}) failed: {e}", flush=True)
+        finally:
+            job.finished = time.monotonic()
+            log.info("Job %s (%s) %s after %.2fs", job.id, job.command_name, job.status, job.elapsed)
+
+    def running(self):
+        return [job for job in self.jobs.values() if job.finished is None]
+
+    async def wait(self):
+        """Waits for every job that is still running, e.g. before the REPL exits."""
+        await asyncio.gather(*(job.task for job in self.running()), return_exceptions=True)
+
+    def render(self):
+        """Returns one line per job with its status and elapsed time, newest last."""
+        return ''.join(f"[{job.id}] {job.command_name:<12}{job.status:<10}{job.elapsed:.1f}s\n"
+                       for job in self.jobs.values())
@@ -0,0 +1,111 @@
+from collections import deque
+
+class Journal:
+    """
+    Bounded undo/redo stacks of deltas. A delta records only the rows a change touched, never a
+    copy of the store, and undo/redo just pop one delta and replay it in reverse or forward.
+    """
+
+    def __init__(self, limit=100):
+        self.__undo = deque(maxlen=limit)  # The oldest steps fall off, so memory stays bounded
+        self.__redo = deque(maxlen=limit)
+
+    def apply(self, delta):
+        """Performs a new change and makes it undoable; anything that could be redone is discarded."""
+        delta.apply()
+        self.__undo.append(delta)
+        self.__redo.clear()
+        delta.store.changed(delta)
+        return delta
+
+    def undo(self):
+        if not self.__undo:
+            return None
+        delta = self.__undo.pop()
+        delta.revert()
+        self.__redo.append(delta)
+        delta.store.changed(None)
+        return delta
+
+    def redo(self):
+        if not self.__redo:
+            return None
+        delta = self.__redo.pop()
+        delta.apply()
+        self.__undo.append(delta)
+        delta.store.changed(delta)
+        return delta
+
+    @property
+    def can_undo(self):
+        return bool(self.__undo)
+
+    @property
+    def can_redo(self):
+        return bool(self.__redo)
+
+class RowStore:
+    """A bounded deque of rows with its own journal; changed() is the hook for persisting edits."""
+
+    def __init__(self, limit=50, rows=(), journal_limit=100):
+        self.rows = deque(rows, maxlen=limit)
+        self.journal = Journal(journal_limit)
+        self.version = 0
+
+    def changed(self, delta):
+        self.version += 1
+
+class Append:
+    """Adds a row at the end, remembering the row a full store evicted from the front."""
+    __slots__ = ('store', 'row', 'evicted')
+
+    def __init__(self, store, row):
+        self.store, self.row, self.evicted = store, row, None
+
+    def apply(self):
+        rows = self.store.rows
+        self.evicted = rows[0] if rows.maxlen is not None and len(rows) == rows.maxlen else None
+        rows.append(self.row)
+
+    def revert(self):
+        rows = self.store.rows
+        rows.pop()
+        if self.evicted is not None:
+            rows.appendleft(self.evicted)
+
+    def __str__(self):
+        return f"add '{self.row[-1]}'"
+
+class Delete:
+    """Removes the row at a position, keeping that row to put it back."""
+    __slots__ = ('store', 'position', 'row')
+
+    def __init__(self, store, position):
+        self.store, self.position, self.row = store, position, None
+
+    def apply(self):
+        self.row = self.store.rows[self.position]
+        del self.store.rows[self.position]
+
+    def revert(self):
+        self.store.rows.insert(self.position, self.row)
+
+    def __str__(self):
+        return f"delete '{self.row[-1]}'"
+
+class Clear:
+    """Swaps in an empty deque and keeps the old one, so clearing and restoring never copy rows."""
+    __slots__ = ('store', 'rows')
+
+    def __init__(self, store):
+        self.store, self.rows = store, None
+
+    def apply(self):
+        self.rows = self.store.rows
+        self.store.rows = deque(maxlen=self.rows.maxlen)
+
+    def revert(self):
+        self.store.rows = self.rows
+
+    def __str__(self):
+        return f"clear {len(self.rows)} records"
@@ -0,0 +1,176 @@
+import os
+import re
+import gzip
+import json
+import time
+import shutil
+import logging
+import logging.handlers
+from datetime import datetime
+
+class Logger:
+    """
+    Per-subsystem logging facade. Messages take %-style arguments, so nothing is formatted unless
+    the level is enabled; keyword arguments are attached to the record as structured fields.
+    """
+
+    def __init__(self, subsystem=None):
+        self.subsystem = subsystem or 'app'
+        self.logger = logging.getLogger(f"app.{subsystem}" if subsystem else 'app')
+
+    def enabled(self, level=logging.INFO):
+        """Guard for work that is only needed to build log messages (e.g. per-row logging loops)."""
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level, message, *args, **fields):
+        if self.logger.isEnabledFor(level):
+            # stacklevel points the record at the caller of log() rather than this facade
+            self.logger.log(level, message, *args, extra={'fields': fields} if fields else None, stacklevel=2)
+
+    # The level methods check the level themselves instead of going through log(): a disabled call
+    # then costs one isEnabledFor, the same as the stdlib logger's own methods
+
+    def debug(self, message, *args, **fields):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.log(logging.DEBUG, message, *args, extra={'fields': fields} if fields else None, stacklevel=2)
+
+    def info(self, message, *args, **fields):
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.log(logging.INFO, message, *args, extra={'fields': fields} if fields else None, stacklevel=2)
+
+    def warning(self, message, *args, **fields):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.log(logging.WARNING, message, *args, extra={'fields': fields} if fields else None, stacklevel=2)
+
+    def error(self, message, *args, **fields):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.log(logging.ERROR, message, *args, extra={'fields': fields} if fields else None, stacklevel=2)
+
+_loggers = {}
+
+def get_logger(subsystem=None):
+    """Returns the shared facade for a subsystem such as 'calculator'; None is the application itself."""
+    logger = _loggers.get(subsystem)
+    if logger is None:
+        logger = _loggers[subsystem] = Logger(subsystem)
+    return logger
+
+def configure_levels(spec):
+    """
+    Applies per-subsystem levels from a spec such as 'calculator=WARNING,csv=DEBUG'.
+    Returns the mapping that was applied; unknown level names are ignored.
+    """
+    applied = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        subsystem, _, level_name = entry.partition('=')
+        level = logging.getLevelName(level_name.strip().upper())
+        if not isinstance(level, int):
+            logging.getLogger('app').warning("Ignoring unknown log level '%s' for %s", level_name, subsystem)
+            continue
+        name = subsystem.strip()
+        get_logger(None if name == 'app' else name).logger.setLevel(level)
+        applied[name] = level
+    return applied
+
+LOG_FILES = {'text': 'logs/app.log', 'json': 'logs/app.jsonl'}
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+TEXT_LINE = re.compile(r'^(\S+ \S+) - (\w+) - (.*)$')
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, then any structured fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rolls the log over when it reaches max_bytes or is older than interval seconds (0 disables either),
+    keeping backup_count numbered segments, gzip-compressed when compress is set.
+    """
+
+    def __init__(self, filename, max_bytes=0, backup_count=5, interval=0, compress=False):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, delay=True, encoding='utf-8')
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+        if compress:
+            self.namer = lambda name: f"{name}.gz"
+            self.rotator = compress_segment
+
+    def shouldRollover(self, record):
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+def compress_segment(source, dest):
+    """Rotator that gzips the finished segment instead of renaming it."""
+    with open(source, 'rb') as plain, gzip.open(dest, 'wb') as compressed:
+        shutil.copyfileobj(plain, compressed)
+    os.remove(source)
+
+def log_segments(path):
+    """Returns the current log file and its rotated segments, oldest first."""
+    directory, base = os.path.split(path)
+    pattern = re.compile(rf'^{re.escape(base)}\.(\d+)(\.gz)?$')
+    rotated = []
+    for name in os.listdir(directory or '.'):
+        match = pattern.match(name)
+        if match:
+            rotated.append((int(match.group(1)), os.path.join(directory, name)))
+    segments = [segment for _, segment in sorted(rotated, reverse=True)]
+    if os.path.exists(path):
+        segments.append(path)
+    return segments
+
+def parse_entry(line):
+    """Parses a JSON-lines entry, or a line in the plain text format; returns None for anything else."""
+    if line.startswith('{'):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    match = TEXT_LINE.match(line)
+    if match is None:
+        return None
+    timestamp, level, message = match.groups()
+    return {'time': timestamp.replace(' ', 'T').replace(',', '.'), 'level': level, 'logger': 'app', 'message': message}
+
+def read_entries(path, level=None, subsystem=None, contains=None, since=None):
+    """
+    Streams matching entries from every segment of the log at path, one line at a time.
+    level is a minimum level name, subsystem a logger name such as 'csv', since an ISO timestamp prefix.
+    """
+    minimum = logging.getLevelName(level.upper()) if level else logging.NOTSET
+    if not isinstance(minimum, int):
+        raise ValueError(f"Unknown log level '{level}'")
+    logger_name = f"app.{subsystem}" if subsystem and subsystem != 'app' else subsystem
+    for segment in log_segments(path):
+        opener = gzip.open if segment.endswith('.gz') else open
+        with opener(segment, 'rt', encoding='utf-8', errors='replace') as lines:
+            for line in lines:
+                if contains and contains not in line:
+                    continue  # Cheap substring test before parsing
+                entry = parse_entry(line.rstrip('\n'))
+                if entry is None:
+                    continue
+                if since and entry.get('time', '') < since:
+                    continue
+                entry_level = logging.getLevelName(entry.get('level', ''))
+                if isinstance(entry_level, int) and entry_level < minimum:
+                    continue
+                if logger_name and not (entry.get('logger') == logger_name
+                                        or entry.get('logger', '').startswith(f"{logger_name}.")):
+                    continue
+                yield entry
@@ -0,0 +1,92 @@
+import sys
+import threading
+import functools
+import contextlib
+from app.settings import get_settings
+
+class OutputSink:
+    """
+    Buffered console output shared by the REPL and every command. Writes are collected in memory and
+    written in one call when the buffer passes `threshold` bytes, before a prompt, and when a command
+    returns (see flushes), instead of one write per print. A threshold of 0 writes straight through.
+    """
+
+    def __init__(self, stream=None, threshold=None):
+        # None means whatever sys.stdout is at flush time, so redirect_stdout and test capture still apply
+        self.stream = stream
+        self.threshold = get_settings().output_buffer_bytes if threshold is None else threshold
+        self.__parts = []
+        self.__size = 0
+        self.__lock = threading.Lock()  # Background jobs write too; whole writes never interleave
+
+    def write(self, text):
+        with self.__lock:
+            self.__parts.append(text)
+            self.__size += len(text)
+            full = self.__size >= self.threshold
+        if full:
+            self.flush()
+        return len(text)
+
+    def print(self, *values, sep=' ', end='\n', flush=False):
+        self.write(sep.join(map(str, values)) + end)
+        if flush:
+            self.flush()
+
+    def flush(self):
+        with self.__lock:
+            if not self.__parts:
+                return
+            text = ''.join(self.__parts)
+            self.__parts.clear()
+            self.__size = 0
+            stream = self.stream or sys.stdout
+            stream.write(text)
+            stream.flush()
+
+    def prompt(self, text=''):
+        """input() that first shows everything written so far."""
+        self.flush()
+        return input(text)
+
+    @contextlib.contextmanager
+    def redirect(self, stream):
+        """Sends output to stream (a file or io.StringIO) within the block, e.g. for batch runs."""
+        self.flush()
+        previous, self.stream = self.stream, stream
+        try:
+            yield stream
+        finally:
+            self.flush()
+            self.stream = previous
+
+_output = None
+_depth = threading.local()
+
+def get_output():
+    """The process-wide sink, created on first use."""
+    global _output
+    if _output is None:
+        _output = OutputSink()
+    return _output
+
+def echo(*values, sep=' ', end='\n', flush=False):
+    """print() through the shared sink."""
+    get_output().print(*values, sep=sep, end=end, flush=flush)
+
+def prompt(text=''):
+    return get_output().prompt(text)
+
+def flushes(function):
+    """Flushes the sink when the outermost decorated call returns, i.e. once per command or menu."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_depth, 'value', 0)
+        _depth.value = depth + 1
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _depth.value = depth
+            if depth == 0:
+                get_output().flush()
+    return wrapper
@@ -0,0 +1,88 @@
+import shlex
+import inspect
+import pandas as pd
+from app import storage
+from app.cancellation import check_cancelled
+from app.output import echo
+from app.logger import get_logger
+
+log = get_logger('pipeline')
+
+def save(data, path, file_format=None):
+    """Built-in stage: writes the frame (any storage format) and passes it on unchanged."""
+    written = storage.write_frame(as_frame(data), path, file_format)
+    echo(f"Saved {len(data)} rows to '{written}'")
+    return data
+
+def head(data, count='10'):
+    """Built-in stage: keeps the first rows."""
+    return as_frame(data).head(int(count))
+
+STAGES = {'save': save, 'head': head}
+
+def as_frame(data):
+    if isinstance(data, pd.DataFrame):
+        return data
+    if data is None:
+        raise ValueError("This stage needs input from a previous stage")
+    return pd.DataFrame(data)
+
+def parse_pipeline(text):
+    """Splits 'csv | calc mul Population 2 | save out.parquet' into [(stage, [args]), ...]."""
+    stages = []
+    for part in text.split('|'):
+        words = shlex.split(part)
+        if not words:
+            raise ValueError("Empty pipeline stage")
+        stages.append((words[0].lower(), words[1:]))
+    return stages
+
+def usage(name, stage):
+    """'calc <key> <column> [operand] [result_column]', built from the stage's signature."""
+    words = [name]
+    for parameter in list(inspect.signature(stage).parameters.values())[1:]:  # The first one is the data
+        if parameter.kind is parameter.VAR_POSITIONAL:
+            words.append(f"[{parameter.name} ...]")
+        elif parameter.default is parameter.empty:
+            words.append(f"<{parameter.name}>")
+        else:
+            words.append(f"[{parameter.name}]")
+    return ' '.join(words)
+
+def check_arguments(name, stage, args):
+    """Raises ValueError with the stage's usage when it is given too few or too many arguments."""
+    try:
+        inspect.signature(stage).bind(None, *args)
+    except TypeError:
+        raise ValueError(f"Wrong arguments for stage '{name}'; usage: {usage(name, stage)}") from None
+
+class Pipeline:
+    """Runs stages in-process, handing each stage's in-memory output straight to the next one."""
+
+    def __init__(self, command_handler):
+        self.command_handler = command_handler
+
+    def resolve(self, name):
+        """Returns the stage callable for an exact or unambiguous prefix name (e.g. 'calc')."""
+        commands = self.command_handler.commands
+        if name in STAGES:
+            return STAGES[name]
+        if name in commands:
+            return commands[name].run
+        matches = sorted(command for command in commands if command.startswith(name))
+        if len(matches) == 1:
+            return commands[matches[0]].run
+        if matches:
+            raise ValueError(f"Ambiguous pipeline stage '{name}': {', '.join(matches)}")
+        raise ValueError(f"Unknown pipeline stage '{name}'")
+
+    def run(self, text):
+        stages = [(name, self.resolve(name), args) for name, args in parse_pipeline(text)]
+        for name, stage, args in stages:
+            check_arguments(name, stage, args)  # Before any stage runs, so a typo costs nothing
+        data = None
+        for name, stage, args in stages:
+            check_cancelled()
+            log.info("Running pipeline stage %s %s", name, args)
+            data = stage(data, *args)
+        return data
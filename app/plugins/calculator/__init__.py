@@ -1,56 +1,272 @@
 import pkgutil
+import inspect
 import importlib
-import logging
+from abc import abstractmethod
+import numpy as np
 from app.commands import Command
+from app.cancellation import check_cancelled
+from app.settings import get_settings
+from app.journal import RowStore, Append
+from app.plugins.calculator.expression import ArrayExpression
+from app.output import echo, prompt, flushes
+from app.logger import get_logger
 
-class CalculatorCommand(Command):
-    def __init__(self, plugins_package='app.plugins.calculator'):
-        self.plugins_package = plugins_package
-        self.operations = self.load_operations()
+log = get_logger('calculator')
 
-    def load_operations(self):
-        operations = {}
-        plugin_paths = [self.plugins_package.replace('.', '/')]
+class Operation(Command):
+    """Base class for calculator operations, declaring how they are looked up and computed."""
+    symbol = None  # e.g. '+', used in expressions such as '2 + 3'
+    name = None  # e.g. 'add'
+    aliases = ()
+    arity = 2
+    elementwise = True  # Applies value by value, so it can run over columns, chunks and formulas
+    label = None  # Noun used when logging the result, e.g. 'Addition'
+
+    @abstractmethod
+    def compute(self, *operands, out=None):
+        """
+        Vectorized implementation: takes scalars or NumPy arrays and returns the same shape. When out
+        is given the result is written there (it may be one of the operands) and out is returned.
+        """
+
+    def check(self, *operands):
+        """Returns a message when the operands cannot be computed interactively, otherwise None."""
+        return None
+
+    def read_operands(self):
+        if self.arity == 1:
+            return [float(prompt("Enter a number: "))]
+        return [float(prompt("Enter first number: ")), float(prompt("Enter second number: "))]
+
+    @flushes
+    def calculate(self, *operands):
+        message = self.check(*operands)
+        if message:
+            echo(message)
+            return None
+        result = self.compute(*operands)
+        if np.ndim(result) == 0:
+            result = float(result)
+        echo(f"The result is {result}")
+        log.info("%s result: %s", self.label or self.__class__.__name__, result)
+        return result
+
+    def execute(self):
+        log.info("Executing %s command.", self.__class__.__name__)
+        return self.calculate(*self.read_operands())
+
+class OperationRegistry:
+    """Dispatch table of calculator operations with constant-time lookup by symbol, name or alias."""
+
+    def __init__(self):
+        self.__operations = {}  # name -> operation, in registration order
+        self.__lookup = {}
+        self.version = 0
+
+    @staticmethod
+    def keys_for(operation):
+        name = getattr(operation, 'name', None) or operation.__class__.__name__.lower()
+        keys = [name, getattr(operation, 'symbol', None), *getattr(operation, 'aliases', ())]
+        return name, [key.lower() for key in keys if isinstance(key, str) and key]
+
+    def register(self, operation):
+        name, keys = self.keys_for(operation)
+        previous = self.__operations.get(name)
+        if previous is not None:
+            self.__lookup = {key: op for key, op in self.__lookup.items() if op is not previous}
+        for key in keys:
+            if key in self.__lookup:
+                log.warning("Calculator key '%s' of %s shadows %s", key, name, self.keys_for(self.__lookup[key])[0])
+            self.__lookup[key] = operation
+        self.__operations[name] = operation
+        self.version += 1
+
+    def get(self, key):
+        return self.__lookup.get(str(key).strip().lower())
+
+    def evaluate(self, key, *operands, out=None):
+        operation = self.get(key)
+        if operation is None:
+            raise KeyError(f"Unknown operation: {key}")
+        if out is None:
+            return operation.compute(*operands)  # Plugins written before out= existed still work
+        return operation.compute(*operands, out=out)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return iter(list(self.__operations.values()))
+
+    def __len__(self):
+        return len(self.__operations)
+
+    @classmethod
+    def discover(cls, plugins_package='app.plugins.calculator'):
+        """Builds a registry from every operation module in the calculator plugin package."""
+        operations = cls()
+        plugin_paths = [plugins_package.replace('.', '/')]
         found_plugins = pkgutil.iter_modules(plugin_paths)
         # Sort plugins by name to ensure consistent order
         sorted_plugins = sorted(found_plugins, key=lambda x: x[1])
-        for index, (finder, name, ispkg) in enumerate(sorted_plugins, start=1):
+        for finder, name, ispkg in sorted_plugins:
             if ispkg:
                 continue  # Skip sub-packages
             try:
-                plugin_module = importlib.import_module(f"{self.plugins_package}.{name}")
+                plugin_module = importlib.import_module(f"{plugins_package}.{name}")
                 for attribute_name in dir(plugin_module):
                     attribute = getattr(plugin_module, attribute_name)
-                    if issubclass(attribute, Command) and attribute is not Command:
-                        # Use numeric keys for operations based on their sorted order
-                        operations[str(index)] = attribute()
-                logging.info(f"Loaded calculator plugin: {name}")
+                    if (isinstance(attribute, type) and issubclass(attribute, Command)
+                            and not inspect.isabstract(attribute)
+                            and attribute.__module__ == plugin_module.__name__):
+                        # Operations declare their own symbol and name, so no positional keys are needed
+                        operations.register(attribute())
+                log.info("Loaded calculator plugin: %s", name)
             except (ImportError, TypeError) as e:
                 if str(e) == "issubclass() arg 1 must be a class":
                     continue  # Ignore this specific TypeError
                 else:
-                    logging.error(f"Error loading calculator plugin {name}: {e}")
-                    print(f"Error loading plugin {name}: {e}")  # Retain print for user feedback
+                    log.error("Error loading calculator plugin %s: %s", name, e)
+                    echo(f"Error loading plugin {name}: {e}")  # Retain print for user feedback
                     raise
         return operations
 
+class CalculatorCommand(Command):
+    BACK_KEYS = ('back', 'b')
+
+    def __init__(self, plugins_package='app.plugins.calculator'):
+        self.plugins_package = plugins_package
+        self.operations = self.load_operations()
+        settings = get_settings()
+        # (calculation, result) rows of this session; undo and redo step through them as deltas
+        self.results = RowStore(settings.history_records, journal_limit=settings.undo_limit)
+
+    @property
+    def operations(self):
+        return self.__operations
+
+    @operations.setter
+    def operations(self, operations):
+        # Swapping the table (e.g. on hot-reload) invalidates the rendered menu
+        self.__operations = operations
+        self.__menu = (None, '')
+
+    def load_operations(self):
+        return OperationRegistry.discover(self.plugins_package)
+
+    def render_menu(self):
+        """Returns the operations menu, formatted once per version of the operation table."""
+        version, menu = self.__menu
+        if version != self.operations.version:
+            lines = [f"{getattr(operation, 'symbol', None) or '':<3}{operation.__class__.__name__}\n" for operation in self.operations]
+            menu = ("\nCalculator Operations:\n" + ''.join(lines) + "back Back\n"
+                    "Enter a symbol or name, an expression such as '2 + 3', 'undo', 'redo', 'results' or 'back'.\n")
+            self.__menu = (self.operations.version, menu)
+        return menu
+
+    @flushes
+    def evaluate_expression(self, expression):
+        """Evaluates an infix expression such as '2 ^ 8'; returns False if the text is not one."""
+        parts = expression.split()
+        if len(parts) != 3:
+            return self.evaluate_formula(expression)
+        operation = self.operations.get(parts[1])
+        if operation is None or getattr(operation, 'arity', 2) != 2:
+            return False
+        try:
+            a, b = float(parts[0]), float(parts[2])
+        except ValueError:
+            return False
+        log.info("Evaluating calculator expression: %s", expression)
+        self.record(expression, operation.calculate(a, b))
+        return True
+
+    def evaluate_formula(self, text):
+        """Evaluates a longer numeric formula such as '2 + 3 * (4 - 1)'; returns False if the text is not one."""
+        try:
+            expression = ArrayExpression(text, self.operations)
+        except ValueError:
+            return False
+        if expression.variables or not expression.program:
+            return False
+        result = float(expression.evaluate({})[0])
+        log.info("Evaluated calculator formula: %s = %s", text, result)
+        echo(f"The result is {result}")
+        self.record(text, result)
+        return True
+
+    def record(self, calculation, result):
+        """Adds a result to the session's results; failed calculations (None) are not kept."""
+        if result is not None:
+            self.results.journal.apply(Append(self.results, (calculation, result)))
+
+    def show_results(self):
+        if not self.results.rows:
+            echo("No results yet.")
+        for index, (calculation, result) in enumerate(self.results.rows, start=1):
+            echo(f"{index}. {calculation} = {result}")
+
+    def step(self, direction):
+        """Undoes or redoes the latest recorded result."""
+        journal = self.results.journal
+        change = journal.undo() if direction == 'undo' else journal.redo()
+        if change is None:
+            echo(f"Nothing to {direction}.")
+            return
+        calculation, result = change.row
+        echo(f"{'Undone' if direction == 'undo' else 'Redone'}: {calculation} = {result}")
+
+    def run(self, data, key, column, operand=None, result_column=None):
+        """
+        Pipeline stage applying an operation to a whole column in one vectorized call, e.g.
+        'calc mul Population 2'. The operand is a number or another column; the result overwrites
+        column unless result_column is given. The incoming frame is updated in place, not copied.
+        'calc eval Total "(Population * 2 + GDP) / 3"' evaluates a whole formula as one fused pass.
+        """
+        if key == 'eval':
+            if data is None or operand is None:
+                raise ValueError("Usage: calc eval <result column> \"<expression>\"")
+            expression = ArrayExpression(operand, self.operations)
+            data[column] = expression.evaluate({name: data[name].to_numpy(dtype=float)
+                                                for name in expression.variables if name in data})
+            return data
+        operation = self.operations.get(key)
+        if operation is None:
+            raise ValueError(f"Unknown operation: {key}")
+        if not getattr(operation, 'elementwise', True):
+            raise ValueError(f"{operation.__class__.__name__} does not apply to a column value by value")
+        if data is None or column not in data:
+            raise ValueError(f"The calculator stage needs a previous stage with a '{column}' column")
+        operands = [data[column].to_numpy(dtype=float)]
+        if getattr(operation, 'arity', 2) == 2:
+            if operand is None:
+                raise ValueError(f"{operation.__class__.__name__} needs an operand")
+            operands.append(data[operand].to_numpy(dtype=float) if operand in data else float(operand))
+        with np.errstate(all='ignore'):
+            data[result_column or column] = operation.compute(*operands)
+        return data
+
     def execute(self):
         while True:
-            print("\nCalculator Operations:")
-            for key in sorted(self.operations.keys(), key=int):
-                print(f"{key}. {self.operations[key].__class__.__name__}")
-            print("5. Back")
-
-            choice = input("Select an operation: ")
-            if choice == '5':
-                logging.info("User selected to go back from CalculatorCommand.")
+            check_cancelled()
+            echo(self.render_menu(), end='')
+
+            choice = prompt("Select an operation: ").strip()
+            if choice.lower() in self.BACK_KEYS:
+                log.info("User selected to go back from CalculatorCommand.")
                 break  # Exit to the main menu
 
+            if choice.lower() in ('undo', 'redo'):
+                self.step(choice.lower())
+                continue
+            if choice.lower() == 'results':
+                self.show_results()
+                continue
+
             operation = self.operations.get(choice)
             if operation:
-                logging.info(f"Executing calculator operation: {operation.__class__.__name__}")
-                operation.execute()
-            else:
-                logging.warning("Invalid selection in CalculatorCommand.")
-                print("Invalid selection. Please try again.")
-                
\ No newline at end of file
+                log.info("Executing calculator operation: %s", operation.__class__.__name__)
+                self.record(operation.label or operation.__class__.__name__, operation.execute())
+            elif not self.evaluate_expression(choice):
+                log.warning("Invalid selection in CalculatorCommand.")
+                echo("Invalid selection. Please try again.")
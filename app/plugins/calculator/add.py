@@ -1,11 +1,11 @@
-import logging
-from app.commands import Command
+import numpy as np
+from app.plugins.calculator import Operation
 
-class Add(Command):
-    def execute(self):
-        logging.info("Executing Add command.")
-        a = float(input("Enter first number: "))
-        b = float(input("Enter second number: "))
-        result = a + b
-        print(f"The result is {result}")
-        logging.info(f"Addition result: {result}")
\ No newline at end of file
+class Add(Operation):
+    symbol = '+'
+    name = 'add'
+    aliases = ('plus',)
+    label = 'Addition'
+
+    def compute(self, a, b, out=None):
+        return np.add(a, b, out=out)
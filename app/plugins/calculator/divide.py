@@ -1,17 +1,29 @@
-import logging
-from app.commands import Command
+import numpy as np
+from app.plugins.calculator import Operation
+from app.logger import get_logger
 
-class Divide(Command):
-    def execute(self):
-        logging.info("Executing Divide command.")
-        a = float(input("Enter first number: "))
-        b = float(input("Enter second number: "))
-        
+log = get_logger('calculator')
+
+class Divide(Operation):
+    symbol = '/'
+    name = 'divide'
+    aliases = ('div',)
+    label = 'Division'
+
+    def check(self, a, b):
         # Look Before You Leap (LBYL)
-        if b == 0: # Check before leaping
-            logging.warning("Attempted division by zero.")
-            print("Cannot divide by zero. Please enter a valid second number.")
-        else:
-            result = a / b # No exception thrown, check performed beforehand
-            print(f"The result is {result}")
-            logging.info(f"Division result: {result}")
\ No newline at end of file
+        if np.any(np.asarray(b) == 0): # Check before leaping
+            log.warning("Attempted division by zero.")
+            return "Cannot divide by zero. Please enter a valid second number."
+        return None
+
+    def compute(self, a, b, out=None):
+        # Vectorized callers get NaN where the divisor is zero instead of an exception
+        a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+        if out is None:
+            return np.divide(a, b, out=np.full(np.broadcast(a, b).shape, np.nan), where=b != 0)
+        zero = b == 0  # Taken before writing, since out may be b itself
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(a, b, out=out)
+        np.copyto(out, np.nan, where=zero)
+        return out
@@ -0,0 +1,160 @@
+import re
+import inspect
+import numpy as np
+from app.cancellation import check_cancelled
+
+L2_CACHE_BYTES = 1 << 20  # Chunks are sized so every array touched per chunk fits in a typical L2
+MIN_CHUNK = 1024
+TOKEN_PATTERN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*)|(\*\*|.))')
+# 'neg' is unary minus: it binds tighter than * but looser than ^, so -a^2 is -(a^2) as in Python
+PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '%': 2, 'neg': 2.5, '^': 3, '**': 3}
+RIGHT_ASSOCIATIVE = ('^', '**')
+
+def tokenize(text):
+    """Splits an expression into numbers, names, operator symbols and parentheses."""
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(('const', float(number)))
+        elif name is not None:
+            tokens.append(('var', name))
+        elif symbol.strip():
+            tokens.append(('op', symbol))
+        position = match.end()
+    return tokens
+
+def to_postfix(tokens):
+    """Shunting-yard conversion; a leading or post-operator '-' is read as 0 - x."""
+    output, stack = [], []
+    previous = None
+    for kind, value in tokens:
+        if kind in ('const', 'var'):
+            output.append((kind, value))
+        elif value == '(':
+            stack.append(value)
+        elif value == ')':
+            while stack and stack[-1] != '(':
+                output.append(('op', stack.pop()))
+            if not stack:
+                raise ValueError("Unbalanced parentheses")
+            stack.pop()
+        elif value in PRECEDENCE:
+            if value == '-' and (previous is None or previous[0] == 'op' and previous[1] != ')'):
+                output.append(('const', 0.0))
+                value = 'neg'
+            while (stack and stack[-1] in PRECEDENCE and value != 'neg'
+                   and (PRECEDENCE[stack[-1]] > PRECEDENCE[value]
+                        or PRECEDENCE[stack[-1]] == PRECEDENCE[value] and value not in RIGHT_ASSOCIATIVE)):
+                output.append(('op', stack.pop()))
+            stack.append(value)
+        else:
+            raise ValueError(f"Unexpected '{value}' in expression")
+        previous = (kind, value)
+    while stack:
+        operator = stack.pop()
+        if operator == '(':
+            raise ValueError("Unbalanced parentheses")
+        output.append(('op', operator))
+    return output
+
+def accepts_out(operation):
+    """Operations from before out= existed are still usable, at the cost of a temporary per chunk."""
+    return 'out' in inspect.signature(operation.compute).parameters
+
+class ArrayExpression:
+    """
+    An infix formula over named arrays (e.g. '(Population * 2 + GDP) / 3') compiled to a short
+    program of calculator operations. Evaluation walks the inputs in cache-sized chunks and writes
+    every intermediate into a few preallocated scratch buffers through the operations' out=
+    parameter, so no full-size temporaries are allocated; the result goes straight into out.
+    """
+
+    def __init__(self, text, registry, cache_bytes=L2_CACHE_BYTES):
+        self.text = text
+        self.cache_bytes = cache_bytes
+        postfix = to_postfix(tokenize(text))
+        self.variables = sorted({value for kind, value in postfix if kind == 'var'})
+        self.program, self.result, self.buffers = self.compile(postfix, registry)
+
+    @staticmethod
+    def compile(postfix, registry):
+        """
+        Returns (instructions, result, buffer count). Each instruction is (operation, left, right, buffer,
+        whether compute takes out=);
+        operands are ('const', x), ('var', name) or ('reg', i). A buffer is reused as soon as its value
+        has been consumed, so the count is the expression's maximum live intermediates.
+        """
+        stack, program, free = [], [], []
+        buffers = 0
+        for kind, value in postfix:
+            if kind != 'op':
+                stack.append((kind, value))
+                continue
+            operation = registry.get('-' if value == 'neg' else value)
+            if operation is None or not getattr(operation, 'elementwise', True) or len(stack) < 2:
+                raise ValueError(f"Invalid expression near '{value}'")
+            right, left = stack.pop(), stack.pop()
+            for operand in (left, right):
+                if operand[0] == 'reg':
+                    free.append(operand[1])
+            if free:
+                register = free.pop()
+            else:
+                register, buffers = buffers, buffers + 1
+            program.append((operation, left, right, register, accepts_out(operation)))
+            stack.append(('reg', register))
+        if len(stack) != 1:
+            raise ValueError("Invalid expression")
+        return program, stack[0], buffers
+
+    def chunk_size(self, inputs):
+        """Elements per chunk such that inputs, scratch buffers and output together fit the cache."""
+        arrays = inputs + self.buffers + 1
+        return max(MIN_CHUNK, self.cache_bytes // (8 * arrays))
+
+    def evaluate(self, variables, out=None):
+        """
+        Evaluates over variables (name -> array or scalar, all arrays the same length) into out,
+        which is allocated when not given, and returns it.
+        """
+        missing = [name for name in self.variables if name not in variables]
+        if missing:
+            raise KeyError(f"Unknown variable(s): {', '.join(missing)}")
+        arrays = {name: np.asarray(variables[name], dtype=float) for name in self.variables}
+        length = max((array.size for array in arrays.values() if array.ndim), default=1)
+        if out is None:
+            out = np.empty(length)
+        if not self.program:
+            kind, value = self.result
+            out[...] = arrays[value] if kind == 'var' else value
+            return out
+
+        chunk = self.chunk_size(sum(1 for array in arrays.values() if array.ndim))
+        scratch = [np.empty(min(chunk, length)) for _ in range(self.buffers)]
+        last = len(self.program) - 1
+        for start in range(0, length, chunk):
+            check_cancelled()
+            stop = min(start + chunk, length)
+            size = stop - start
+            registers = [buffer[:size] for buffer in scratch]
+
+            def operand(reference):
+                kind, value = reference
+                if kind == 'const':
+                    return value
+                if kind == 'reg':
+                    return registers[value]
+                array = arrays[value]
+                return array[start:stop] if array.ndim else array  # Slices are views, never copies
+
+            for index, (operation, left, right, register, writes_out) in enumerate(self.program):
+                target = out[start:stop] if index == last else registers[register]
+                if writes_out:
+                    operation.compute(operand(left), operand(right), out=target)
+                else:
+                    target[...] = operation.compute(operand(left), operand(right))
+        return out
@@ -0,0 +1,111 @@
+import os
+import numpy as np
+import pandas as pd
+from app.plugins.calculator import Operation
+from app.output import echo, prompt
+
+def parse_matrix(text):
+    """
+    Reads a vector or matrix typed inline ('1 2 3', or '1, 2; 3, 4' with ';' between rows) or
+    loaded from a CSV file of numbers (a header row is skipped).
+    """
+    text = text.strip()
+    if os.path.isfile(text):
+        frame = pd.read_csv(text, header=None)
+        try:
+            return frame.to_numpy(dtype=float)
+        except ValueError:
+            return frame.iloc[1:].to_numpy(dtype=float)
+    rows = [row.replace(',', ' ').split() for row in text.split(';') if row.strip()]
+    if not rows or len({len(row) for row in rows}) != 1:
+        raise ValueError(f"Not a vector or matrix: '{text}'")
+    matrix = np.array(rows, dtype=float)
+    return matrix[0] if len(rows) == 1 else matrix
+
+class MatrixOperation(Operation):
+    """Linear-algebra operations: whole vectors or matrices in, handed to NumPy's BLAS/LAPACK routines."""
+    elementwise = False
+
+    def read_operands(self):
+        labels = ["Enter a vector or matrix"] if self.arity == 1 else ["Enter the first matrix", "Enter the second matrix"]
+        operands = []
+        for label in labels:
+            while True:
+                try:
+                    operands.append(parse_matrix(prompt(f"{label} ('1 2; 3 4' or a CSV path): ")))
+                    break
+                except (OSError, ValueError) as e:
+                    echo(e)
+        return operands
+
+    def check(self, *operands):
+        if any(np.ndim(operand) == 0 for operand in operands):
+            return f"{self.label} needs vectors or matrices, e.g. '1 2; 3 4'."
+        return self.shape_error(*[np.asarray(operand) for operand in operands])
+
+    def shape_error(self, *operands):
+        """Returns a message when the shapes do not fit together, otherwise None."""
+        return None
+
+class Dot(MatrixOperation):
+    name = 'dot'
+    label = 'Dot product'
+
+    def shape_error(self, a, b):
+        if a.shape[-1] != b.shape[0]:
+            return f"Cannot take the dot product of shapes {a.shape} and {b.shape}."
+        return None
+
+    def compute(self, a, b, out=None):
+        return np.dot(a, b, out=out)
+
+class MatMul(Dot):
+    symbol = '@'
+    name = 'matmul'
+    aliases = ('mmul',)
+    label = 'Matrix product'
+
+    def compute(self, a, b, out=None):
+        return np.matmul(a, b, out=out)
+
+class Solve(MatrixOperation):
+    symbol = '\\'
+    name = 'solve'
+    label = 'Solution'
+
+    def shape_error(self, a, b):
+        if a.ndim != 2 or a.shape[0] != a.shape[1]:
+            return f"The coefficient matrix must be square, not {a.shape}."
+        if b.shape[0] != a.shape[0]:
+            return f"The right-hand side needs {a.shape[0]} rows, not {b.shape[0]}."
+        if np.linalg.matrix_rank(a) < a.shape[0]:
+            return "The coefficient matrix is singular."
+        return None
+
+    def compute(self, a, b, out=None):
+        result = np.linalg.solve(a, b)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+class Transpose(MatrixOperation):
+    name = 'transpose'
+    aliases = ('t',)
+    arity = 1
+    label = 'Transpose'
+
+    def compute(self, a, out=None):
+        result = np.transpose(a)  # A view; nothing is copied unless out is given
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+class Norm(MatrixOperation):
+    name = 'norm'
+    arity = 1
+    label = 'Norm'
+
+    def compute(self, a):
+        return np.linalg.norm(a)  # Euclidean for vectors, Frobenius for matrices
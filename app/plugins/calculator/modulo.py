@@ -0,0 +1,27 @@
+import numpy as np
+from app.plugins.calculator import Operation
+from app.logger import get_logger
+
+log = get_logger('calculator')
+
+class Modulo(Operation):
+    symbol = '%'
+    name = 'modulo'
+    aliases = ('mod',)
+    label = 'Modulo'
+
+    def check(self, a, b):
+        if np.any(np.asarray(b) == 0):
+            log.warning("Attempted modulo by zero.")
+            return "Cannot take a modulo by zero. Please enter a valid second number."
+        return None
+
+    def compute(self, a, b, out=None):
+        a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+        if out is None:
+            return np.mod(a, b, out=np.full(np.broadcast(a, b).shape, np.nan), where=b != 0)
+        zero = b == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.mod(a, b, out=out)
+        np.copyto(out, np.nan, where=zero)
+        return out
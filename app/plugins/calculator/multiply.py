@@ -1,11 +1,11 @@
-import logging
-from app.commands import Command
+import numpy as np
+from app.plugins.calculator import Operation
 
-class Multiply(Command):
-    def execute(self):
-        logging.info("Executing Multiply command.")
-        a = float(input("Enter first number: "))
-        b = float(input("Enter second number: "))
-        result = a * b
-        print(f"The result is {result}")
-        logging.info(f"Multiplication result: {result}")
\ No newline at end of file
+class Multiply(Operation):
+    symbol = '*'
+    name = 'multiply'
+    aliases = ('mul', 'times')
+    label = 'Multiplication'
+
+    def compute(self, a, b, out=None):
+        return np.multiply(a, b, out=out)
@@ -0,0 +1,13 @@
+import numpy as np
+from app.plugins.calculator import Operation
+
+class Power(Operation):
+    symbol = '^'
+    name = 'power'
+    aliases = ('pow', '**')
+    label = 'Exponentiation'
+
+    def compute(self, a, b, out=None):
+        if np.ndim(b) == 0 and b == 2:
+            return np.square(np.asarray(a, dtype=float), out=out)  # Same fast path as NumPy's ** 2
+        return np.power(np.asarray(a, dtype=float), b, out=out)
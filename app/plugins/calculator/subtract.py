@@ -1,11 +1,11 @@
-import logging
-from app.commands import Command
+import numpy as np
+from app.plugins.calculator import Operation
 
-class Subtract(Command):
-    def execute(self):
-        logging.info("Executing Subtract command.")
-        a = float(input("Enter first number: "))
-        b = float(input("Enter second number: "))
-        result = a - b
-        print(f"The result is {result}")
-        logging.info(f"Subtraction result: {result}")
\ No newline at end of file
+class Subtract(Operation):
+    symbol = '-'
+    name = 'subtract'
+    aliases = ('sub', 'minus')
+    label = 'Subtraction'
+
+    def compute(self, a, b, out=None):
+        return np.subtract(a, b, out=out)
@@ -1,60 +1,324 @@
-import logging
 import os
+import re
+import io
+import csv
+import copy
+import json
+import hashlib
+from app import storage
 from app.commands import Command
+from app.cancellation import check_cancelled
+import numpy as np
 import pandas as pd
+from app.output import echo
+from app.logger import get_logger
 
+log = get_logger('csv')
+
+FILTER_PATTERN = re.compile(r'^\s*(.+?)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*$')
+FILTER_OPERATORS = {
+    '==': lambda column, value: column == value,
+    '!=': lambda column, value: column != value,
+    '<': lambda column, value: column < value,
+    '<=': lambda column, value: column <= value,
+    '>': lambda column, value: column > value,
+    '>=': lambda column, value: column >= value,
+}
+
+SUFFIX_PATTERN = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([KMBT]?)\s*$', re.IGNORECASE)
+SUFFIX_MULTIPLIERS = {'': 1.0, 'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+
+def parse_suffixed(values):
+    """
+    Converts a column of strings such as '3.1T' or '450M' into floats; unparseable values become NaN.
+    Each distinct string is parsed once and broadcast back with NumPy, so repeated values cost nothing.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    codes, uniques = pd.factorize(values)
+    parts = pd.Series(uniques, dtype=str).str.extract(SUFFIX_PATTERN)
+    multipliers = parts[1].str.upper().map(SUFFIX_MULTIPLIERS)
+    parsed = (pd.to_numeric(parts[0], errors='coerce') * multipliers).to_numpy(dtype=float)
+    # factorize marks missing values with -1, which must not pick up the last unique
+    result = np.where(codes >= 0, parsed[codes] if len(parsed) else np.nan, np.nan)
+    return pd.Series(result, index=values.index, name=values.name)
+
+MANIFEST_SUFFIX = '.manifest.json'
+HASH_BLOCK_SIZE = 1 << 20
+
+def file_digests(path, prefix_size):
+    """
+    Hashes a file in one pass, returning the SHA-256 of its first prefix_size bytes, of the whole
+    file, and whether the file ends with a newline.
+    """
+    hasher = hashlib.sha256()
+    last_byte = b''
+    with open(path, 'rb') as handle:
+        remaining = prefix_size
+        while remaining > 0:
+            check_cancelled()
+            block = handle.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break  # The file is shorter than the prefix
+            hasher.update(block)
+            remaining -= len(block)
+            last_byte = block[-1:]
+        prefix_digest = hasher.hexdigest() if remaining <= 0 else None
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b''):
+            check_cancelled()
+            hasher.update(block)
+            last_byte = block[-1:]
+    return prefix_digest, hasher.hexdigest(), last_byte == b'\n'
+
+def parse_filter(expression):
+    """Parses a row filter such as 'Population>10000000' into a (column, operator, value) tuple."""
+    match = FILTER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Invalid filter: '{expression}'")
+    column, operator, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        if SUFFIX_PATTERN.match(value):
+            value = float(parse_suffixed([value]).iloc[0])  # e.g. 'GDP>1T'
+        else:
+            value = value.strip('\'"')
+    return column, operator, value
 
 class CsvCommand(Command):
-    def __init__(self):
-        """This constructor initializes with private properties, that are needed for CSV"""
-        self.__data_dir = './data'
-        self.__input_file_path = './data/gpt_states.csv'
-        self.__output_file_path = './data/sorted_states.csv'
-        self.__sort_by = 'State Name'
-        self.__columns_to_keep = ['State Abbreviation', 'State Name', 'Population','Capital','GDP']
+    def __init__(self, input_path='./data/gpt_states.csv', output_path='./data/sorted_states.csv',
+                 columns=None, filters=None, sort_by='State Name', ascending=True, dtypes=None, chunksize=None,
+                 numeric_columns=('GDP',), output_format=None):
+        """
+        Configures the pipeline: columns is the projection, filters are row predicates given as
+        'Column>value' strings or (column, operator, value) tuples, sort_by may be one or several columns.
+        numeric_columns hold suffixed numbers ('3.1T') that are parsed to floats at load time.
+        output_format is one of csv, csv.gz, csv.zst, parquet or feather (default: implied by output_path).
+        """
+        self.input_path = input_path
+        self.output_path = output_path
+        self.data_dir = os.path.dirname(output_path) or '.'
+        self.columns = list(columns or ['State Abbreviation', 'State Name', 'Population', 'Capital', 'GDP'])
+        self.filters = [parse_filter(f) if isinstance(f, str) else tuple(f) for f in filters or []]
+        self.sort_by = [sort_by] if isinstance(sort_by, str) else list(sort_by)
+        self.ascending = ascending
+        self.dtypes = dict(dtypes or {})
+        self.chunksize = chunksize
+        self.numeric_columns = list(numeric_columns or [])
+        self.output_format = output_format
+        self.manifest_path = f"{output_path}{MANIFEST_SUFFIX}"
+
+    def reader_options(self):
+        """Pushes the projection and dtype hints into the reader so unused columns are never parsed."""
+        needed = list(dict.fromkeys(self.columns + self.sort_by + [column for column, _, _ in self.filters]))
+        options = {'usecols': needed}
+        dtypes = {column: dtype for column, dtype in self.dtypes.items() if column in needed}
+        if dtypes:
+            options['dtype'] = dtypes
+        return options
+
+    def parse_numeric(self, df):
+        for column in self.numeric_columns:
+            if column in df.columns:
+                df[column] = parse_suffixed(df[column])
+        return df
+
+    def apply_filters(self, df):
+        for column, operator, value in self.filters:
+            df = df[FILTER_OPERATORS[operator](df[column], value)]
+        return df
+
+    def read_frame(self):
+        """
+        Reads only the needed columns. Parquet and Feather inputs load those columns without parsing;
+        for CSV without chunking the pyarrow engine is used when available, and with chunking each
+        chunk is filtered as it is read so discarded rows are never accumulated.
+        """
+        options = self.reader_options()
+        input_format = storage.detect_format(self.input_path)
+        if input_format in ('parquet', 'feather'):
+            df = storage.read_frame(self.input_path, columns=options['usecols'])
+            return self.apply_filters(self.parse_numeric(df))
+        if self.chunksize is None:
+            if storage.PYARROW_AVAILABLE:
+                options['engine'] = 'pyarrow'
+            return self.apply_filters(self.parse_numeric(storage.read_frame(self.input_path, **options)))
+        chunks = []
+        for chunk in storage.read_frame(self.input_path, chunksize=self.chunksize, **options):
+            check_cancelled()  # Between chunks, so a cancelled or timed-out run stops promptly
+            chunks.append(self.apply_filters(self.parse_numeric(chunk)))
+        if not chunks:
+            return pd.DataFrame(columns=options['usecols'])
+        return pd.concat(chunks, ignore_index=True)
 
     def read_sort_and_reduce(self):
         """
-        Reads the CSV file, sorts it by the specified column, and reduces it to specified columns.
+        Reads the CSV file, filters and sorts it by the configured columns, and reduces it to the projection.
         """
         try:
-            df = pd.read_csv(self.__input_file_path)
-            sorted_df = df.sort_values(by=self.__sort_by)
-            reduced_df = sorted_df[self.__columns_to_keep]
+            df = self.read_frame()
+            sorted_df = df.sort_values(by=self.sort_by, ascending=self.ascending, kind='stable')
+            reduced_df = sorted_df[self.columns]
             return reduced_df
         except Exception as e:
-            logging.error(f"Error processing the file: {e}")
+            log.error("Error processing the file: %s", e)
+            return None
+
+    def run(self, data, *filters):
+        """
+        Pipeline stage: returns the processed frame from memory without writing the output file.
+        Arguments are extra filters such as 'GDP>1T'; given a frame from a previous stage, only filters it.
+        """
+        stage = self
+        if filters:
+            stage = copy.copy(self)
+            stage.filters = self.filters + [parse_filter(f) for f in filters]
+        if data is not None:
+            return stage.apply_filters(data)
+        df = stage.read_sort_and_reduce()
+        if df is None:
+            raise ValueError(f"Could not process '{self.input_path}'")
+        return df.reset_index(drop=True)
+
+    def aggregate(self, columns=None, functions=('sum', 'mean', 'min', 'max')):
+        """
+        Returns a table of reductions (rows) per numeric column (columns) over the filtered data.
+        """
+        df = self.read_frame()
+        if columns is None:
+            columns = [column for column in self.columns if pd.api.types.is_numeric_dtype(df[column])]
+        return df[list(columns)].agg(list(functions))
+
+    def fingerprint(self):
+        """Identifies the configuration, since a cached output is only reusable for the same pipeline."""
+        return json.dumps({
+            'input_path': self.input_path,
+            'columns': self.columns,
+            'filters': self.filters,
+            'sort_by': self.sort_by,
+            'ascending': self.ascending,
+            'dtypes': self.dtypes,
+            'numeric_columns': self.numeric_columns,
+            'output_format': self.output_format,
+        }, sort_keys=True, default=str)
+
+    def load_manifest(self):
+        """Returns the sidecar manifest of the previous run if it still describes this pipeline."""
+        try:
+            with open(self.manifest_path) as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('fingerprint') != self.fingerprint() or not os.path.isfile(manifest.get('output_path', '')):
+            return None
+        return manifest
+
+    def save_manifest(self, output_path, stat, digest, ends_with_newline):
+        manifest = {
+            'fingerprint': self.fingerprint(),
+            'output_path': output_path,
+            'input_size': stat.st_size,
+            'input_mtime_ns': stat.st_mtime_ns,
+            'input_sha256': digest,
+            'ends_with_newline': ends_with_newline,
+        }
+        with storage.atomic_write(self.manifest_path) as handle:
+            json.dump(manifest, handle)
+
+    def merge_appended(self, manifest):
+        """
+        Processes only the rows appended since the previous run and merges them into its sorted output.
+        Returns None when the output cannot be extended (the sort keys were projected away).
+        """
+        cached = storage.read_frame(manifest['output_path'])
+        if not set(self.sort_by) <= set(cached.columns):
             return None
-    
+        with open(self.input_path, 'rb') as handle:
+            names = next(csv.reader([handle.readline().decode()]))
+            handle.seek(manifest['input_size'])
+            tail = handle.read()
+        new_rows = pd.read_csv(io.BytesIO(tail), header=None, names=names, **self.reader_options())
+        new_rows = self.apply_filters(self.parse_numeric(new_rows))
+        new_sorted = new_rows.sort_values(by=self.sort_by, ascending=self.ascending, kind='stable')[self.columns]
+        merged = pd.concat([cached, new_sorted], ignore_index=True)
+        # Both parts are already sorted runs, which a stable (merge-based) sort combines in linear time
+        return merged.sort_values(by=self.sort_by, ascending=self.ascending, kind='stable', ignore_index=True)
+
+    def process(self):
+        """
+        Produces the processed frame and returns (frame, status), where status is 'unchanged' when
+        the previous output was reused, 'appended' when only new rows were merged in, 'full' after a
+        complete run, or 'failed'.
+        """
+        manifest = self.load_manifest()
+        try:
+            stat = os.stat(self.input_path)
+        except OSError:
+            stat = None
+        if manifest and stat:
+            if (stat.st_size, stat.st_mtime_ns) == (manifest['input_size'], manifest['input_mtime_ns']):
+                return storage.read_frame(manifest['output_path']), 'unchanged'
+            if stat.st_size >= manifest['input_size'] and storage.detect_format(self.input_path) == 'csv':
+                prefix_digest, digest, ends_with_newline = file_digests(self.input_path, manifest['input_size'])
+                if prefix_digest == manifest['input_sha256']:
+                    if stat.st_size == manifest['input_size']:
+                        # Only the mtime moved; remember the new one so the next check is a plain stat
+                        self.save_manifest(manifest['output_path'], stat, digest, ends_with_newline)
+                        return storage.read_frame(manifest['output_path']), 'unchanged'
+                    merged = self.merge_appended(manifest) if manifest['ends_with_newline'] else None
+                    if merged is not None:
+                        self.output_path = storage.write_frame(merged, self.output_path, self.output_format)
+                        self.save_manifest(self.output_path, stat, digest, ends_with_newline)
+                        return merged, 'appended'
+
+        reduced_df = self.read_sort_and_reduce()
+        if reduced_df is None:
+            return None, 'failed'
+        self.output_path = storage.write_frame(reduced_df, self.output_path, self.output_format)
+        if stat is not None:
+            _, digest, ends_with_newline = file_digests(self.input_path, 0)
+            self.save_manifest(self.output_path, stat, digest, ends_with_newline)
+        return reduced_df.reset_index(drop=True), 'full'
+
     def execute(self):
         """
         Executes the command to read, sort, and save the reduced CSV file.
         """
-        if not os.path.exists(self.__data_dir):
-            os.makedirs(self.__data_dir)
-            logging.info(f"The directory '{self.__data_dir}' is created")
-        elif not os.access(self.__data_dir, os.W_OK):
-            logging.error(f"The directory '{self.__data_dir}' is not writable.")
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+            log.info("The directory '%s' is created", self.data_dir)
+        elif not os.access(self.data_dir, os.W_OK):
+            log.error("The directory '%s' is not writable.", self.data_dir)
+            return
+
+        df_read_states, status = self.process()
+        if status == 'unchanged':
+            log.info("Input '%s' unchanged, reusing '%s'", self.input_path, self.output_path)
+            echo(f"Input unchanged since the last run, using '{self.output_path}'")
+        elif status in ('full', 'appended'):
+            log.info("Processed data saved to '%s' (%s run)", self.output_path, status)
+            echo(f"Processed data saved to '{self.output_path}'")
+        elif os.path.exists(self.output_path):
+            df_read_states = storage.read_frame(self.output_path)  # Show the last good output
+        else:
             return
-        
-        reduced_df = self.read_sort_and_reduce()
-        if reduced_df is not None:
-            reduced_df.to_csv(self.__output_file_path, index=False)
-            logging.info(f"Processed data saved to '{self.__output_file_path}'")
-            print(f"Processed data saved to '{self.__output_file_path}'")
-        
-        df_read_states = pd.read_csv(self.__output_file_path)
 
         # Print and log each state nicely
-        print(f"States from CSV, sorted by {self.__sort_by}")
+        echo(f"States from CSV, sorted by {', '.join(self.sort_by)}")
+        label_columns = list(df_read_states.columns[:2])
+        log_records = log.enabled()  # Checked once, not for every field of every record
         for index, row in df_read_states.iterrows():
+            check_cancelled()
             # First, print and log the complete record for the state
-            state_info = f"{row['State Abbreviation']}: {row['State Name']}"
-            print(f"Record {index}: {state_info}")
-            logging.info(f"Record {index}: {state_info}")
+            state_info = ': '.join(str(row[column]) for column in label_columns)
+            echo(f"Record {index}: {state_info}")
+            if log_records:
+                log.info("Record %s: %s", index, state_info)
 
             # Then, iterate through each field in the row to print and log
             for field in row.index:
                 field_info = f"    {field}: {row[field]}"
-                print(field_info)
-                logging.info(f"Index: {index}, {field_info}")
\ No newline at end of file
+                echo(field_info)
+                if log_records:
+                    log.info("Index: %s, %s", index, field_info)
@@ -1,9 +1,12 @@
 import sys
-import logging
 from app.commands import Command
+from app.output import echo
+from app.logger import get_logger
+
+log = get_logger('exit')
 
 class ExitCommand(Command):
     def execute(self):
-        logging.info("Executing ExitCommand - Application exiting...")  
-        print("Exiting...") 
+        log.info("Executing ExitCommand - Application exiting...")  
+        echo("Exiting...") 
         sys.exit(0)  
\ No newline at end of file
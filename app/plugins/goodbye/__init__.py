@@ -1,8 +1,11 @@
-import logging
 from app.commands import Command
+from app.output import echo
+from app.logger import get_logger
+
+log = get_logger('goodbye')
 
 class GoodbyeCommand(Command):
     def execute(self):
-        logging.info("Executing GoodbyeCommand.")  
-        print("Goodbye")  
-        logging.info("GoodbyeCommand executed successfully.")  
\ No newline at end of file
+        log.info("Executing GoodbyeCommand.")  
+        echo("Goodbye")  
+        log.info("GoodbyeCommand executed successfully.")  
\ No newline at end of file
@@ -1,8 +1,11 @@
-import logging
 from app.commands import Command
+from app.output import echo
+from app.logger import get_logger
+
+log = get_logger('greet')
 
 class GreetCommand(Command):
     def execute(self):
-        logging.info("Executing GreetCommand.")  # Log the execution of the GreetCommand
-        print("Hello, World!")  # Keep this for user interaction
-        logging.info("GreetCommand executed successfully.")  # Optionally log successful execution
\ No newline at end of file
+        log.info("Executing GreetCommand.")  # Log the execution of the GreetCommand
+        echo("Hello, World!")  # Keep this for user interaction
+        log.info("GreetCommand executed successfully.")  # Optionally log successful execution
\ No newline at end of file
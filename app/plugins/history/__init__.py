@@ -1,70 +1,103 @@
-import logging
-from app.commands import Command, CommandHistoryManager
+from app.commands import Command, current_history
+from app.output import echo, prompt, flushes
+from app.logger import get_logger
+
+log = get_logger('history')
 
 class HistoryCommand(Command):
     def __init__(self):
-        self.history_manager = CommandHistoryManager()
+        self.__history_manager = None
         self.operations = {
             "1": ("Load History", self.load_history),
             "2": ("Save History", self.save_history),
             "3": ("Clear History", self.clear_history),
-            "4": ("Delete History Record", self.delete_history_record)
+            "4": ("Delete History Record", self.delete_history_record),
+            "u": ("Undo", self.undo),
+            "r": ("Redo", self.redo)
         }
 
+    @property
+    def history_manager(self):
+        """The calling session's history (see session_scope), unless a manager was assigned."""
+        if self.__history_manager is not None:
+            return self.__history_manager
+        return current_history()
+
+    @history_manager.setter
+    def history_manager(self, manager):
+        self.__history_manager = manager
+
     def execute(self):
         while True:
-            print("\nCommand History Operations:")
+            echo("\nCommand History Operations:")
             for key, (name, _) in self.operations.items():
-                print(f"{key}. {name}")
-            print("5. Back")
+                echo(f"{key}. {name}")
+            echo("5. Back")
 
-            choice = input("Select an operation: ")
+            choice = prompt("Select an operation: ")
             if choice == '5':
-                logging.info("User selected to go back from HistoryCommand.")
+                log.info("User selected to go back from HistoryCommand.")
                 break  # Exit to the main menu
 
             operation = self.operations.get(choice)
             if operation:
                 _, operation_func = operation
-                logging.info(f"Executing history operation: {operation[0]}")
+                log.info("Executing history operation: %s", operation[0])
                 operation_func()
             else:
-                logging.warning("Invalid selection in HistoryCommand.")
-                print("Invalid selection. Please try again.")
+                log.warning("Invalid selection in HistoryCommand.")
+                echo("Invalid selection. Please try again.")
 
+    def run(self, data, *args):
+        """Pipeline stage: the history as a frame (a copy, so later stages cannot rewrite it)."""
+        return self.history_manager.history.copy()
+
+    @flushes
     def load_history(self):
         history = self.history_manager.get_history()
         if history:
-            print("Command History:")
+            echo("Command History:")
             for index, command_name in enumerate(history, start=1):
-                print(f"{index}. {command_name}")
+                echo(f"{index}. {command_name}")
         else:
-            print("No history found.")
+            echo("No history found.")
 
+    @flushes
     def save_history(self):
         self.history_manager.save_history()
-        print("History saved successfully.")
+        echo("History saved successfully.")
 
+    @flushes
     def clear_history(self):
         self.history_manager.clear_history()
-        print("History cleared successfully.")
+        echo("History cleared successfully.")
 
+    @flushes
     def delete_history_record(self):
         history = self.history_manager.get_history()
         if history:
             for index, command_name in enumerate(history, start=1):
-                print(f"{index}. {command_name}")
+                echo(f"{index}. {command_name}")
             try:
-                choice = int(input("Select a record to delete: "))
+                choice = int(prompt("Select a record to delete: "))
                 # Adjust for zero-based index
                 del_index = choice - 1
                 if 0 <= del_index < len(history):
-                    self.history_manager.history.drop(self.history_manager.history.index[del_index], inplace=True)
-                    self.history_manager.save_history()
-                    print("Record deleted successfully.")
+                    self.history_manager.delete_record(del_index)
+                    echo("Record deleted successfully.")
                 else:
-                    print("Invalid selection. Please try again.")
+                    echo("Invalid selection. Please try again.")
             except ValueError:
-                print("Please enter a valid number.")
+                echo("Please enter a valid number.")
         else:
-            print("No history to delete.")
\ No newline at end of file
+            echo("No history to delete.")
+
+    @flushes
+    def undo(self):
+        change = self.history_manager.undo()
+        echo(f"Undone: {change}" if change else "Nothing to undo.")
+
+    @flushes
+    def redo(self):
+        change = self.history_manager.redo()
+        echo(f"Redone: {change}" if change else "Nothing to redo.")
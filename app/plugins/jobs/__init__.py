@@ -0,0 +1,15 @@
+from app.commands import Command
+from app.jobs import JobManager
+from app.output import echo
+from app.logger import get_logger
+
+log = get_logger('jobs')
+
+class JobsCommand(Command):
+    def execute(self):
+        jobs = JobManager()
+        log.info("Listing %s jobs (%s running)", len(jobs.jobs), len(jobs.running()))
+        if not jobs.jobs:
+            echo("No jobs have been started. In the async REPL, end a selection with '&' to run it in the background.")
+            return
+        echo(jobs.render(), end='')
@@ -0,0 +1,35 @@
+from collections import deque
+from app.commands import Command
+from app.settings import get_settings
+from app.output import echo, prompt
+from app.logger import get_logger, read_entries, LOG_FILES
+
+log = get_logger('logs')
+
+class LogsCommand(Command):
+    def __init__(self, path=None, limit=20):
+        """Queries the log the App writes for the configured format, including rotated segments"""
+        self.path = path or LOG_FILES.get(get_settings().log_format, LOG_FILES['text'])
+        self.limit = limit
+
+    def query(self, level=None, subsystem=None, contains=None, since=None, limit=None):
+        """Returns the last `limit` matching entries; segments are streamed, so memory is bounded by limit."""
+        return list(deque(read_entries(self.path, level, subsystem, contains, since), maxlen=limit or self.limit))
+
+    def execute(self):
+        level = prompt("Minimum level [any]: ").strip() or None
+        subsystem = prompt("Subsystem, e.g. csv [any]: ").strip() or None
+        contains = prompt("Containing text [any]: ").strip() or None
+        since = prompt("Since (YYYY-MM-DD[THH:MM]) [any]: ").strip() or None
+        try:
+            limit = int(prompt(f"Show last N entries [{self.limit}]: ").strip() or self.limit)
+            entries = self.query(level, subsystem, contains, since, limit)
+        except (OSError, ValueError) as e:
+            log.error("Error querying logs: %s", e)
+            echo(f"Could not query '{self.path}': {e}")
+            return
+        log.info("Log query returned %s entries", len(entries))
+        if not entries:
+            echo("No matching log entries.")
+        for entry in entries:
+            echo(f"{entry.get('time', '')} {entry.get('level', ''):<8} {entry.get('logger', '')}: {entry.get('message', '')}")
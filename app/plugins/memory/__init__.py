@@ -0,0 +1,15 @@
+from app.commands import Command
+from app.profiler import get_profiler
+from app.output import echo
+from app.logger import get_logger
+
+log = get_logger('profiler')
+
+class MemoryCommand(Command):
+    def execute(self):
+        profiler = get_profiler()
+        log.info("Reporting memory usage of %s commands", len(profiler.totals))
+        if not profiler.totals:
+            echo("No commands have been profiled. Set MEMORY_PROFILE=true to trace allocations per command.")
+            return
+        echo(profiler.render(), end='')
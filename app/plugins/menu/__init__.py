@@ -1,6 +1,9 @@
 import sys
-import logging
 from app.commands import Command, CommandHandler
+from app.output import echo, prompt
+from app.logger import get_logger
+
+log = get_logger('menu')
 
 class MenuCommand(Command):
     def __init__(self, command_handler: CommandHandler):
@@ -9,24 +12,24 @@ class MenuCommand(Command):
     def execute(self):
         commands = list(self.command_handler.commands.keys())
         # Print the menu dynamically based on registered commands
-        print("\nMain Menu:")
+        echo("\nMain Menu:")
         for index, command_name in enumerate(commands, start=1):
-            print(f"{index}. {command_name.capitalize()}")
-        print("Enter the number of the command to execute, or '0' to exit.")
+            echo(f"{index}. {command_name.capitalize()}")
+        echo("Enter the number of the command to execute, or '0' to exit.")
 
-        logging.info("Displaying main menu to user.")  
+        log.info("Displaying main menu to user.")  
 
         try:
-            selection = int(input("Selection: "))
+            selection = int(prompt("Selection: "))
             if selection == 0:
-                logging.info("User selected to exit the program.")  
+                log.info("User selected to exit the program.")  
                 sys.exit("Exiting program.")  
             command_name = commands[selection - 1]  
-            logging.info(f"User selected command: {command_name}")  
+            log.info("User selected command: %s", command_name)  
             self.command_handler.execute_command(command_name)
         except (ValueError, IndexError):
-            logging.warning("User made an invalid selection.")  
-            print("Invalid selection. Please enter a valid number.")  
+            log.warning("User made an invalid selection.")  
+            echo("Invalid selection. Please enter a valid number.")  
         except KeyError:
-            logging.error("Attempted to execute a non-existent command.") 
-            print("Selected command could not be executed.")  
\ No newline at end of file
+            log.error("Attempted to execute a non-existent command.") 
+            echo("Selected command could not be executed.")  
\ No newline at end of file
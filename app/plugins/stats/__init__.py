@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from app import storage
+from app.commands import Command, current_history
+from app.cancellation import check_cancelled
+from app.settings import get_settings
+from app.plugins.csv import parse_suffixed
+from app.output import echo, prompt
+from app.logger import get_logger
+
+log = get_logger('stats')
+
+HISTOGRAM_BINS = 4096  # Streamed percentiles are exact to within (max - min) / HISTOGRAM_BINS
+ROLLING = {
+    'sum': lambda windows: windows.sum(axis=1),
+    'mean': lambda windows: windows.mean(axis=1),
+    'std': lambda windows: windows.std(axis=1, ddof=1),
+    'min': lambda windows: windows.min(axis=1),
+    'max': lambda windows: windows.max(axis=1),
+}
+
+class RunningStats:
+    """
+    Mergeable count/sum/mean/variance/min/max. Each chunk is reduced with NumPy and folded in with
+    Chan et al.'s parallel form of Welford's update, so partials from any split of the data combine exactly.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size:
+            mean = values.mean()
+            part = RunningStats()
+            part.count, part.total, part.mean = values.size, values.sum(), mean
+            part.m2, part.min, part.max = np.square(values - mean).sum(), values.min(), values.max()
+            self.merge(part)
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    def summary(self):
+        empty = self.count == 0
+        return {'count': self.count, 'sum': self.total, 'mean': np.nan if empty else self.mean,
+                'std': np.sqrt(self.variance), 'min': np.nan if empty else self.min,
+                'max': np.nan if empty else self.max}
+
+def histogram_percentiles(counts, edges, percentiles):
+    """Interpolates percentiles (0-100) from binned counts, the way np.percentile ranks values."""
+    cumulative = np.cumsum(counts)
+    ranks = np.asarray(percentiles, dtype=float) / 100 * (cumulative[-1] - 1)
+    bins = np.minimum(np.searchsorted(cumulative, ranks, side='right'), len(counts) - 1)
+    before = np.where(bins > 0, cumulative[bins - 1], 0)
+    fraction = (ranks - before + 0.5) / np.maximum(counts[bins], 1)
+    return edges[bins] + np.clip(fraction, 0, 1) * (edges[bins + 1] - edges[bins])
+
+def rolling(values, window, statistic='mean', carry=None):
+    """
+    Windowed statistic over values, NaN until a full window is available. carry holds the last
+    window - 1 values of the previous chunk so that streamed results match a single pass.
+    """
+    if window < 1:
+        raise ValueError(f"The rolling window must be at least 1, not {window}")
+    values = np.asarray(values, dtype=float)
+    if carry is not None:
+        values = np.concatenate([carry, values])
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        result[window - 1:] = ROLLING[statistic](sliding_window_view(values, window))
+    return result if carry is None else result[len(carry):]
+
+def numeric(series):
+    """The column as floats, parsing suffixed numbers such as '3.1T'; None if it is not numeric."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float)
+    parsed = parse_suffixed(series)
+    return parsed.to_numpy(dtype=float) if parsed.notna().any() else None
+
+def parse_rolling(args):
+    """Parses '<column> <window> [statistic]' into (column, window, statistic)."""
+    if len(args) < 2:
+        raise ValueError("Usage: rolling <column> <window> [sum|mean|std|min|max]")
+    column, window, statistic = args[0], args[1], args[2] if len(args) > 2 else 'mean'
+    try:
+        window = int(window)
+    except ValueError:
+        raise ValueError(f"The rolling window must be a whole number, not '{window}'") from None
+    if window < 1:
+        raise ValueError(f"The rolling window must be at least 1, not {window}")
+    if statistic not in ROLLING:
+        raise ValueError(f"Unknown rolling statistic '{statistic}'")
+    return column, window, statistic
+
+def numeric_column(frame, column):
+    """numeric() for a column that must exist and hold numbers."""
+    if column not in frame.columns:
+        raise ValueError(f"No column '{column}'")
+    values = numeric(frame[column])
+    if values is None:
+        raise ValueError(f"Column '{column}' is not numeric")
+    return values
+
+class StatsCommand(Command):
+    def __init__(self, chunksize=None, percentiles=(50, 90, 99)):
+        """Files are streamed in chunks of chunksize rows, so they never have to fit in memory"""
+        self.chunksize = chunksize or get_settings().import_chunk_size
+        self.percentiles = list(percentiles)
+
+    def summarize(self, df, columns=None, percentiles=None):
+        """Exact summary of an in-memory frame: one column per numeric column, one row per statistic."""
+        percentiles = self.percentiles if percentiles is None else percentiles
+        summary = {}
+        for column in columns or df.columns:
+            values = numeric(df[column])
+            if values is None:
+                continue
+            stats = RunningStats().update(values).summary()
+            finite = values[~np.isnan(values)]
+            for percentile, value in zip(percentiles, np.percentile(finite, percentiles) if finite.size
+                                         else [np.nan] * len(percentiles)):
+                stats[f"p{percentile:g}"] = value
+            summary[column] = stats
+        return pd.DataFrame(summary)
+
+    def summarize_file(self, path, columns=None, percentiles=None):
+        """
+        Streams path once for the mergeable aggregates; when percentiles are wanted and the file spans
+        several chunks, a second pass fills a histogram between the column minimum and maximum.
+        """
+        percentiles = self.percentiles if percentiles is None else percentiles
+        options = {'chunksize': self.chunksize}
+        if columns:
+            options['usecols'] = columns
+        aggregates = {}
+        first = None
+        for index, chunk in enumerate(storage.read_frame(path, **options)):
+            check_cancelled()
+            if index == 0:
+                first = chunk
+                # A column is numeric if its first chunk is, so later chunks are parsed the same way
+                aggregates = {column: RunningStats() for column in chunk.columns if numeric(chunk[column]) is not None}
+            for column, stats in aggregates.items():
+                stats.update(numeric(chunk[column]))
+            chunks = index + 1
+        if first is None:
+            return pd.DataFrame()
+        if chunks == 1:
+            return self.summarize(first, list(aggregates), percentiles)  # Small enough for exact percentiles
+        if not percentiles:
+            return pd.DataFrame({column: stats.summary() for column, stats in aggregates.items()})
+
+        histograms = {column: np.zeros(HISTOGRAM_BINS, dtype=np.int64) for column in aggregates}
+        for chunk in storage.read_frame(path, **options):
+            check_cancelled()
+            for column, counts in histograms.items():
+                stats = aggregates[column]
+                values = numeric(chunk[column])
+                counts += np.histogram(values[~np.isnan(values)], bins=HISTOGRAM_BINS, range=(stats.min, stats.max))[0]
+        summary = {}
+        for column, stats in aggregates.items():
+            summary[column] = stats.summary()
+            if stats.count:
+                edges = np.linspace(stats.min, stats.max, HISTOGRAM_BINS + 1)
+                for percentile, value in zip(percentiles, histogram_percentiles(histograms[column], edges, percentiles)):
+                    summary[column][f"p{percentile:g}"] = value
+        log.info("Summarized %s columns of '%s' in %s chunks", len(summary), path, chunks)
+        return pd.DataFrame(summary)
+
+    def rolling_file(self, path, column, window, statistic='mean', output_path=None):
+        """
+        Streams path in chunks and writes every row plus the '<column>_<statistic>_<window>' column to
+        output_path. Only the last window - 1 values are kept between chunks, so the results equal one
+        pass over the whole file while memory stays bounded by the chunk size. Returns the row count.
+        """
+        name = f"{column}_{statistic}_{window}"
+        carry = np.empty(0)
+        rows = 0
+        with open(output_path, 'w', newline='') as output:
+            for chunk in storage.read_frame(path, chunksize=self.chunksize):
+                check_cancelled()
+                if rows == 0 or column not in chunk.columns:
+                    values = numeric_column(chunk, column)
+                else:  # Later chunks are parsed like the first, even when none of their values parse
+                    values = numeric(chunk[column])
+                    values = np.full(len(chunk), np.nan) if values is None else values
+                chunk[name] = rolling(values, window, statistic, carry)
+                carry = np.concatenate([carry, values])[len(carry) + len(values) - (window - 1):]
+                chunk.to_csv(output, header=rows == 0, index=False)
+                rows += len(chunk)
+        log.info("Wrote rolling %s of %s over %s rows of '%s' to '%s'", statistic, column, rows, path, output_path)
+        return rows
+
+    def run(self, data, *args):
+        """
+        Pipeline stage. 'stats [column ...]' reduces the incoming frame to a summary, and
+        'stats rolling <column> <window> [statistic]' adds a '<column>_<statistic>_<window>' column.
+        """
+        if data is None:
+            raise ValueError("The stats stage needs a previous stage, e.g. 'csv | stats Population'")
+        if args and args[0] == 'rolling':
+            column, window, statistic = parse_rolling(args[1:])
+            data[f"{column}_{statistic}_{window}"] = rolling(numeric_column(data, column), window, statistic)
+            return data
+        return self.summarize(data, list(args) or None)
+
+    def execute(self):
+        source = prompt("CSV file to summarize, or 'history' [./data/gpt_states.csv]: ").strip() or './data/gpt_states.csv'
+        answer = prompt("Columns [all numeric], or 'rolling <column> <window> [statistic]': ").strip()
+        columns = [column.strip() for column in answer.split(',') if column.strip()]
+        try:
+            if answer.split()[:1] == ['rolling'] and source != 'history':
+                column, window, statistic = parse_rolling(answer.split()[1:])
+                output_path = prompt("Output file [./data/rolling.csv]: ").strip() or './data/rolling.csv'
+                rows = self.rolling_file(source, column, window, statistic, output_path)
+                echo(f"Wrote {rows} rows with {column}_{statistic}_{window} to '{output_path}'")
+                return
+            if source == 'history':
+                history = current_history().history
+                echo("Command frequencies:")
+                echo(history['Command'].value_counts().to_string())
+                return
+            summary = self.summarize_file(source, columns or None)
+        except (OSError, ValueError) as e:
+            log.error("Error computing statistics: %s", e)
+            echo(f"Could not summarize '{source}': {e}")
+            return
+        echo(summary.to_string() if not summary.empty else "No numeric columns found.")
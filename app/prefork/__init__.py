@@ -0,0 +1,88 @@
+import io
+import os
+import gc
+import builtins
+import multiprocessing
+from app import App
+from app.settings import get_settings
+from app.output import get_output
+from app.logger import get_logger
+
+log = get_logger('prefork')
+
+_app = None  # The warm App every forked worker inherits
+
+def scripted_input(answers):
+    """An input() replacement answering from a list; running out behaves like end of input."""
+    answers = iter(answers)
+
+    def answer(text=''):
+        try:
+            return next(answers)
+        except StopIteration:
+            raise EOFError(f"No input left for {text!r}") from None
+    return answer
+
+def execute(command_name, inputs=()):
+    """Worker side: runs one command with scripted answers and returns what it printed."""
+    builtins.input = scripted_input(inputs)  # Each worker is its own process, so this is not shared
+    with get_output().redirect(io.StringIO()) as captured:
+        _app.command_handler.execute_command(command_name)
+    return {'pid': os.getpid(), 'output': captured.getvalue()}
+
+def pipeline(text):
+    """Worker side: runs a pipeline and returns its result (pickled back to the caller) and output."""
+    with get_output().redirect(io.StringIO()) as captured:
+        result = _app.run_pipeline(text)
+    return {'pid': os.getpid(), 'output': captured.getvalue(), 'result': result}
+
+def worker_started():
+    log.info("Prefork worker %s started", os.getpid())
+
+class PreforkPool:
+    """
+    Pre-forked workers sharing the master's warm state. The master loads settings, plugins and their
+    data once; each worker is forked from it and inherits all of that copy-on-write, so it starts
+    without importing pandas or discovering plugins. Requests are taken from one shared queue, and a
+    worker is replaced by a fresh fork of the master after max_requests requests, so memory a worker
+    accumulates never outlives its quota. Requires a platform with fork (not Windows).
+    """
+
+    def __init__(self, app=None, workers=None, max_requests=None):
+        global _app
+        settings = get_settings()
+        if app is None:
+            app = App()
+            app.load_plugins()
+        _app = self.app = app
+        self.workers = workers or settings.prefork_workers or settings.worker_count
+        self.max_requests = max_requests or settings.prefork_max_requests or None
+        get_output().flush()  # Anything buffered now would be written again by every worker
+        # Everything loaded so far goes to a permanent generation that the collector never scans, so
+        # collections in the workers do not write to (and thereby copy) the pages they share
+        gc.collect()
+        gc.freeze()
+        # multiprocessing.Pool re-forks replacement workers from this process, still holding the warm state
+        self.pool = multiprocessing.get_context('fork').Pool(self.workers, initializer=worker_started,
+                                                             maxtasksperchild=self.max_requests)
+        log.info("Forked %s workers (recycled after %s requests)", self.workers, self.max_requests or 'unlimited')
+
+    def submit(self, command_name, inputs=()):
+        """Queues a command with the answers to its prompts; returns an AsyncResult of {'pid', 'output'}."""
+        return self.pool.apply_async(execute, (command_name, list(inputs)))
+
+    def submit_pipeline(self, text):
+        """Queues a pipeline such as 'csv | stats'; returns an AsyncResult of {'pid', 'output', 'result'}."""
+        return self.pool.apply_async(pipeline, (text,))
+
+    def close(self):
+        """Lets the workers finish the queued requests, then stops them."""
+        self.pool.close()
+        self.pool.join()
+        gc.unfreeze()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,52 @@
+"""
+Serves requests read from standard input, one per line, on pre-forked workers:
+
+    printf 'greet\ncsv "GDP>1T" | stats\n' | python -m app.prefork
+
+A line containing '|' is a pipeline, anything else a command name followed by the answers to its
+prompts, separated by ';' (e.g. 'calculator;+;2;3;back'). Each output is written as soon as it and
+every earlier one are ready, so responses come back in request order while later requests already run.
+A request that fails is answered with its error and does not stop the others.
+"""
+import sys
+import queue
+import threading
+from app.prefork import PreforkPool
+from app.logger import get_logger
+
+log = get_logger('prefork')
+
+def respond(line, result, output):
+    try:
+        output.write(result.get()['output'])
+    except Exception as e:  # Whatever the worker raised, e.g. EOFError when a prompt had no answer
+        log.error("Request '%s' failed: %s: %s", line, type(e).__name__, e)
+        output.write(f"Request '{line}' failed: {type(e).__name__}: {e}\n")
+    output.flush()
+
+def main(lines, output=None):
+    output = output or sys.stdout
+    pending = queue.Queue()
+
+    def write_responses():
+        while (request := pending.get()) is not None:
+            respond(*request, output)
+
+    writer = threading.Thread(target=write_responses, name='prefork-responses')
+    writer.start()
+    try:
+        with PreforkPool() as pool:
+            for line in (line.strip() for line in lines):
+                if not line:
+                    continue
+                if '|' in line:
+                    pending.put((line, pool.submit_pipeline(line)))
+                else:
+                    command_name, *inputs = line.split(';')
+                    pending.put((line, pool.submit(command_name.strip(), inputs)))
+    finally:
+        pending.put(None)
+        writer.join()
+
+if __name__ == "__main__":
+    main(sys.stdin)
@@ -0,0 +1,115 @@
+import os
+import threading
+import tracemalloc
+import contextlib
+from collections import deque
+from app.settings import get_settings
+from app.output import echo, flushes
+from app.logger import get_logger
+
+log = get_logger('profiler')
+
+GROWTH_RUNS = 3  # Consecutive executions that must each retain memory before a command is flagged
+GROWTH_BYTES = 64 * 1024  # Smaller amounts are caches warming up (logging, imports), not leaks
+# The profiler's own allocations and the import machinery would otherwise top every report
+IGNORED = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+           tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+           tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'), tracemalloc.Filter(False, '<unknown>'))
+
+def format_size(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+class MemoryUsage:
+    """What one execution of a command allocated."""
+    __slots__ = ('command_name', 'peak', 'retained', 'sites')
+
+    def __init__(self, command_name, peak, retained, sites):
+        self.command_name = command_name
+        self.peak = peak  # Highest traced memory above the starting point while the command ran
+        self.retained = retained  # Still allocated when it returned
+        self.sites = sites  # [(file:line, bytes retained)] largest first
+
+    def __str__(self):
+        return f"{self.command_name}: peak {format_size(self.peak)}, retained {format_size(self.retained)}"
+
+class MemoryProfiler:
+    """
+    Traces allocations with tracemalloc around each command and keeps per-command totals. Tracing is
+    process-wide, so commands running concurrently (e.g. background jobs) are attributed together.
+    """
+
+    def __init__(self, top=5, frames=1):
+        self.top = top  # Allocation sites kept per execution, 0 to skip the (slower) snapshots
+        self.frames = frames
+        self.usage = {}  # command name -> deque of recent MemoryUsage
+        self.totals = {}  # command name -> [executions, highest peak, total retained]
+        self.flagged = set()
+        self.__lock = threading.Lock()
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(IGNORED) if self.top else None
+
+    @contextlib.contextmanager
+    def measure(self, command_name):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        before = self.snapshot()
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            sites = []
+            if before is not None:
+                for stat in self.snapshot().compare_to(before, 'lineno'):
+                    if stat.size_diff > 0:
+                        frame = stat.traceback[0]
+                        sites.append((f"{os.path.relpath(frame.filename)}:{frame.lineno}", stat.size_diff))
+                        if len(sites) == self.top:
+                            break
+            self.record(MemoryUsage(command_name, peak - start, current - start, sites))
+
+    @flushes
+    def record(self, usage):
+        with self.__lock:
+            recent = self.usage.setdefault(usage.command_name, deque(maxlen=GROWTH_RUNS))
+            recent.append(usage)
+            totals = self.totals.setdefault(usage.command_name, [0, 0, 0])
+            totals[0] += 1
+            totals[1] = max(totals[1], usage.peak)
+            totals[2] += usage.retained
+            growing = len(recent) == GROWTH_RUNS and all(run.retained >= GROWTH_BYTES for run in recent)
+        log.info("Memory %s", usage, peak=usage.peak, retained=usage.retained)
+        for site, size in usage.sites:
+            log.debug("  %s retained %s", site, format_size(size))
+        if growing and usage.command_name not in self.flagged:
+            self.flagged.add(usage.command_name)
+            log.warning("Command %s retained memory in each of its last %s runs (%s in total)", usage.command_name,
+                        GROWTH_RUNS, format_size(sum(run.retained for run in recent)))
+        echo(f"[memory] {usage}")
+
+    def render(self):
+        """Returns one line per profiled command, then the top allocation sites of each one's latest run."""
+        lines = [f"{'command':<12}{'runs':>6}{'peak':>12}{'retained':>12}\n"]
+        for command_name, (runs, peak, retained) in self.totals.items():
+            marker = '  growing' if command_name in self.flagged else ''
+            lines.append(f"{command_name:<12}{runs:>6}{format_size(peak):>12}{format_size(retained):>12}{marker}\n")
+        for command_name, recent in self.usage.items():
+            if recent[-1].sites:
+                lines.append(f"\nTop allocation sites of the last '{command_name}' run:\n")
+                lines.extend(f"  {format_size(size):>10}  {site}\n" for site, size in recent[-1].sites)
+        return ''.join(lines)
+
+_profiler = None
+
+def get_profiler():
+    """The process-wide profiler, created on first use."""
+    global _profiler
+    if _profiler is None:
+        _profiler = MemoryProfiler(top=get_settings().memory_profile_top)
+    return _profiler
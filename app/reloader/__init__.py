@@ -0,0 +1,111 @@
+import os
+import sys
+import importlib
+import threading
+from app.logger import get_logger
+
+log = get_logger('reloader')
+
+class PluginReloader:
+    """Watches the plugin directory and hot-swaps plugins whose files changed."""
+
+    def __init__(self, app, plugins_package='app.plugins', plugins_path=None, interval=1.0):
+        self.app = app
+        self.plugins_package = plugins_package
+        self.plugins_path = plugins_path or plugins_package.replace('.', '/')
+        self.interval = interval
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__mtimes = self.scan()
+
+    def scan(self):
+        """Returns a mapping of plugin module name to source file mtime, using only os.stat."""
+        mtimes = {}
+        for root, dirs, files in os.walk(self.plugins_path):
+            dirs[:] = [name for name in dirs if name != '__pycache__']
+            for file_name in files:
+                if not file_name.endswith('.py'):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    mtimes[self.module_name(path)] = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue  # File vanished between listing and stat
+        return mtimes
+
+    def module_name(self, path):
+        relative = os.path.relpath(path, self.plugins_path)[:-len('.py')]
+        parts = relative.split(os.sep)
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        return '.'.join([self.plugins_package] + parts)
+
+    def changed_plugins(self):
+        """Rescans the plugin tree and groups changed modules by their top-level plugin name."""
+        current = self.scan()
+        changed = [name for name, mtime in current.items() if self.__mtimes.get(name) != mtime]
+        self.__mtimes = current
+        plugins = {}
+        prefix = f"{self.plugins_package}."
+        for module_name in changed:
+            if not module_name.startswith(prefix):
+                continue  # The plugins package itself is not a plugin
+            plugin_name = module_name[len(prefix):].split('.')[0]
+            plugins.setdefault(plugin_name, []).append(module_name)
+        return plugins
+
+    def check(self):
+        """Reloads every changed plugin and returns the names of the plugins that were swapped in."""
+        reloaded = []
+        with self.__lock:
+            for plugin_name, module_names in sorted(self.changed_plugins().items()):
+                if plugin_name == 'menu':
+                    log.warning("The menu plugin is registered by the App and is not hot-reloaded.")
+                    continue
+                try:
+                    self.reload_plugin(plugin_name, module_names)
+                    reloaded.append(plugin_name)
+                    log.info("Hot-reloaded plugin: %s", plugin_name)
+                except Exception as e:
+                    # Keep serving the previous version if the edited plugin is broken
+                    log.error("Error reloading plugin %s: %s", plugin_name, e)
+        return reloaded
+
+    def reload_plugin(self, plugin_name, module_names):
+        package_name = f"{self.plugins_package}.{plugin_name}"
+        for module_name in sorted(module_names):
+            if module_name != package_name and module_name in sys.modules:
+                importlib.reload(sys.modules[module_name])
+
+        command = self.app.command_handler.commands.get(plugin_name)
+        if package_name not in module_names and hasattr(command, 'load_operations'):
+            # Only operation modules changed, so swap the operation table of the live command
+            command.operations = command.load_operations()
+            return
+
+        if package_name in sys.modules:
+            plugin_module = importlib.reload(sys.modules[package_name])
+        else:
+            plugin_module = importlib.import_module(package_name)  # A plugin added while running
+        self.app.register_plugin(plugin_name, plugin_module)
+
+    def start(self):
+        """Starts polling in a daemon thread so the REPL never waits on a reload."""
+        if self.__thread is not None:
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.run, name='plugin-reloader', daemon=True)
+        self.__thread.start()
+        log.info("Plugin hot-reload watching '%s' every %ss", self.plugins_path, self.interval)
+
+    def run(self):
+        while not self.__stop_event.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        if self.__thread is None:
+            return
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__thread = None
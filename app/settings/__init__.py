@@ -0,0 +1,116 @@
+import os
+import time
+import threading
+from typing import Optional
+from dataclasses import dataclass, fields
+from dotenv import dotenv_values, find_dotenv
+from app.logger import get_logger
+
+log = get_logger('settings')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed, read-only application settings; each field is read from the upper-cased env variable."""
+    environment: str = 'DEVELOPMENT'
+    log_level: str = 'INFO'
+    log_levels: str = ''  # Per-subsystem overrides, e.g. 'calculator=WARNING,csv=DEBUG'
+    log_format: str = 'text'  # 'json' writes one JSON object per line to logs/app.jsonl
+    log_max_bytes: int = 10_000_000  # Size at which the log is rotated, 0 for no limit
+    log_rotate_seconds: int = 0  # Age at which the log is rotated, 0 for no limit
+    log_backup_count: int = 5
+    log_compress: bool = False  # gzip rotated segments
+    history_backend: str = 'csv'  # 'csv' persists every change, 'memory' never touches disk
+    history_file: str = 'data/command_history.csv'
+    history_records: int = 50
+    history_partitions_dir: str = 'data/history'  # One history file per session
+    history_open_partitions: int = 256  # Session histories kept in memory, least recently used closed first
+    undo_limit: int = 100  # Changes that history and calculator undo can step back through
+    import_chunk_size: int = 250_000
+    worker_count: int = os.cpu_count() or 1
+    command_timeout: float = 0.0  # Seconds a command may run before it is stopped, 0 for no limit
+    memory_profile: bool = False  # Trace allocations per command with tracemalloc; see the memory command
+    memory_profile_top: int = 5  # Allocation sites reported per command, 0 for totals only
+    async_repl: bool = False  # Run commands as jobs so the prompt stays responsive
+    prefork_workers: int = 0  # Workers forked by python -m app.prefork, 0 for worker_count
+    prefork_max_requests: int = 1000  # Requests a prefork worker serves before it is replaced, 0 for no limit
+    session_snapshot: bool = False  # Save the warm session on exit and restore it on the next start
+    snapshot_file: str = 'data/session.snapshot'
+    hot_reload: bool = False
+    hot_reload_interval: float = 1.0
+    quiet: bool = False
+    output_buffer_bytes: int = 65536  # Console output is written once this much is buffered, 0 writes through
+    db_host: Optional[str] = None
+    db_user: Optional[str] = None
+
+    @classmethod
+    def from_environ(cls, environ):
+        values = {}
+        for field in fields(cls):
+            raw = environ.get(field.name.upper())
+            if raw is None or raw == '':
+                continue
+            try:
+                if field.type is bool:
+                    values[field.name] = raw.strip().lower() in TRUE_VALUES
+                elif field.type in (int, float):
+                    values[field.name] = field.type(raw)
+                else:
+                    values[field.name] = raw
+            except ValueError:
+                log.warning("Ignoring invalid value for %s: '%s'", field.name.upper(), raw)
+        return cls(**values)
+
+DOTENV_CHECK_SECONDS = 1.0  # How often get_settings looks at .env's mtime for edits
+
+_lock = threading.Lock()
+_settings = None
+_dotenv_mtime = None
+_checked = 0.0  # time.monotonic() of the last .env check
+_dotenv_path = None
+
+def dotenv_path():
+    """Locates .env once per process (searching upward from the working directory)."""
+    global _dotenv_path
+    if _dotenv_path is None:
+        _dotenv_path = find_dotenv(usecwd=True)
+    return _dotenv_path
+
+def dotenv_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
+
+def reload_settings():
+    """
+    Parses .env and the environment into a new process-wide Settings. Call it after changing a
+    setting variable in-process (tests do); edits to .env are picked up by get_settings by itself.
+    """
+    global _settings, _dotenv_mtime, _checked
+    with _lock:
+        path = dotenv_path()
+        mtime = dotenv_mtime(path)
+        # Same precedence as load_dotenv(override=True): .env wins over the inherited environment
+        for key, value in (dotenv_values(path) if mtime is not None else {}).items():
+            if value is not None:
+                os.environ[key] = value
+        _settings = Settings.from_environ(os.environ)
+        _dotenv_mtime, _checked = mtime, time.monotonic()
+        return _settings
+
+def get_settings():
+    """
+    Returns the process-wide Settings, parsed once. It is called on every command, so it normally
+    returns the cached object straight away; at most every DOTENV_CHECK_SECONDS it stats .env and
+    reloads when the file was edited. Other environment changes take effect on reload_settings().
+    """
+    global _checked
+    settings = _settings
+    if settings is not None and time.monotonic() - _checked < DOTENV_CHECK_SECONDS:
+        return settings
+    if settings is not None and dotenv_mtime(dotenv_path()) == _dotenv_mtime:
+        _checked = time.monotonic()
+        return settings
+    return reload_settings()
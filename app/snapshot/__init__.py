@@ -0,0 +1,76 @@
+import os
+import sys
+import hashlib
+import dill
+from app import storage
+from app.logger import get_logger
+
+log = get_logger('snapshot')
+
+SNAPSHOT_FORMAT = 1
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # The app package
+
+def source_digests(root=SOURCE_ROOT):
+    """SHA-256 of every .py file under root, keyed by relative path; any edit invalidates a snapshot."""
+    digests = {}
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(name for name in dirs if name != '__pycache__')
+        for file_name in sorted(files):
+            if file_name.endswith('.py'):
+                path = os.path.join(directory, file_name)
+                with open(path, 'rb') as file:
+                    digests[os.path.relpath(path, root)] = hashlib.sha256(file.read()).hexdigest()
+    return digests
+
+def file_stamp(path):
+    """(size, mtime) of a data file the snapshot caches, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def snapshot_header(settings):
+    """Everything a snapshot is only valid for: format, interpreter, sources, settings and history file."""
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'python': tuple(sys.version_info[:3]),
+        'sources': source_digests(),
+        'settings': settings,
+        'history': file_stamp(settings.history_file),
+    }
+
+def stale_reason(header, expected):
+    for key in ('format', 'python', 'sources', 'settings', 'history'):
+        if header.get(key) != expected[key]:
+            return f"{key} changed"
+    return None
+
+def save_snapshot(path, state, settings):
+    """
+    Writes the header and then the state with dill into one file. The file is written beside the
+    target and renamed over it, so a crash never leaves a truncated snapshot behind.
+    """
+    with storage.atomic_write(path, 'wb') as file:
+        dill.dump(snapshot_header(settings), file)
+        dill.dump(state, file)
+    log.info("Saved session snapshot to '%s'", path)
+
+def load_snapshot(path, settings):
+    """
+    Returns the saved state, or None when there is no snapshot or it is stale (sources, settings or
+    history changed since it was written) or unreadable; the caller then starts cold. The header is
+    read first, so a stale snapshot's state is never unpickled.
+    """
+    try:
+        with open(path, 'rb') as file:
+            reason = stale_reason(dill.load(file), snapshot_header(settings))
+            if reason is None:
+                return dill.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # A snapshot from a different build can fail to unpickle in many ways
+        log.warning("Ignoring unreadable session snapshot '%s': %s", path, e)
+        return None
+    log.info("Ignoring stale session snapshot '%s': %s", path, reason)
+    return None
@@ -0,0 +1,91 @@
+import os
+import contextlib
+import importlib.util
+import pandas as pd
+from app.logger import get_logger
+
+log = get_logger('storage')
+
+# Columnar formats and zstd compression are optional extras, only used when installed
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+ZSTD_AVAILABLE = importlib.util.find_spec('zstandard') is not None
+
+# Longest extensions first so 'x.csv.gz' is not mistaken for plain CSV
+EXTENSIONS = {
+    '.csv.gz': 'csv.gz',
+    '.csv.zst': 'csv.zst',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.csv': 'csv',
+}
+COMPRESSION = {'csv': None, 'csv.gz': 'gzip', 'csv.zst': 'zstd'}
+
+def detect_format(path):
+    """Returns the storage format implied by a file name, defaulting to plain CSV."""
+    lower = str(path).lower()
+    for extension, file_format in EXTENSIONS.items():
+        if lower.endswith(extension):
+            return file_format
+    return 'csv'
+
+def resolve_format(file_format):
+    """Falls back to compressed CSV when the requested format's library is not installed."""
+    if file_format in ('parquet', 'feather') and not PYARROW_AVAILABLE:
+        fallback = 'csv.zst' if ZSTD_AVAILABLE else 'csv.gz'
+        log.warning("pyarrow is not installed, writing %s instead of %s", fallback, file_format)
+        return fallback
+    if file_format == 'csv.zst' and not ZSTD_AVAILABLE:
+        log.warning("zstandard is not installed, writing csv.gz instead of csv.zst")
+        return 'csv.gz'
+    return file_format
+
+def path_for_format(path, file_format):
+    """Swaps the extension of path for the one belonging to file_format."""
+    path = str(path)
+    for extension in EXTENSIONS:
+        if path.lower().endswith(extension):
+            path = path[:-len(extension)]
+            break
+    return f"{path}.{file_format}"
+
+def write_frame(df, path, file_format=None):
+    """Writes df in the requested (or extension-implied) format and returns the path actually written."""
+    requested = file_format or detect_format(path)
+    file_format = resolve_format(requested)
+    if file_format != detect_format(path):
+        path = path_for_format(path, file_format)
+    if file_format == 'parquet':
+        df.to_parquet(path, index=False)
+    elif file_format == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False, compression=COMPRESSION[file_format])
+    return path
+
+def read_frame(path, columns=None, **csv_options):
+    """Reads any supported format; columnar formats load only the requested columns without parsing."""
+    file_format = detect_format(path)
+    if file_format == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    if file_format == 'feather':
+        return pd.read_feather(path, columns=columns)
+    if columns is not None:
+        csv_options['usecols'] = columns
+    return pd.read_csv(path, compression=COMPRESSION[file_format], **csv_options)
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w'):
+    """
+    Opens a file beside path for writing and, once the block completes, syncs it to disk and renames
+    it over path, so readers and crashes only ever see the old or the complete new file.
+    """
+    temporary_path = f"{path}.tmp"
+    try:
+        with open(temporary_path, mode) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)  # The block failed; never leave a half-written file behind
@@ -0,0 +1,46 @@
+"""
+Compares fused, chunked array-expression evaluation with plain NumPy on large columns:
+throughput and peak memory allocated beyond the inputs.
+
+Run from the repository root:  python -m benchmarks.bench_expression [rows]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+from app.plugins.calculator import OperationRegistry
+from app.plugins.calculator.expression import ArrayExpression
+
+FORMULA = "(a * 2 + b) / (c - a % 7) ^ 2"
+
+def naive(a, b, c):
+    """Plain NumPy: every operator allocates a full-size temporary."""
+    return (a * 2 + b) / (c - a % 7) ** 2
+
+def measure(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+def run(rows=10_000_000):
+    rng = np.random.default_rng(0)
+    a, b, c = rng.random(rows) * 100, rng.random(rows), rng.random(rows) * 100 + 10
+    expression = ArrayExpression(FORMULA, OperationRegistry.discover())
+    out = np.empty(rows)
+    input_mb = 3 * a.nbytes / 1e6
+
+    expected, naive_seconds, naive_peak = measure(lambda: naive(a, b, c))
+    result, fused_seconds, fused_peak = measure(lambda: expression.evaluate({'a': a, 'b': b, 'c': c}, out=out))
+    assert np.allclose(result, expected)
+
+    print(f"{rows:,} rows, inputs {input_mb:.0f} MB, formula {FORMULA}")
+    print(f"{'mode':<8}{'seconds':>9}{'Mrows/s':>10}{'peak extra MB':>15}")
+    for mode, seconds, peak in (('numpy', naive_seconds, naive_peak), ('fused', fused_seconds, fused_peak)):
+        print(f"{mode:<8}{seconds:>9.3f}{rows / seconds / 1e6:>10.1f}{peak / 1e6:>15.1f}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
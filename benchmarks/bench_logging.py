@@ -0,0 +1,71 @@
+"""
+Measures the logging overhead per executed calculation at each log level. Every variant performs the
+same calculation; only the call that logs its result differs.
+
+Run from the repository root:  python -m benchmarks.bench_logging [iterations]
+"""
+import io
+import sys
+import time
+import logging
+from app.plugins.calculator.add import Add
+from app.logger import get_logger
+
+LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'DISABLED']
+
+log = get_logger('calculator')
+stdlib_log = logging.getLogger('app.calculator')
+
+def facade_calculate(operation, a, b):
+    """What the calculator does: the app.logger facade with %-style arguments."""
+    result = float(operation.compute(a, b))
+    log.info("%s result: %s", operation.label, result)
+    return result
+
+def stdlib_calculate(operation, a, b):
+    """The stdlib logger with %-style arguments, the floor for a lazy log call."""
+    result = float(operation.compute(a, b))
+    stdlib_log.info("%s result: %s", operation.label, result)
+    return result
+
+def eager_calculate(operation, a, b):
+    """The previous behaviour: the message is an f-string built before logging checks the level."""
+    result = float(operation.compute(a, b))
+    stdlib_log.info(f"{operation.label} result: {result}")
+    return result
+
+VARIANTS = {'facade': facade_calculate, 'stdlib': stdlib_calculate, 'f-string': eager_calculate}
+
+def time_per_call(function, operation, iterations):
+    started = time.perf_counter()
+    for i in range(iterations):
+        function(operation, i, 2.5)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def run(iterations=50_000):
+    operation = Add()
+    handler = logging.StreamHandler(io.StringIO())  # Keep emitted records in memory, off the disk
+    root = logging.getLogger()
+    root.addHandler(handler)
+    previous_level = root.level
+    rows = []
+    try:
+        for level in LEVELS:
+            if level == 'DISABLED':
+                logging.disable(logging.CRITICAL)
+            else:
+                logging.disable(logging.NOTSET)
+                root.setLevel(level)
+            rows.append((level, [time_per_call(function, operation, iterations) for function in VARIANTS.values()]))
+    finally:
+        logging.disable(logging.NOTSET)
+        root.setLevel(previous_level)
+        root.removeHandler(handler)
+
+    print(f"{'level':<10}" + ''.join(f"{name + ' us/calc':>18}" for name in VARIANTS))
+    for level, timings in rows:
+        print(f"{level:<10}" + ''.join(f"{timing:>18.3f}" for timing in timings))
+    return rows
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,196 @@
+"""
+Synthetic load for the command layer: Faker generates a scaled-up states dataset and streams of
+calculator, history, csv and stats sessions, which worker threads (optionally in several processes)
+replay through the App's CommandHandler at a target rate. Reports throughput, latency percentiles
+and error rates per command.
+
+Run from the repository root:
+    python -m benchmarks.load_generator --threads 4 --rate 50 --duration 10 --rows 2000
+A rate of 0 runs closed-loop, each worker issuing its next command as soon as the last returns.
+Latency is measured from when a command was scheduled, so time spent queued behind a slow command
+counts (no coordinated omission).
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import warnings
+import builtins
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from faker import Faker
+from app import App
+from app.commands import CommandHandler, current_history, session_scope
+from app.plugins.csv import CsvCommand
+from app.settings import reload_settings
+
+SCENARIOS = {'calculator': 50, 'history': 20, 'csv': 15, 'stats': 15}  # Relative weights
+SYMBOLS = ['+', '-', '*', '/', '^', '%']
+
+class ScriptExhausted(Exception):
+    """A command asked for more input than its scripted session provides."""
+
+_scripts = threading.local()
+
+def scripted_input(prompt=''):
+    try:
+        return next(_scripts.inputs)
+    except StopIteration:
+        raise ScriptExhausted(f"no scripted answer for {prompt!r}") from None
+
+def synthesize_states(path, rows, seed=0):
+    """Writes a gpt_states.csv-shaped file of `rows` fake states, GDP in the same suffixed form."""
+    fake = Faker('en_US')
+    fake.seed_instance(seed)
+    with open(path, 'w') as file:
+        file.write("State Abbreviation,State Name,Population,Capital,GDP\n")
+        for _ in range(rows):
+            gdp = f"{fake.random_int(3, 400) / 100}T" if fake.boolean(70) else f"{fake.random_int(50, 999)}B"
+            file.write(f"{fake.state_abbr()},{fake.state()},{fake.random_int(500_000, 40_000_000)},"
+                       f"{fake.city().replace(',', '')},{gdp}\n")
+    return path
+
+def session_script(fake, command_name, dataset):
+    """The answers a user would type into one run of command_name."""
+    if command_name == 'calculator':
+        a, b, c = (fake.pyfloat(left_digits=3, right_digits=2) for _ in range(3))
+        symbol = fake.random_element(SYMBOLS)
+        return fake.random_element([
+            [symbol, str(a), str(b), 'back'],
+            [f"{a} {symbol} {b}", 'back'],
+            [f"({a} + {b}) * {c} - {a} / 2", 'results', 'back'],
+        ])
+    if command_name == 'history':
+        return ['1', '5']
+    if command_name == 'stats':
+        return fake.random_element([[dataset, ''], [dataset, 'Population, GDP'], ['history', '']])
+    return []  # csv takes no input
+
+def worker_handler(app, worker, workdir, dataset):
+    """
+    A handler sharing the app's command instances, except for a csv command writing its own output,
+    as concurrent users of one sorted output file would overwrite each other.
+    """
+    handler = CommandHandler()
+    for command_name, command in app.command_handler.commands.items():
+        handler.register_command(command_name, command)
+    handler.register_command('csv', CsvCommand(input_path=dataset,
+                                               output_path=os.path.join(workdir, f"sorted_{worker}.csv")))
+    return handler
+
+def run_worker(handler, worker, interval, deadline, dataset, seed, sessions=0):
+    """
+    Replays sessions until the deadline; returns (command, latency seconds, error or None) tuples.
+    With sessions, each command runs as one of that many users, each with a history partition.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    names, weights = list(SCENARIOS), list(SCENARIOS.values())
+    rng = random.Random(seed)
+    records = []
+    scheduled = time.perf_counter() + rng.random() * interval  # Stagger workers across the first interval
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        command_name = rng.choices(names, weights)[0]
+        _scripts.inputs = iter(session_script(fake, command_name, dataset))
+        error = None
+        user = f"user-{rng.randrange(sessions)}" if sessions else None
+        try:
+            with session_scope(user) if user else contextlib.nullcontext():
+                handler.execute_command(command_name)
+                current_history().add_command(command_name)
+        except Exception as e:  # pylint: disable=broad-except
+            error = f"{e.__class__.__name__}: {e}"
+        records.append((command_name, time.perf_counter() - scheduled, error))
+        scheduled = scheduled + interval if interval else time.perf_counter()
+    return records
+
+def run_process(threads, rate, duration, dataset, workdir, process=0, seed=0, sessions=0):
+    """Runs `threads` workers in this process, each at rate / threads commands per second."""
+    os.environ.setdefault('HISTORY_BACKEND', 'memory')  # Workers must not rewrite the real history file
+    os.environ.setdefault('HISTORY_PARTITIONS_DIR', os.path.join(workdir, 'history'))
+    reload_settings()  # Settings are parsed once per process, possibly before the variables above were set
+    warnings.simplefilter('ignore', RuntimeWarning)  # Random operands overflow; the REPL prints inf/nan
+    app = App()
+    app.load_plugins()
+    interval = threads / rate if rate else 0.0
+    deadline = time.perf_counter() + duration
+    results = [None] * threads
+
+    def work(index):
+        worker = process * threads + index
+        handler = worker_handler(app, worker, workdir, dataset)
+        results[index] = run_worker(handler, worker, interval, deadline, dataset, seed + worker, sessions)
+
+    original_input = builtins.input
+    builtins.input = scripted_input
+    try:
+        with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+            pool = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+    finally:
+        builtins.input = original_input
+    return [record for worker_records in results for record in worker_records or []]
+
+def report(records, seconds, workers):
+    """Prints throughput, then error rate and latency percentiles per command and overall."""
+    print(f"{len(records):,} commands in {seconds:.1f}s from {workers} workers: "
+          f"{len(records) / seconds:.1f} commands/s")
+    print(f"{'command':<12}{'count':>8}{'errors':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    groups = {}
+    for command_name, latency, error in records:
+        groups.setdefault(command_name, []).append((latency, error))
+    groups['all'] = [(latency, error) for _, latency, error in records]
+    for command_name, group in groups.items():
+        latencies = np.array([latency for latency, _ in group]) * 1000
+        errors = sum(1 for _, error in group if error)
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        print(f"{command_name:<12}{len(group):>8}{errors / len(group):>8.1%} {p50:>10.2f}{p90:>10.2f}{p99:>10.2f}"
+              f"{latencies.max():>10.2f}")
+    failures = {}
+    for _, _, error in records:
+        if error:
+            failures[error] = failures.get(error, 0) + 1
+    for error, count in sorted(failures.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {count:>6} x {error}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--threads', type=int, default=4, help="worker threads per process")
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--rate', type=float, default=0.0, help="target commands/s across all workers, 0 for closed loop")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+    parser.add_argument('--rows', type=int, default=2000, help="rows in the synthetic states dataset")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sessions', type=int, default=0, help="distinct users with their own history, 0 to share one")
+    options = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='load_') as workdir:
+        dataset = synthesize_states(os.path.join(workdir, 'states.csv'), options.rows, options.seed)
+        rate = options.rate / options.processes
+        started = time.perf_counter()
+        if options.processes == 1:
+            records = run_process(options.threads, rate, options.duration, dataset, workdir, seed=options.seed,
+                                  sessions=options.sessions)
+        else:
+            with ProcessPoolExecutor(max_workers=options.processes) as pool:
+                futures = [pool.submit(run_process, options.threads, rate, options.duration, dataset, workdir,
+                                       process, options.seed, options.sessions) for process in range(options.processes)]
+                records = [record for future in futures for record in future.result()]
+        seconds = time.perf_counter() - started
+    if not records:
+        print("No commands were run; raise --duration or --rate.")
+        return
+    report(records, seconds, options.threads * options.processes)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,9 @@
+import pytest
+from app.settings import reload_settings
+
+@pytest.fixture(autouse=True)
+def fresh_settings():
+    """Settings are parsed once per process; each test starts and ends with the current environment."""
+    reload_settings()
+    yield
+    reload_settings()  # Runs after monkeypatch has restored the environment
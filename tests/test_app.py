@@ -1,9 +1,13 @@
 """Tests for the App class"""
 import logging
 import importlib
+import threading
 import pkgutil
 from unittest.mock import MagicMock
 from app import App
+from app.commands import Command
+from app.jobs import JobManager
+from app.settings import reload_settings
 
 def test_app_start_exit_command(capfd, monkeypatch):
     """Test that the REPL exits correctly on 'exit' command."""
@@ -161,3 +165,90 @@ def test_app_development_environment(mocker, caplog):
         else:
             # If generic message is used instead
             assert "Database configuration loaded" in caplog.text or "TESTING ENVIRONMENT" in caplog.text
+
+def test_app_main_menu_cached_until_registration(monkeypatch):
+    """The main menu is formatted once per registry version and rebuilt after register_command."""
+    app = App()
+    app.load_plugins()
+    menu = app.render_main_menu()
+    assert menu.startswith("\nAvailable commands:\n1. calculator\n")
+    assert app.render_main_menu() is menu  # Served from the cache
+
+    app.command_handler.register_command('extra', MagicMock())
+    refreshed = app.render_main_menu()
+    assert refreshed is not menu
+    assert f"{len(app.command_handler.commands)}. extra\n" in refreshed
+
+def test_app_quiet_mode_suppresses_menu(capfd, monkeypatch):
+    """With QUIET enabled the REPL prints no menus, only command output."""
+    monkeypatch.setenv('QUIET', 'true')
+    reload_settings()
+    inputs = iter(['5', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    app = App()
+    app.start()
+
+    captured = capfd.readouterr()
+    assert "Available commands:" not in captured.out
+    assert "Hello, World!" in captured.out
+
+def test_app_settings_are_typed_and_shared(monkeypatch):
+    """Apps share the cached settings object and expose typed values by name."""
+    monkeypatch.setenv('HISTORY_RECORDS', '25')
+    reload_settings()
+    first, second = App(), App()
+    assert first.settings is second.settings
+    assert first.get_environment_variable('HISTORY_RECORDS') == 25
+    assert first.get_environment_variable('PATH') is not None  # Untyped variables still resolve
+
+def test_app_async_repl_runs_background_jobs(capfd, monkeypatch):
+    """A '&' selection runs as a job while the prompt keeps serving commands such as 'jobs'."""
+    monkeypatch.setenv('ASYNC_REPL', 'true')
+    reload_settings()
+    released = threading.Event()
+
+    class SlowCommand(Command):
+        def execute(self):
+            released.wait(5)
+            print("Slow command finished")
+
+    app = App()
+    app.load_plugins()
+    app.command_handler.register_command('slow', SlowCommand())
+    monkeypatch.setattr(app, 'load_plugins', lambda: None)
+    slow = str(len(app.command_handler.commands))
+    jobs = str(list(app.command_handler.commands).index('jobs') + 1)
+
+    def next_input(_):
+        value = next(inputs)
+        if value == 'exit':
+            released.set()
+        return value
+    inputs = iter([f'{slow} &', jobs, 'exit'])
+    monkeypatch.setattr('builtins.input', next_input)
+    app.start()
+
+    out = capfd.readouterr().out
+    assert "started in the background" in out
+    assert "slow        running" in out
+    assert out.rstrip().endswith("Exiting application.")
+    assert "Slow command finished" in out  # Background jobs finish before the REPL exits
+    assert JobManager().jobs[max(JobManager().jobs)].status == 'done'
+
+def test_app_ctrl_c_cancels_only_the_command(capfd, monkeypatch):
+    """Ctrl-C during a command returns to the prompt instead of ending the REPL."""
+    class InterruptedCommand(Command):
+        def execute(self):
+            raise KeyboardInterrupt
+
+    app = App()
+    app.load_plugins()
+    app.command_handler.register_command('interrupted', InterruptedCommand())
+    monkeypatch.setattr(app, 'load_plugins', lambda: None)
+    inputs = iter([str(len(app.command_handler.commands)), '5', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    app.start()
+
+    out = capfd.readouterr().out
+    assert "Command 'interrupted' was cancelled." in out
+    assert "Hello, World!" in out
@@ -0,0 +1,124 @@
+"""Tests for checkpointed, resumable batch jobs"""
+import io
+import gzip
+import json
+import pandas as pd
+import pytest
+from app.batch import BatchJob, parse_chunk_range, skip_records, CHECKPOINT_SUFFIX
+from app.plugins.importer import ImportCommand
+
+@pytest.fixture
+def numbers(tmp_path):
+    """A 10-row input, i.e. five chunks of two rows."""
+    path = tmp_path / "numbers.csv"
+    path.write_text("x\n" + "".join(f"{value}\n" for value in range(10)))
+    return path
+
+def doubled(chunk):
+    chunk['y'] = chunk['x'] * 2
+    return chunk
+
+class Crash(Exception):
+    """Stands in for the process dying part-way through a chunk."""
+
+def test_parse_chunk_range():
+    assert parse_chunk_range('') == (0, None)
+    assert parse_chunk_range('10:20') == (10, 20)
+    assert parse_chunk_range('4:') == (4, None)
+    with pytest.raises(ValueError):
+        parse_chunk_range('5:5')
+    with pytest.raises(ValueError):
+        parse_chunk_range('a:b')
+
+def test_batch_job_runs_all_chunks(numbers, tmp_path):
+    """A completed job writes every chunk once and removes its checkpoint."""
+    output = tmp_path / "out.csv"
+    outcome = BatchJob(str(numbers), str(output), doubled, chunksize=2).run()
+    assert outcome['totals'] == {'chunks': 5, 'rows': 10}
+    assert outcome['resumed_from'] is None
+    assert pd.read_csv(output)['y'].tolist() == [value * 2 for value in range(10)]
+    assert not (tmp_path / f"out.csv{CHECKPOINT_SUFFIX}").exists()
+
+def test_batch_job_resumes_after_crash(numbers, tmp_path):
+    """A rerun skips committed chunks and discards output written after the last checkpoint."""
+    output = tmp_path / "out.csv"
+    processed = []
+
+    def crash_in_chunk_three(chunk):
+        processed.append(int(chunk['x'].iloc[0]))
+        if len(processed) == 3:
+            with open(output, 'a') as file:
+                file.write("4,8\n")  # Half of the chunk made it to disk before the crash
+            raise Crash()
+        return doubled(chunk)
+
+    with pytest.raises(Crash):
+        BatchJob(str(numbers), str(output), crash_in_chunk_three, chunksize=2).run()
+    checkpoint = json.loads((tmp_path / f"out.csv{CHECKPOINT_SUFFIX}").read_text())
+    assert checkpoint['next_chunk'] == 2 and checkpoint['totals']['rows'] == 4
+
+    processed.clear()
+    outcome = BatchJob(str(numbers), str(output), lambda chunk: processed.append(0) or doubled(chunk), chunksize=2).run()
+    assert outcome['resumed_from'] == 2
+    assert len(processed) == 3  # Chunks 2, 3 and 4 only
+    assert outcome['totals'] == {'chunks': 5, 'rows': 10}
+    assert pd.read_csv(output)['x'].tolist() == list(range(10))
+
+def test_batch_job_stale_checkpoint_starts_over(numbers, tmp_path, caplog):
+    """A checkpoint for a different chunking is not resumed."""
+    output = tmp_path / "out.csv"
+    output.write_text("x,y\n0,0\n")
+    (tmp_path / f"out.csv{CHECKPOINT_SUFFIX}").write_text(json.dumps({'job': {'chunksize': 2}, 'next_chunk': 3}))
+    outcome = BatchJob(str(numbers), str(output), doubled, chunksize=5).run()
+    assert outcome['resumed_from'] is None
+    assert "starting over" in caplog.text
+    assert len(pd.read_csv(output)) == 10
+
+def test_batch_job_chunk_ranges_split_the_input(numbers, tmp_path):
+    """Disjoint chunk ranges, e.g. on different machines, together cover the input exactly once."""
+    parts = [tmp_path / "part-0.csv", tmp_path / "part-1.csv"]
+    BatchJob(str(numbers), str(parts[0]), doubled, chunksize=2, stop_chunk=2).run()
+    BatchJob(str(numbers), str(parts[1]), doubled, chunksize=2, first_chunk=2).run()
+    combined = pd.concat([pd.read_csv(part) for part in parts], ignore_index=True)
+    assert combined['x'].tolist() == list(range(10))
+
+def test_skip_records_counts_quoted_line_breaks():
+    """A quoted field spanning lines is one record; escaped quotes do not end the field."""
+    source = io.BytesIO(b'"two\nlines",1\n"say ""hi""\n",2\nplain,3\n')
+    assert skip_records(source, 2) == 2
+    assert source.read() == b'plain,3\n'
+    assert skip_records(io.BytesIO(b'a\n'), 5) == 1
+
+def test_batch_job_chunk_range_of_quoted_gzip_input(tmp_path):
+    """Starting past the first chunk skips whole records, in compressed input too."""
+    input_path, output = tmp_path / "notes.csv.gz", tmp_path / "out.csv"
+    with gzip.open(input_path, 'wt') as file:
+        file.write("x,note\n" + "".join(f'{value},"line\nbreak {value}"\n' for value in range(6)))
+    BatchJob(str(input_path), str(output), doubled, chunksize=2, first_chunk=1).run()
+    result = pd.read_csv(output)
+    assert result['x'].tolist() == [2, 3, 4, 5]
+    assert result['note'].tolist()[0] == "line\nbreak 2"
+
+def test_import_file_resumes_with_totals(tmp_path, monkeypatch):
+    """The importer's error count survives a resume through the checkpoint totals."""
+    input_path = tmp_path / "calculations.csv"
+    input_path.write_text("operation,a,b\n+,1,2\n/,1,0\n*,2,3\nnope,1,1\n")
+    output_path = tmp_path / "results.csv"
+    importer = ImportCommand(chunksize=2)
+    evaluate_chunk = importer.evaluate_chunk
+    calls = []
+
+    def crash_on_second_chunk(chunk):
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise Crash()
+        return evaluate_chunk(chunk)
+
+    monkeypatch.setattr(importer, 'evaluate_chunk', crash_on_second_chunk)
+    with pytest.raises(Crash):
+        importer.import_file(str(input_path), str(output_path))
+    monkeypatch.setattr(importer, 'evaluate_chunk', evaluate_chunk)
+    stats = importer.import_file(str(input_path), str(output_path))
+    assert stats['resumed_from'] == 1
+    assert (stats['rows'], stats['errors']) == (4, 2)
+    assert pd.read_csv(output_path)['result'].isna().tolist() == [False, True, False, True]
@@ -0,0 +1,76 @@
+"""Tests for command timeouts and cooperative cancellation"""
+import time
+import asyncio
+import threading
+import pytest
+from app.commands import Command, CommandHandler
+from app.cancellation import (CancelToken, CommandCancelled, CommandTimeout, cancel_scope, check_cancelled,
+                              current_token)
+from app.jobs import JobManager
+from app.plugins.importer import ImportCommand
+
+class LoopingCommand(Command):
+    """Works in small steps, checking for cancellation between them."""
+    def __init__(self):
+        self.steps = 0
+        self.started = threading.Event()
+
+    def execute(self):
+        self.started.set()
+        while True:
+            check_cancelled()
+            self.steps += 1
+            time.sleep(0.001)
+
+def test_token_deadline_and_cancel():
+    """A token raises at a check point once cancelled or past its deadline, and only inside its scope."""
+    check_cancelled()  # No current token: a no-op
+    with cancel_scope(CancelToken(timeout=0.01)) as token:
+        check_cancelled()
+        time.sleep(0.02)
+        with pytest.raises(CommandTimeout, match="timed out after 0.01s"):
+            check_cancelled()
+    assert current_token.get() is None
+    assert isinstance(token.stopped, CommandTimeout)
+
+    token = CancelToken()
+    assert token.remaining() is None
+    token.cancel()
+    with pytest.raises(CommandCancelled, match="was cancelled"):
+        token.check()
+
+def test_execute_command_enforces_timeout(capfd):
+    """A runaway command is stopped at its next check point and reported, not propagated."""
+    handler = CommandHandler()
+    command = LoopingCommand()
+    handler.register_command('loop', command)
+    started = time.monotonic()
+    handler.execute_command('loop', timeout=0.05)
+    assert time.monotonic() - started < 1
+    assert command.steps > 0
+    assert "Command 'loop' timed out after 0.05s." in capfd.readouterr().out
+
+def test_importer_stops_between_chunks(tmp_path):
+    """Chunked imports check the token before every chunk."""
+    input_path = tmp_path / "calculations.csv"
+    input_path.write_text("operation,a,b\n" + "add,1,2\n" * 100)
+    token = CancelToken()
+    token.cancel()
+    with cancel_scope(token), pytest.raises(CommandCancelled):
+        ImportCommand(chunksize=10).import_file(str(input_path), str(tmp_path / "out.csv"))
+
+def test_job_cancel_stops_worker_thread():
+    """Cancelling a job stops its command cooperatively and marks it cancelled."""
+    handler = CommandHandler()
+    command = LoopingCommand()
+    handler.register_command('loop', command)
+
+    async def run():
+        job = JobManager().submit('loop', handler.execute_command, 'loop')
+        await asyncio.get_running_loop().run_in_executor(None, command.started.wait, 5)
+        job.cancel()
+        await job.task
+        return job
+    job = asyncio.run(run())
+    assert job.status == 'cancelled'
+    assert job.token.remaining() is None
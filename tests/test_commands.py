@@ -3,13 +3,22 @@ import logging
 import sys
 from unittest.mock import MagicMock,patch,mock_open
 import os
+import numpy as np
 import pandas as pd
 import pytest
 from app import App
-from app.commands import Command, CommandHandler,CommandHistoryManager
-from app.plugins.calculator import CalculatorCommand
-from app.plugins.csv import CsvCommand
+from app.commands import Command, CommandHandler,CommandHistoryManager, HistoryPartitions, session_scope
+from app import commands as commands_module
+from app.plugins.calculator import CalculatorCommand, OperationRegistry
+from app.plugins.calculator.expression import ArrayExpression
+from app.plugins.calculator.matrix import parse_matrix
+from app.plugins.csv import CsvCommand, parse_filter, parse_suffixed
 from app.plugins.history import HistoryCommand
+from app.plugins.importer import ImportCommand
+from app.plugins.logs import LogsCommand
+from app.plugins.memory import MemoryCommand
+from app import profiler as profiler_module
+from app.plugins.stats import StatsCommand, RunningStats, rolling, HISTOGRAM_BINS
 from app.plugins.menu import MenuCommand
 from app.plugins.exit import ExitCommand
 
@@ -35,7 +44,7 @@ def test_app_greet_command(capfd, monkeypatch, caplog):
 
 def test_app_menu_command(capfd, monkeypatch, caplog):
     """Test that the REPL correctly handles the 'menu' command and its logging."""
-    inputs = iter(['7','0','exit'])
+    inputs = iter(['12','0','exit'])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
     with caplog.at_level(logging.INFO):
@@ -69,26 +78,29 @@ class MockSubtractCommand(Command):
 def mock_operations(monkeypatch):
     """Fixture to mock the operations loaded by the CalculatorCommand."""
     def mock_load_operations(self):
-        return {'1': MockAddCommand(), '2': MockSubtractCommand()}
+        registry = OperationRegistry()
+        registry.register(MockAddCommand())
+        registry.register(MockSubtractCommand())
+        return registry
     monkeypatch.setattr(CalculatorCommand, "load_operations", mock_load_operations)
 
 def test_calculator_display_operations_and_exit(capfd, monkeypatch, mock_operations):
     """Test the CalculatorCommand display and exit functionality."""
-    monkeypatch.setattr('builtins.input', lambda _: '5')
+    monkeypatch.setattr('builtins.input', lambda _: 'back')
     calculator_cmd = CalculatorCommand()
     calculator_cmd.execute()
     captured = capfd.readouterr()
     assert "\nCalculator Operations:" in captured.out
-    assert "1. MockAddCommand" in captured.out
-    assert "2. MockSubtractCommand" in captured.out
-    assert "5. Back" in captured.out
+    assert "MockAddCommand" in captured.out
+    assert "MockSubtractCommand" in captured.out
+    assert "back Back" in captured.out
 
 # inputs = iter(['1', '0'])
 # monkeypatch.setattr('builtins.input', lambda _: next(inputs, 'default_value'))
 
 def test_calculator_execute_operation(capfd, monkeypatch):
     """Test the CalculatorCommand execute operation functionality."""
-    inputs = ['1', '2', '3', '5']
+    inputs = ['+', '2', '3', 'back']
     input_generator = (input for input in inputs)
     monkeypatch.setattr('builtins.input', lambda _: next(input_generator))
     calculator_cmd = CalculatorCommand()
@@ -96,6 +108,20 @@ def test_calculator_execute_operation(capfd, monkeypatch):
     captured = capfd.readouterr()
     assert "The result is 5.0" in captured.out
 
+def test_calculator_undo_redo_results(capfd, monkeypatch):
+    """Results are recorded per session and undo/redo step through them."""
+    inputs = iter(['+', '2', '3', '2 * 4', 'undo', 'results', 'redo', 'redo', 'results', 'back'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    calculator_cmd = CalculatorCommand()
+    calculator_cmd.execute()
+    captured = capfd.readouterr()
+    assert "Undone: 2 * 4 = 8.0" in captured.out
+    assert "Redone: 2 * 4 = 8.0" in captured.out
+    assert "Nothing to redo." in captured.out
+    assert captured.out.count("1. Addition = 5.0") == 2
+    assert "2. 2 * 4 = 8.0" in captured.out
+    assert list(calculator_cmd.results.rows) == [('Addition', 5.0), ('2 * 4', 8.0)]
+
 class MockCommand(Command):
     """Mock command for testing."""
     def execute(self):
@@ -110,6 +136,17 @@ def command_handler_with_commands():
     handler.register_command('help', MockCommand())
     return handler
 
+def test_command_handler_list_commands(capfd, command_handler_with_commands):
+    """The listing is rendered once per registry version and refreshed on registration."""
+    listing = command_handler_with_commands.render_commands()
+    assert listing == "1. test\n2. help\n"
+    assert command_handler_with_commands.render_commands() is listing
+
+    command_handler_with_commands.register_command('extra', MockCommand())
+    command_handler_with_commands.list_commands()
+    captured = capfd.readouterr()
+    assert captured.out == "1. test\n2. help\n3. extra\n"
+
 def test_menu_command_display_and_exit(capfd, monkeypatch, command_handler_with_commands):
     """Test the MenuCommand display and exit functionality."""
     monkeypatch.setattr('builtins.input', lambda _: '0')
@@ -179,12 +216,8 @@ def test_csv_command(capfd, tmpdir, caplog):
         df.to_csv(input_file_path, index=False)
 
          # Mock the CsvCommand to use the temporary directory and files
-        csv_command = CsvCommand()
-        csv_command._CsvCommand__data_dir = str(data_dir)  # Override private attributes
-        csv_command._CsvCommand__input_file_path = str(input_file_path)
-        csv_command._CsvCommand__output_file_path = str(output_file_path)
-        csv_command._CsvCommand__sort_by = 'Population'
-        csv_command._CsvCommand__columns_to_keep = ['State Abbreviation', 'State Name', 'Population']
+        csv_command = CsvCommand(input_path=str(input_file_path), output_path=str(output_file_path),
+                                 sort_by='Population', columns=['State Abbreviation', 'State Name', 'Population'])
         with caplog.at_level(logging.INFO):
             csv_command.execute()
 
@@ -205,7 +238,7 @@ def test_csv_command(capfd, tmpdir, caplog):
 def test_app_calculator_command(capfd, monkeypatch, caplog):
     """Test that the REPL correctly handles the 'calculator' command and its logging."""
     # Added more inputs to handle all calculator interactions
-    inputs = iter(['1', '1', '1', '2', '5', '0', 'exit'])
+    inputs = iter(['1', 'add', '1', '2', 'back', '0', 'exit'])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
     with caplog.at_level(logging.INFO):
@@ -276,6 +309,8 @@ def mock_command_history_manager():
         # Setup mock to return a predefined history
         mock_instance = mock.return_value
         mock_instance.get_history.return_value = ['history', 'menu', 'history']
+        # Clearing empties the mocked history, as it would the real one
+        mock_instance.clear_history.side_effect = lambda: setattr(mock_instance.get_history, 'return_value', [])
         yield mock
 
 def test_app_history_command_operations(mock_command_history_manager, capfd, caplog):
@@ -309,8 +344,8 @@ def test_app_history_command_operations(mock_command_history_manager, capfd, cap
 
 def test_calculator_divide_operation(capfd, monkeypatch, caplog):
     """Test the calculator's divide operation."""
-    # Simulate user selecting calculator(1), divide(2), entering numbers, then back(5), then exit
-    inputs = iter(['1', '2', '10', '2', '5', 'exit'])
+    # Simulate user selecting calculator(1), divide(/), entering numbers, then back, then exit
+    inputs = iter(['1', '/', '10', '2', 'back', 'exit'])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
     with caplog.at_level(logging.INFO):
@@ -328,7 +363,7 @@ def test_calculator_divide_operation(capfd, monkeypatch, caplog):
 
 def test_calculator_divide_by_zero(capfd, monkeypatch, caplog):
     """Test the calculator's divide operation with division by zero."""
-    inputs = iter(['1', '2', '10', '0', '5', 'exit'])
+    inputs = iter(['1', '/', '10', '0', 'back', 'exit'])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
     with caplog.at_level(logging.WARNING):
@@ -344,7 +379,7 @@ def test_calculator_divide_by_zero(capfd, monkeypatch, caplog):
 
 def test_calculator_multiply_operation(capfd, monkeypatch, caplog):
     """Test the calculator's multiply operation."""
-    inputs = iter(['1', '3', '4', '5', '5', 'exit'])
+    inputs = iter(['1', '*', '4', '5', 'back', 'exit'])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
     with caplog.at_level(logging.INFO):
@@ -362,7 +397,7 @@ def test_calculator_multiply_operation(capfd, monkeypatch, caplog):
 
 def test_calculator_subtract_operation(capfd, monkeypatch, caplog):
     """Test the calculator's subtract operation."""
-    inputs = iter(['1', '4', '8', '3', '5', 'exit'])
+    inputs = iter(['1', 'subtract', '8', '3', 'back', 'exit'])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
     with caplog.at_level(logging.INFO):
@@ -403,8 +438,10 @@ def test_exit_command(capfd, caplog):
 def test_calculator_invalid_selection(capfd, caplog):
     """Test handling of invalid selection in CalculatorCommand."""
     # Mock operations and user input
-    with patch.object(CalculatorCommand, 'load_operations', return_value={'1': MagicMock()}):
-        with patch('builtins.input', side_effect=['invalid', '5']):
+    registry = OperationRegistry()
+    registry.register(MockAddCommand())
+    with patch.object(CalculatorCommand, 'load_operations', return_value=registry):
+        with patch('builtins.input', side_effect=['invalid', 'back']):
             with caplog.at_level(logging.WARNING):
                 # Execute calculator command
                 calculator = CalculatorCommand()
@@ -435,8 +472,8 @@ def test_calculator_load_plugin_type_error(capfd, caplog):
                 with patch('builtins.getattr', mock_getattr):
                     # This should continue without raising exception due to TypeError handling
                     calculator = CalculatorCommand()
-                    # Verify operations dictionary was created
-                    assert isinstance(calculator.operations, dict)
+                    # Verify operations registry was created
+                    assert isinstance(calculator.operations, OperationRegistry)
 
 def test_calculator_skip_subpackage():
     """Test that subpackages are skipped during plugin loading."""
@@ -471,8 +508,8 @@ def test_calculator_skip_specific_type_error(capfd, caplog):
                     # Specific TypeError should be caught and handled without raising
                     calculator = CalculatorCommand()
 
-                    # Verify calculator was instantiated and operations dict exists
-                    assert isinstance(calculator.operations, dict)
+                    # Verify calculator was instantiated and operations registry exists
+                    assert isinstance(calculator.operations, OperationRegistry)
 
                     # Verify no error was logged (the specific TypeError is silently ignored)
                     assert "Error loading calculator plugin" not in caplog.text
@@ -528,27 +565,57 @@ def test_history_delete_valid_record(capfd):
     mock_manager = MagicMock()
     mock_manager.get_history.return_value = ['cmd1', 'cmd2', 'cmd3']
 
-    # Create a mock DataFrame for history
-    mock_df = MagicMock()
-    # Setup index to handle the lookup correctly
-    mock_df.index = pd.RangeIndex(0, 3)
-    mock_manager.history = mock_df
-
     with patch('builtins.input', return_value='2'):  # Select record #2
         history_command = HistoryCommand()
         history_command.history_manager = mock_manager
         history_command.delete_history_record()
 
-        # Check that drop was called with index 1 (2-1)
-        mock_df.drop.assert_called_once()
-        # First argument should be index 1
-        assert mock_df.drop.call_args[0][0] == 1
-        mock_manager.save_history.assert_called_once()
+        # The record is deleted by zero-based position (2-1), through the undo journal
+        mock_manager.delete_record.assert_called_once_with(1)
 
         # Check output
         captured = capfd.readouterr()
         assert "Record deleted successfully." in captured.out
 
+def test_history_undo_redo(capfd):
+    """Undo and redo report the change the manager stepped through."""
+    mock_manager = MagicMock()
+    mock_manager.undo.return_value = "delete 'greet'"
+    mock_manager.redo.return_value = None
+
+    with patch('builtins.input', side_effect=['u', 'r', '5']):
+        history_command = HistoryCommand()
+        history_command.history_manager = mock_manager
+        history_command.execute()
+
+    captured = capfd.readouterr()
+    assert "u. Undo" in captured.out
+    assert "Undone: delete 'greet'" in captured.out
+    assert "Nothing to redo." in captured.out
+
+def test_history_partitions_are_isolated_and_bounded(tmp_path):
+    """Each session writes its own file; only the most recently used partitions stay loaded."""
+    partitions = HistoryPartitions(directory=str(tmp_path), capacity=2)
+    partitions.get('alice').add_command('greet')
+    partitions.get('bob').add_command('csv')
+    partitions.get('carol/../x').add_command('stats')
+    assert 'alice' not in partitions and len(partitions) == 2
+    assert partitions.get('alice').get_history() == ['greet']  # Reloaded from its file
+    assert partitions.get('bob').get_history() == ['csv']
+    assert 'carol/../x' not in partitions
+    assert os.path.dirname(partitions.path_for('carol/../x')) == str(tmp_path)
+    assert partitions.path_for('a/b') != partitions.path_for('a_b')
+
+def test_history_command_uses_session_history(tmp_path, monkeypatch, capfd):
+    """Within session_scope the history command sees only that session's records."""
+    monkeypatch.setattr(commands_module, '_partitions', HistoryPartitions(directory=str(tmp_path), capacity=4))
+    with session_scope('alice'):
+        commands_module.current_history().add_command('greet')
+        with patch('builtins.input', side_effect=['1', '5']):
+            HistoryCommand().execute()
+    assert "1. greet" in capfd.readouterr().out
+    assert commands_module.current_history() is CommandHistoryManager()
+
 def test_history_delete_invalid_index(capfd):
     """Test delete_history_record with invalid index selection."""
     # Create mock with sample history
@@ -622,7 +689,7 @@ def test_execute_with_none_dataframe(tmp_path, caplog):
     mock_file = tmp_path / "sorted_states.csv"
     mock_file.write_text(mock_csv_data)
 
-    with patch.object(csv_command, '_CsvCommand__output_file_path', str(mock_file)):
+    with patch.object(csv_command, 'output_path', str(mock_file)):
         # Patch read_sort_and_reduce to return None
         with patch.object(csv_command, 'read_sort_and_reduce', return_value=None):
             # Ensure directory exists and is writable
@@ -630,3 +697,354 @@ def test_execute_with_none_dataframe(tmp_path, caplog):
                 with patch('os.access', return_value=True):
                     # Execute the command
                     csv_command.execute()
+
+def test_operation_registry_lookup():
+    """Operations are found by symbol, name or alias, case-insensitively."""
+    registry = CalculatorCommand().operations
+    assert [operation.name for operation in registry] == ['add', 'divide', 'dot', 'matmul', 'norm', 'solve', 'transpose',
+                                                         'modulo', 'multiply', 'power', 'subtract']
+    assert registry.get('+') is registry.get('ADD') is registry.get(' plus ')
+    assert registry.get('mul').__class__.__name__ == 'Multiply'
+    assert registry.get('unknown') is None
+    assert '^' in registry
+    assert registry.evaluate('pow', 2.0, 10.0) == 1024.0
+    with pytest.raises(KeyError):
+        registry.evaluate('unknown', 1.0, 2.0)
+
+def test_operation_registry_vectorized_compute():
+    """The same operations evaluate whole arrays, with NaN where a divisor is zero."""
+    registry = CalculatorCommand().operations
+    a = np.array([10.0, 7.0, 3.0])
+    b = np.array([2.0, 0.0, 2.0])
+    np.testing.assert_array_equal(registry.evaluate('*', a, b), [20.0, 0.0, 6.0])
+    np.testing.assert_array_equal(registry.evaluate('/', a, b), [5.0, np.nan, 1.5])
+    np.testing.assert_array_equal(registry.evaluate('%', a, b), [0.0, np.nan, 1.0])
+
+def test_calculator_expression(capfd, monkeypatch, caplog):
+    """Typing an infix expression at the operation prompt evaluates it directly."""
+    inputs = iter(['2 ^ 8', '7 mod 4', '1 ? 2', 'back'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    with caplog.at_level(logging.INFO):
+        CalculatorCommand().execute()
+
+    captured = capfd.readouterr()
+    assert "The result is 256.0" in captured.out
+    assert "The result is 3.0" in captured.out
+    assert "Invalid selection. Please try again." in captured.out
+    assert "Exponentiation result: 256.0" in caplog.text
+
+def test_import_command_evaluates_in_chunks(tmp_path):
+    """Bulk import evaluates each chunk per operator and appends a result column."""
+    input_path = tmp_path / "calculations.csv"
+    input_path.write_text("operation,a,b\n+,1,2\nmul,3,4\n/,1,0\n^,2,3\nnope,1,1\n-,10,4\n")
+    output_path = tmp_path / "results.csv"
+
+    stats = ImportCommand(chunksize=2).import_file(str(input_path), str(output_path))
+
+    assert stats['rows'] == 6
+    assert stats['errors'] == 2  # Division by zero and the unknown operator
+    results = pd.read_csv(output_path)
+    assert list(results.columns) == ['operation', 'a', 'b', 'result']
+    assert results['result'].tolist()[:2] == [3.0, 12.0]
+    assert results['result'].isna().tolist() == [False, False, True, False, True, False]
+    assert results['result'].iloc[-1] == 6.0
+
+def test_import_command_execute(capfd, monkeypatch, tmp_path):
+    """The interactive import prompts for paths and defaults the output next to the input."""
+    input_path = tmp_path / "calculations.csv"
+    input_path.write_text("operation,a,b\nadd,1,2\n")
+    inputs = iter([str(input_path), ''])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    ImportCommand().execute()
+
+    captured = capfd.readouterr()
+    assert "Imported 1 calculations (0 errors)" in captured.out
+    assert (tmp_path / "calculations_results.csv").exists()
+
+def test_import_command_missing_file(capfd, monkeypatch, tmp_path, caplog):
+    """A missing input file is reported instead of crashing the REPL."""
+    inputs = iter([str(tmp_path / "missing.csv"), ''])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    ImportCommand().execute()
+
+    assert "Could not import" in capfd.readouterr().out
+    assert "Error importing calculations" in caplog.text
+
+def test_csv_command_projection_filter_and_multi_sort(tmp_path):
+    """Only the needed columns are parsed, filters drop rows and several sort keys are honoured."""
+    input_path = tmp_path / "states.csv"
+    input_path.write_text(
+        "State Abbreviation,State Name,Population,Capital,GDP\n"
+        "CA,California,39538223,Sacramento,3.1T\n"
+        "NJ,New Jersey,8882190,Trenton,0.6T\n"
+        "TX,Texas,29145505,Austin,1.9T\n"
+        "WA,Washington,7693612,Olympia,0.6T\n"
+        "OR,Oregon,4237256,Salem,0.3T\n"
+    )
+    csv_command = CsvCommand(input_path=str(input_path), output_path=str(tmp_path / "out.csv"),
+                             columns=['State Abbreviation', 'Population'],
+                             filters=['Population>5000000', ('Capital', '!=', 'Austin')],
+                             sort_by=['GDP', 'Population'], ascending=[True, False],
+                             dtypes={'Population': 'int64'})
+
+    options = csv_command.reader_options()
+    assert options['usecols'] == ['State Abbreviation', 'Population', 'GDP', 'Capital']
+    assert options['dtype'] == {'Population': 'int64'}
+
+    reduced = csv_command.read_sort_and_reduce()
+    assert list(reduced.columns) == ['State Abbreviation', 'Population']
+    assert reduced['State Abbreviation'].tolist() == ['NJ', 'WA', 'CA']
+
+    chunked = CsvCommand(input_path=str(input_path), output_path=str(tmp_path / "out.csv"),
+                         columns=['State Abbreviation', 'Population'], filters=['Population>5000000'],
+                         sort_by='Population', chunksize=2)
+    assert chunked.read_sort_and_reduce()['State Abbreviation'].tolist() == ['WA', 'NJ', 'TX', 'CA']
+
+def test_csv_parse_filter():
+    """Filter strings parse numbers as floats and keep other values as text."""
+    assert parse_filter('Population >= 100') == ('Population', '>=', 100.0)
+    assert parse_filter("Capital=='Salem'") == ('Capital', '==', 'Salem')
+    with pytest.raises(ValueError):
+        parse_filter('Population')
+
+def test_parse_suffixed():
+    """K/M/B/T suffixes scale the number; blanks and garbage become NaN."""
+    parsed = parse_suffixed(pd.Series(['3.1T', '0.6t', '450M', '1.5K', '12', None, 'n/a', '3.1T']))
+    np.testing.assert_allclose(parsed.to_numpy(), [3.1e12, 0.6e12, 4.5e8, 1.5e3, 12.0, np.nan, np.nan, 3.1e12])
+    assert parse_suffixed(pd.Series([1, 2])).dtype == float
+    assert parse_filter('GDP>=1.5T') == ('GDP', '>=', 1.5e12)
+
+def test_csv_command_numeric_sort_and_aggregate():
+    """GDP is parsed at load time, so it sorts numerically and aggregates as floats."""
+    csv_command = CsvCommand(sort_by='GDP', ascending=False, filters=['GDP>1T'])
+    reduced = csv_command.read_sort_and_reduce()
+    assert reduced['State Abbreviation'].tolist() == ['CA', 'TX', 'NY', 'FL']
+    assert reduced['GDP'].dtype == float
+
+    totals = csv_command.aggregate(functions=('sum', 'max'))
+    assert totals.loc['sum', 'GDP'] == pytest.approx(7.8e12)
+    assert totals.loc['max', 'Population'] == 39538223
+
+STATES_HEADER = "State Abbreviation,State Name,Population,Capital,GDP\n"
+STATES_ROWS = [
+    "CA,California,39538223,Sacramento,3.1T\n",
+    "NJ,New Jersey,8882190,Trenton,0.6T\n",
+    "TX,Texas,29145505,Austin,1.9T\n",
+]
+
+def test_csv_command_incremental_runs(tmp_path):
+    """Unchanged input reuses the output, appended rows are merged, other edits trigger a full run."""
+    input_path = tmp_path / "states.csv"
+    input_path.write_text(STATES_HEADER + ''.join(STATES_ROWS))
+    output_path = str(tmp_path / "sorted.csv")
+
+    def command():
+        return CsvCommand(input_path=str(input_path), output_path=output_path, sort_by='Population')
+
+    _, status = command().process()
+    assert status == 'full'
+    assert os.path.exists(output_path + ".manifest.json")
+
+    cached = command()
+    with patch.object(cached, 'read_sort_and_reduce') as full_run:
+        df, status = cached.process()
+        full_run.assert_not_called()
+    assert status == 'unchanged'
+    assert df['State Abbreviation'].tolist() == ['NJ', 'TX', 'CA']
+
+    with open(input_path, 'a') as handle:
+        handle.write("OR,Oregon,4237256,Salem,0.3T\nFL,Florida,21538187,Tallahassee,1.1T\n")
+    merged, status = command().process()
+    assert status == 'appended'
+    expected = CsvCommand(input_path=str(input_path), output_path=str(tmp_path / "fresh.csv"),
+                          sort_by='Population').read_sort_and_reduce().reset_index(drop=True)
+    pd.testing.assert_frame_equal(merged, expected)
+    pd.testing.assert_frame_equal(pd.read_csv(output_path), expected)
+
+    input_path.write_text(STATES_HEADER + ''.join(reversed(STATES_ROWS)))
+    assert command().process()[1] == 'full'
+
+    reconfigured = CsvCommand(input_path=str(input_path), output_path=output_path, sort_by='GDP')
+    assert reconfigured.process()[1] == 'full'
+
+def test_csv_command_touched_input_is_unchanged(tmp_path, capfd):
+    """A newer mtime with identical content is detected by hash and still reuses the output."""
+    input_path = tmp_path / "states.csv"
+    input_path.write_text(STATES_HEADER + ''.join(STATES_ROWS))
+    output_path = str(tmp_path / "sorted.csv")
+    CsvCommand(input_path=str(input_path), output_path=output_path).process()
+
+    mtime = os.stat(input_path).st_mtime_ns + 5_000_000_000
+    os.utime(input_path, ns=(mtime, mtime))
+    CsvCommand(input_path=str(input_path), output_path=output_path).execute()
+
+    captured = capfd.readouterr()
+    assert "Input unchanged since the last run" in captured.out
+    assert "Record 0: CA: California" in captured.out
+
+def test_logs_command_queries_text_log(tmp_path, monkeypatch, capfd):
+    """The logs command prints the last matching entries of a plain text log."""
+    path = tmp_path / "app.log"
+    path.write_text("2024-05-01 10:00:00,001 - INFO - Executing GreetCommand.\n"
+                    "2024-05-01 10:00:01,002 - WARNING - Invalid selection in CalculatorCommand.\n"
+                    "2024-05-02 09:00:00,003 - ERROR - Error processing the file: boom\n")
+    inputs = iter(['warning', '', '', '2024-05-02', ''])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    logs_command = LogsCommand(path=str(path))
+    logs_command.execute()
+
+    out = capfd.readouterr().out
+    assert "2024-05-02T09:00:00.003 ERROR    app: Error processing the file: boom" in out
+    assert "Invalid selection" not in out
+    assert [entry['level'] for entry in logs_command.query(limit=2)] == ['WARNING', 'ERROR']
+
+def test_running_stats_merge_matches_numpy():
+    """Partials from any split of the data merge into the single-pass mean and variance."""
+    values = np.random.default_rng(0).normal(1e6, 250.0, 10_001)
+    left = RunningStats().update(values[:17])
+    right = RunningStats().update(values[17:5000]).merge(RunningStats().update(values[5000:]))
+    merged = left.merge(right).summary()
+    assert merged['count'] == values.size
+    assert merged['mean'] == pytest.approx(values.mean())
+    assert merged['std'] == pytest.approx(values.std(ddof=1))
+    assert (merged['min'], merged['max']) == (values.min(), values.max())
+
+def test_stats_file_streams_chunks(tmp_path):
+    """Chunked files give exact moments and percentiles within one histogram bin."""
+    values = np.random.default_rng(1).exponential(1000.0, 5000)
+    path = tmp_path / "values.csv"
+    pd.DataFrame({'label': 'x', 'value': values, 'scaled': [f"{v:.3f}K" for v in values]}).to_csv(path, index=False)
+    summary = StatsCommand(chunksize=700).summarize_file(str(path), percentiles=[50, 99])
+
+    assert list(summary.columns) == ['value', 'scaled']  # 'label' is not numeric
+    assert summary.loc['std', 'value'] == pytest.approx(values.std(ddof=1))
+    assert summary.loc['mean', 'scaled'] == pytest.approx(values.mean() * 1000, rel=1e-6)
+    bin_width = (values.max() - values.min()) / HISTOGRAM_BINS
+    for percentile in (50, 99):
+        assert abs(summary.loc[f"p{percentile}", 'value'] - np.percentile(values, percentile)) <= bin_width
+
+def test_stats_rolling_carries_across_chunks():
+    """Rolling windows computed chunk by chunk equal one pass over the whole column."""
+    values = np.arange(20, dtype=float) ** 2
+    whole = rolling(values, 4, 'std')
+    first = rolling(values[:9], 4, 'std')
+    second = rolling(values[9:], 4, 'std', carry=values[6:9])
+    np.testing.assert_allclose(np.concatenate([first, second]), whole)
+    assert np.isnan(whole[:3]).all()
+
+def test_stats_pipeline_stage():
+    """The stats stage summarizes or adds a rolling column to the previous stage's frame."""
+    frame = pd.DataFrame({'State': ['A', 'B', 'C'], 'GDP': ['1T', '2T', '4T']})
+    stats_command = StatsCommand()
+    summary = stats_command.run(frame, 'GDP')
+    assert summary.loc['sum', 'GDP'] == 7e12
+    assert summary.loc['p50', 'GDP'] == 2e12
+    assert stats_command.run(frame, 'rolling', 'GDP', '2', 'max')['GDP_max_2'].tolist()[1:] == [2e12, 4e12]
+    with pytest.raises(ValueError, match="not numeric"):
+        stats_command.run(frame, 'rolling', 'State', '2')
+    with pytest.raises(ValueError, match="at least 1"):
+        stats_command.run(frame, 'rolling', 'GDP', '0')
+
+def test_stats_rolling_streams_files(tmp_path, monkeypatch, capfd):
+    """Rolling statistics over a file are written chunk by chunk and equal one in-memory pass."""
+    values = np.random.default_rng(3).normal(100.0, 5.0, 1000)
+    path, output = tmp_path / "values.csv", tmp_path / "rolling.csv"
+    pd.DataFrame({'label': 'x', 'value': values}).to_csv(path, index=False)
+    inputs = iter([str(path), 'rolling value 9 std', str(output)])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    StatsCommand(chunksize=4).execute()  # Chunks shorter than the window still carry over
+
+    assert "Wrote 1000 rows with value_std_9" in capfd.readouterr().out
+    result = pd.read_csv(output)
+    assert list(result.columns) == ['label', 'value', 'value_std_9']
+    np.testing.assert_allclose(result['value_std_9'], rolling(values, 9, 'std'))
+
+def test_array_expression_matches_numpy_across_chunks():
+    """Chunked, buffer-reusing evaluation gives NumPy's result, with NaN for division by zero."""
+    registry = OperationRegistry.discover()
+    rng = np.random.default_rng(2)
+    a, b = rng.random(5000) * 10, np.round(rng.random(5000) * 3)
+    expression = ArrayExpression("-(a * 2 + b) / b ^ 2 - a % 3", registry, cache_bytes=8 * 1024)
+    assert expression.variables == ['a', 'b']
+    assert expression.buffers <= 2  # Intermediates share scratch buffers
+    out = np.empty(5000)
+    assert expression.evaluate({'a': a, 'b': b}, out=out) is out
+    with np.errstate(all='ignore'):
+        expected = np.where(b != 0, -(a * 2 + b) / b ** 2 - a % 3, np.nan)
+    np.testing.assert_allclose(out, expected)
+    assert ArrayExpression("2 ^ 3 ^ 2", registry).evaluate({})[0] == 512.0
+
+@pytest.mark.parametrize("text", ["a +", "(a * 2", "a $ b"])
+def test_array_expression_rejects_invalid_formulas(text):
+    """Malformed formulas raise ValueError at compile time."""
+    with pytest.raises(ValueError):
+        ArrayExpression(text, OperationRegistry.discover())
+
+def test_operations_write_into_out_operand():
+    """out= may be one of the operands, which is how scratch buffers are reused."""
+    registry = OperationRegistry.discover()
+    a, b = np.array([6.0, 1.0, 9.0]), np.array([3.0, 0.0, 2.0])
+    registry.evaluate('/', a, b, out=b)
+    np.testing.assert_array_equal(b, [2.0, np.nan, 4.5])
+
+def test_calculator_formula_and_eval_stage(capfd, monkeypatch):
+    """Longer formulas work interactively and 'eval' computes a column in a pipeline."""
+    inputs = iter(['2 + 3 * (4 - 1)', 'back'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    calculator = CalculatorCommand()
+    calculator.execute()
+    assert "The result is 11.0" in capfd.readouterr().out
+
+    frame = pd.DataFrame({'Population': [10, 20], 'GDP': [1e6, 2e6]})
+    result = calculator.run(frame, 'eval', 'Mix', '(Population * 2 + GDP / 1e6) / 3')
+    assert result['Mix'].tolist() == [7.0, 14.0]
+
+def test_parse_matrix_inline_and_csv(tmp_path):
+    """Vectors and matrices are typed inline or loaded from CSV, with or without a header."""
+    np.testing.assert_array_equal(parse_matrix("1 2 3"), [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(parse_matrix("1, 2; 3, 4"), [[1.0, 2.0], [3.0, 4.0]])
+    path = tmp_path / "matrix.csv"
+    path.write_text("x,y\n1,2\n3,4\n")
+    np.testing.assert_array_equal(parse_matrix(str(path)), [[1.0, 2.0], [3.0, 4.0]])
+    with pytest.raises(ValueError):
+        parse_matrix("1 2; 3")
+
+def test_matrix_operations():
+    """Linear-algebra operations are looked up like the scalar ones and validate shapes first."""
+    registry = OperationRegistry.discover()
+    a, b = np.array([[2.0, 1.0], [1.0, 3.0]]), np.array([3.0, 5.0])
+    np.testing.assert_allclose(registry.evaluate('@', a, b), [11.0, 18.0])
+    np.testing.assert_allclose(a @ registry.evaluate('\\', a, b), b)
+    assert registry.evaluate('dot', b, b) == 34.0
+    assert registry.evaluate('norm', np.array([3.0, 4.0])) == 5.0
+    np.testing.assert_array_equal(registry.evaluate('t', np.array([[1.0, 2.0]])), [[1.0], [2.0]])
+    assert registry.get('solve').check(np.ones((2, 2)), b) == "The coefficient matrix is singular."
+    assert "Cannot take the dot product" in registry.get('dot').check(b, np.ones(3))
+    assert "needs vectors or matrices" in registry.get('matmul').check(2.0, 3.0)
+
+def test_matrix_operands_are_read_from_prompts(monkeypatch, capfd):
+    """Interactive matrix input asks for each operand and asks again after a malformed one."""
+    inputs = iter(['1 2; 3', '1 2; 3 4', '1 0; 0 1'])
+    monkeypatch.setattr('builtins.input', lambda text: next(inputs))
+    a, b = OperationRegistry.discover().get('matmul').read_operands()
+    np.testing.assert_array_equal(a, [[1.0, 2.0], [3.0, 4.0]])
+    np.testing.assert_array_equal(b, np.eye(2))
+    assert "Not a vector or matrix" in capfd.readouterr().out
+
+def test_matrix_operations_are_not_applied_per_row(tmp_path):
+    """Bulk import and column pipelines refuse operations that are not element-wise."""
+    frame = pd.DataFrame({'operation': ['dot', 'add'], 'a': [1.0, 1.0], 'b': [2.0, 2.0]})
+    assert ImportCommand().evaluate_chunk(frame)['result'].isna().tolist() == [True, False]
+    with pytest.raises(ValueError, match="value by value"):
+        CalculatorCommand().run(frame, 'dot', 'a', 'b')
+
+def test_memory_command_reports_profiled_commands(monkeypatch, capfd):
+    """The memory command explains how to enable profiling, then lists what was traced."""
+    profiler = profiler_module.MemoryProfiler(top=0)
+    monkeypatch.setattr(profiler_module, '_profiler', profiler)
+    MemoryCommand().execute()
+    assert "Set MEMORY_PROFILE=true" in capfd.readouterr().out
+
+    profiler.record(profiler_module.MemoryUsage('csv', 4096, 1024, []))
+    MemoryCommand().execute()
+    assert "csv" in capfd.readouterr().out.splitlines()[-1]
@@ -0,0 +1,77 @@
+"""Tests for the undo/redo journal and the journaled command history"""
+import pandas as pd
+import pytest
+from app.commands import CommandHistoryManager
+from app.journal import Journal, RowStore, Append, Delete, Clear
+from app.settings import reload_settings
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """A fresh (non-singleton) history manager persisting to a temporary file."""
+    monkeypatch.setenv('HISTORY_FILE', str(tmp_path / "history.csv"))
+    monkeypatch.setenv('HISTORY_RECORDS', '3')
+    monkeypatch.setenv('HISTORY_BACKEND', 'csv')
+    reload_settings()
+    return type.__call__(CommandHistoryManager)
+
+def test_journal_undo_redo_deltas():
+    """Each delta is undone and redone in order; a new change drops the redo stack."""
+    store = RowStore(limit=10)
+    journal = store.journal
+    for value in ('a', 'b', 'c'):
+        journal.apply(Append(store, (value,)))
+    journal.apply(Delete(store, 0))
+    assert list(store.rows) == [('b',), ('c',)]
+
+    assert str(journal.undo()) == "delete 'a'"
+    assert list(store.rows) == [('a',), ('b',), ('c',)]
+    journal.undo()
+    assert list(store.rows) == [('a',), ('b',)]
+    journal.redo()
+    assert list(store.rows) == [('a',), ('b',), ('c',)]
+
+    journal.apply(Clear(store))
+    assert not store.rows and not journal.can_redo
+    journal.undo()
+    assert list(store.rows) == [('a',), ('b',), ('c',)]
+    assert journal.redo() is not None and journal.redo() is None
+
+def test_journal_append_restores_evicted_row():
+    """Undoing an append to a full store brings back the row it pushed out."""
+    store = RowStore(limit=2, rows=[(1,), (2,)])
+    store.journal.apply(Append(store, (3,)))
+    assert list(store.rows) == [(2,), (3,)]
+    store.journal.undo()
+    assert list(store.rows) == [(1,), (2,)]
+
+def test_journal_is_bounded():
+    """Only the latest `limit` changes can be undone."""
+    store = RowStore(limit=100, journal_limit=2)
+    for value in range(5):
+        store.journal.apply(Append(store, (value,)))
+    assert store.journal.undo() and store.journal.undo()
+    assert store.journal.undo() is None
+    assert [row[0] for row in store.rows] == [0, 1, 2]
+
+def test_history_manager_undo_redo_persists(manager, tmp_path):
+    """Adds are appended to the file, undone changes rewrite it, and a reload sees the latest tail."""
+    for command_name in ('greet', 'csv', 'menu', 'stats'):
+        manager.add_command(command_name)
+    assert manager.get_history() == ['csv', 'menu', 'stats']
+    manager.delete_record(1)
+    assert manager.get_history() == ['csv', 'stats']
+    manager.undo()
+    assert manager.get_history() == ['csv', 'menu', 'stats']
+    assert list(manager.history['Command']) == ['csv', 'menu', 'stats']
+
+    manager.clear_history()
+    assert manager.get_history() == []
+    manager.undo()
+    manager.undo()  # The 'stats' add: 'greet' comes back from eviction
+    assert manager.get_history() == ['greet', 'csv', 'menu']
+    assert list(pd.read_csv(tmp_path / "history.csv")['Command']) == ['greet', 'csv', 'menu']
+
+    manager.redo()
+    manager.add_command('a | b')
+    reloaded = type.__call__(CommandHistoryManager)
+    assert reloaded.get_history() == ['menu', 'stats', 'a | b']
@@ -0,0 +1,93 @@
+"""Tests for the per-subsystem logging facade"""
+import gzip
+import json
+import logging
+import pytest
+from app.logger import get_logger, configure_levels, JsonFormatter, RotatingLogHandler, log_segments, read_entries
+
+@pytest.fixture
+def reset_levels():
+    """Undoes per-subsystem levels so other tests see the defaults."""
+    yield
+    for name in ('app', 'app.calculator', 'app.csv'):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+class Explosive:
+    """Fails the test if it is ever formatted."""
+    def __str__(self):
+        raise AssertionError("formatted a disabled log message")
+
+def test_disabled_messages_are_not_formatted(caplog):
+    """Arguments of a filtered-out call are never converted to strings."""
+    log = get_logger('calculator')
+    with caplog.at_level(logging.WARNING):
+        log.info("Result: %s", Explosive())
+        assert not log.enabled(logging.INFO)
+    assert caplog.records == []
+
+def test_records_carry_subsystem_fields_and_caller(caplog):
+    """Records are named after the subsystem, keep structured fields and point at the caller."""
+    log = get_logger('csv')
+    assert get_logger('csv') is log
+    with caplog.at_level(logging.INFO):
+        log.info("Record %s: %s", 0, 'Oregon', rows=1)
+    record = caplog.records[0]
+    assert record.name == 'app.csv'
+    assert record.getMessage() == "Record 0: Oregon"
+    assert record.fields == {'rows': 1}
+    assert record.funcName == 'test_records_carry_subsystem_fields_and_caller'
+
+def test_configure_levels_per_subsystem(caplog, reset_levels):
+    """A subsystem can be quieter or noisier than the application level."""
+    applied = configure_levels("calculator=WARNING, csv=debug, importer=LOUD")
+    assert applied == {'calculator': logging.WARNING, 'csv': logging.DEBUG}
+    assert "Ignoring unknown log level 'LOUD' for importer" in caplog.text
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        caplog.handler.setLevel(logging.DEBUG)  # Filtering is left to the loggers
+        get_logger('calculator').info("hidden")
+        get_logger('csv').debug("shown")
+        get_logger('greet').info("inherited")
+    assert [record.getMessage() for record in caplog.records] == ["shown", "inherited"]
+
+@pytest.fixture
+def json_log(tmp_path):
+    """A size-rotated, compressed JSON log attached to the csv subsystem."""
+    path = str(tmp_path / "app.jsonl")
+    handler = RotatingLogHandler(path, max_bytes=1000, backup_count=3, compress=True)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger('app.csv')
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield path
+    logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    handler.close()
+
+def test_json_log_rotates_and_compresses(json_log):
+    """Entries are JSON lines; full segments are gzipped and old ones dropped beyond backup_count."""
+    log = get_logger('csv')
+    for index in range(100):
+        log.info("Record %s", index, row=index)
+    segments = log_segments(json_log)
+    assert len(segments) == 4
+    assert segments[0].endswith("app.jsonl.3.gz") and segments[-1] == json_log
+    with gzip.open(segments[-2], 'rt') as handle:
+        entry = json.loads(handle.readline())
+    assert entry['logger'] == 'app.csv' and entry['level'] == 'INFO'
+    assert entry['message'] == f"Record {entry['row']}"
+
+def test_read_entries_filters_across_segments(json_log):
+    """Queries stream every segment in order and apply level, subsystem and text filters."""
+    log = get_logger('csv')
+    for index in range(20):
+        log.debug("Reading chunk %s", index)
+        if index % 5 == 0:
+            log.warning("Slow chunk %s", index)
+    warnings = [entry['message'] for entry in read_entries(json_log, level='warning', subsystem='csv')]
+    assert len(log_segments(json_log)) > 1
+    assert warnings == ["Slow chunk 0", "Slow chunk 5", "Slow chunk 10", "Slow chunk 15"]
+    assert [entry['message'] for entry in read_entries(json_log, contains="chunk 19")] == ["Reading chunk 19"]
+    assert list(read_entries(json_log, subsystem='calculator')) == []
+    with pytest.raises(ValueError):
+        list(read_entries(json_log, level='LOUD'))
@@ -0,0 +1,84 @@
+"""Tests for the buffered console output sink"""
+import io
+import pytest
+from app import output as output_module
+from app.commands import Command, CommandHandler
+from app.output import OutputSink, echo, prompt, flushes
+
+class CountingStream(io.StringIO):
+    """Records how many writes reach the underlying stream."""
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+@pytest.fixture
+def stream(monkeypatch):
+    """Routes the shared sink to a counting in-memory stream."""
+    stream = CountingStream()
+    monkeypatch.setattr(output_module, '_output', OutputSink(stream, threshold=1024))
+    return stream
+
+def test_output_is_buffered_until_flush_or_threshold(stream):
+    echo("a", 1, sep='=')
+    echo("b", end='')
+    assert stream.getvalue() == ''
+    output_module.get_output().flush()
+    assert stream.getvalue() == "a=1\nb" and stream.writes == 1
+
+    echo("x" * 2000)  # Past the threshold
+    assert stream.writes == 2
+
+def test_unbuffered_sink_writes_through():
+    stream = CountingStream()
+    sink = OutputSink(stream, threshold=0)
+    sink.print("now")
+    assert stream.getvalue() == "now\n"
+
+def test_prompt_flushes_first(stream, monkeypatch):
+    """Everything written before a prompt is visible when input is read."""
+    seen = []
+    monkeypatch.setattr('builtins.input', lambda text: seen.append(stream.getvalue() + text) or 'yes')
+    echo("Question follows")
+    assert prompt("? ") == 'yes'
+    assert seen == ["Question follows\n? "]
+
+def test_flushes_only_at_the_outermost_call(stream):
+    @flushes
+    def inner():
+        echo("inner")
+        assert stream.getvalue() == ''  # Still inside outer
+
+    @flushes
+    def outer():
+        inner()
+        echo("outer")
+
+    outer()
+    assert stream.getvalue() == "inner\nouter\n" and stream.writes == 1
+
+def test_command_output_flushed_once_when_it_returns(stream):
+    """Any Command's execute is flushed on return, however many lines it printed."""
+    class Lines(Command):
+        def execute(self):
+            for index in range(100):
+                echo(f"line {index}")
+
+    handler = CommandHandler()
+    handler.register_command('lines', Lines())
+    handler.execute_command('lines')
+    assert stream.getvalue().count("line") == 100 and stream.writes == 1
+    Lines().execute()
+    assert stream.writes == 2
+
+def test_redirect_to_buffer(stream):
+    """Output can be captured in memory, e.g. for batch runs, then goes back to the stream."""
+    echo("before")
+    with output_module.get_output().redirect(io.StringIO()) as captured:
+        echo("captured")
+    echo("after", flush=True)
+    assert captured.getvalue() == "captured\n"
+    assert stream.getvalue() == "before\nafter\n"
@@ -0,0 +1,98 @@
+"""Tests for in-memory command pipelines"""
+import pandas as pd
+import pytest
+from app import App
+from app.commands import CommandHandler
+from app.pipeline import Pipeline, parse_pipeline
+from app.plugins.calculator import CalculatorCommand
+from app.plugins.csv import CsvCommand
+from app.plugins.greet import GreetCommand
+from app.plugins.importer import ImportCommand
+from app.settings import reload_settings
+
+@pytest.fixture
+def handler(tmp_path):
+    """A handler with the data commands registered under their plugin names."""
+    input_path = tmp_path / "states.csv"
+    input_path.write_text("State Name,Population,GDP\nTexas,29145505,1.9T\nOregon,4237256,0.3T\nOhio,11799448,0.7T\n")
+    handler = CommandHandler()
+    handler.register_command('calculator', CalculatorCommand())
+    handler.register_command('csv', CsvCommand(input_path=str(input_path), output_path=str(tmp_path / "out.csv"),
+                                               columns=['State Name', 'Population', 'GDP']))
+    handler.register_command('greet', GreetCommand())
+    handler.register_command('importer', ImportCommand())
+    return handler
+
+def test_parse_pipeline():
+    """Stages are split on '|' and their arguments shell-split, so filters can be quoted."""
+    assert parse_pipeline('csv "GDP > 1T" | calc mul Population 2 | save out.parquet') == [
+        ('csv', ['GDP > 1T']), ('calc', ['mul', 'Population', '2']), ('save', ['out.parquet'])]
+    with pytest.raises(ValueError):
+        parse_pipeline('csv | | head')
+
+def test_pipeline_passes_frames_between_stages(handler, tmp_path):
+    """Data flows through memory; only the save stage touches disk."""
+    output = tmp_path / "result.csv"
+    result = Pipeline(handler).run(f"csv GDP<1T | calc * Population 2 | calc + Population GDP Total | head 1 | save {output}")
+    assert not (tmp_path / "out.csv").exists()
+    assert result['State Name'].tolist() == ['Ohio']
+    assert result['Population'].tolist() == [23598896]
+    assert result['Total'].tolist() == [23598896 + 0.7e12]
+    pd.testing.assert_frame_equal(pd.read_csv(output), result.reset_index(drop=True))
+
+def test_pipeline_rejects_unknown_ambiguous_and_unsupported_stages(handler):
+    """Stage names must resolve to one command that implements run()."""
+    pipeline = Pipeline(handler)
+    with pytest.raises(ValueError, match="Unknown pipeline stage 'nope'"):
+        pipeline.run("nope")
+    handler.register_command('csv2', handler.commands['csv'])
+    with pytest.raises(ValueError, match="Ambiguous pipeline stage 'cs'"):
+        pipeline.run("cs")
+    with pytest.raises(NotImplementedError):
+        pipeline.run("greet")
+
+def test_pipeline_reports_wrong_stage_arguments(handler):
+    """Missing or extra stage arguments fail with the stage's usage before anything runs."""
+    pipeline = Pipeline(handler)
+    with pytest.raises(ValueError, match=r"usage: save <path> \[file_format\]"):
+        pipeline.run("csv | save")
+    with pytest.raises(ValueError, match=r"usage: calc <key> <column> \[operand\] \[result_column\]"):
+        pipeline.run("csv | calc")
+    with pytest.raises(ValueError, match="stage 'head'"):
+        pipeline.run("csv | head 1 2")
+
+def test_importer_stage_evaluates_frames(handler):
+    """The importer stage computes results for an operation,a,b frame from an earlier stage."""
+    frame = pd.DataFrame({'operation': ['add', '/'], 'a': [1.0, 1.0], 'b': [2.0, 0.0]})
+    result = handler.commands['importer'].run(frame)
+    assert result['result'].tolist()[0] == 3.0
+    assert result['result'].isna().tolist() == [False, True]
+
+def test_app_runs_pipelines_from_the_repl(capfd, monkeypatch):
+    """A line containing '|' is run as a pipeline and its result printed."""
+    monkeypatch.setenv('QUIET', 'true')
+    reload_settings()
+    inputs = iter(['csv "State Name==Texas" | head 1', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    App().start()
+    out = capfd.readouterr().out
+    assert "Texas" in out and "Oregon" not in out
+
+def test_app_pipeline_errors_and_ctrl_c_keep_the_repl(capfd, monkeypatch):
+    """A stage with the wrong arguments, or Ctrl-C during a pipeline, returns to the prompt."""
+    monkeypatch.setenv('QUIET', 'true')
+    reload_settings()
+    run = Pipeline.run
+
+    def interrupted(self, text):
+        if text.startswith('slow'):
+            raise KeyboardInterrupt
+        return run(self, text)
+    monkeypatch.setattr(Pipeline, 'run', interrupted)
+    inputs = iter(['csv | save', 'slow | head', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    App().start()
+    out = capfd.readouterr().out
+    assert "Pipeline failed: Wrong arguments for stage 'save'" in out
+    assert "Pipeline was cancelled." in out
+    assert out.rstrip().endswith("Exiting application.")
@@ -0,0 +1,62 @@
+"""Tests for the pre-forked worker pool"""
+import io
+import os
+import time
+import pandas as pd
+import pytest
+from app import App
+from app.prefork import PreforkPool
+from app.prefork.__main__ import main
+
+@pytest.fixture
+def warm_app():
+    app = App()
+    app.load_plugins()
+    return app
+
+def test_prefork_serves_commands_and_pipelines(warm_app):
+    """Workers answer prompts from the request and send output and results back."""
+    with PreforkPool(warm_app, workers=2) as pool:
+        greeting = pool.submit('greet')
+        calculation = pool.submit('calculator', ['+', '2', '3', 'back'])
+        frame = pool.submit_pipeline('history | head 2')
+        assert greeting.get(timeout=30)['output'] == "Hello, World!\n"
+        assert "The result is 5.0" in calculation.get(timeout=30)['output']
+        assert isinstance(frame.get(timeout=30)['result'], pd.DataFrame)
+        assert greeting.get()['pid'] != os.getpid()
+
+def test_prefork_missing_input_is_end_of_file(warm_app):
+    """A command that prompts for more than the request provides fails like it would at end of input."""
+    with PreforkPool(warm_app, workers=1) as pool:
+        with pytest.raises(EOFError):
+            pool.submit('calculator', ['+', '2']).get(timeout=30)
+
+def test_prefork_recycles_workers_from_warm_master(warm_app, monkeypatch):
+    """After max_requests a worker is replaced by a new fork that still has the plugins loaded."""
+    with PreforkPool(warm_app, workers=1, max_requests=2) as pool:
+        # Replacement workers must not discover plugins again
+        monkeypatch.setattr(App, 'load_plugins', lambda self: pytest.fail("plugins were discovered"))
+        results = [pool.submit('greet').get(timeout=30) for _ in range(5)]
+    assert all(result['output'] == "Hello, World!\n" for result in results)
+    assert len({result['pid'] for result in results}) == 3
+
+def test_prefork_server_answers_each_request_as_it_arrives(warm_app, monkeypatch):
+    """Responses stream back in order before input ends, and a failing request is answered with its error."""
+    monkeypatch.setattr('app.prefork.App', lambda: warm_app)
+    monkeypatch.setattr(warm_app, 'load_plugins', lambda: None)
+    output = io.StringIO()
+
+    def requests():
+        yield 'calculator;+;2'
+        yield 'csv | save'
+        deadline = time.monotonic() + 30
+        while output.getvalue().count("failed") < 2:  # Answered before the input ends
+            assert time.monotonic() < deadline, output.getvalue()
+            time.sleep(0.01)
+        yield 'greet'
+
+    main(requests(), output)
+    lines = output.getvalue().splitlines()
+    assert lines[0] == "Request 'calculator;+;2' failed: EOFError: No input left for 'Enter second number: '"
+    assert lines[1].startswith("Pipeline failed: Wrong arguments for stage 'save'")
+    assert lines[2] == "Hello, World!"
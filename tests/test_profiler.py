@@ -0,0 +1,65 @@
+"""Tests for per-command memory profiling"""
+import tracemalloc
+import pytest
+from app import profiler as profiler_module
+from app.commands import Command, CommandHandler
+from app.profiler import MemoryProfiler, GROWTH_RUNS, format_size
+from app.settings import reload_settings
+
+@pytest.fixture
+def profiler(monkeypatch):
+    """A fresh process-wide profiler; tracing is stopped afterwards so other tests run at full speed."""
+    monkeypatch.setattr(profiler_module, '_profiler', MemoryProfiler(top=3))
+    yield profiler_module.get_profiler()
+    tracemalloc.stop()
+
+class Hoarder(Command):
+    """Keeps a megabyte per execution, like a cache that is never trimmed."""
+    def __init__(self):
+        self.kept = []
+
+    def execute(self):
+        self.kept.append(bytearray(1 << 20))
+        _ = [bytearray(1 << 20) for _ in range(2)]  # Transient, so only in the peak
+
+def test_format_size():
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KiB"
+    assert format_size(3 << 20) == "3.0 MiB"
+
+def test_measure_reports_peak_retained_and_sites(profiler, capfd):
+    """Peak covers transient allocations, retained only what survives, with the allocating line."""
+    hoarder = Hoarder()
+    with profiler.measure('hoarder'):
+        hoarder.execute()
+    usage = profiler.usage['hoarder'][-1]
+    assert usage.retained >= 1 << 20
+    assert usage.peak >= 3 << 20
+    assert "test_profiler.py:" in usage.sites[0][0]
+    assert "[memory] hoarder: peak" in capfd.readouterr().out
+
+def test_growing_command_is_flagged(profiler, caplog):
+    """Retaining memory on every one of the last runs flags the command once."""
+    hoarder = Hoarder()
+    for _ in range(GROWTH_RUNS + 1):
+        with profiler.measure('hoarder'):
+            hoarder.execute()
+    assert profiler.flagged == {'hoarder'}
+    assert caplog.text.count("Command hoarder retained memory in each of its last") == 1
+    report = profiler.render()
+    assert "hoarder" in report and "growing" in report
+    assert "Top allocation sites of the last 'hoarder' run:" in report
+
+def test_execute_command_profiles_when_enabled(profiler, monkeypatch, capfd):
+    """Commands are only traced with MEMORY_PROFILE set."""
+    handler = CommandHandler()
+    handler.register_command('hoarder', Hoarder())
+    handler.execute_command('hoarder')
+    assert not profiler.totals
+
+    monkeypatch.setenv('MEMORY_PROFILE', 'true')
+    reload_settings()
+    handler.execute_command('hoarder')
+    handler.execute_command('missing')
+    assert list(profiler.totals) == ['hoarder']
+    assert "[memory] hoarder" in capfd.readouterr().out
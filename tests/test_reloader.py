@@ -0,0 +1,115 @@
+"""Tests for plugin hot-reload"""
+import os
+import sys
+import importlib
+import pytest
+from app import App
+from app.reloader import PluginReloader
+from app.plugins.calculator import CalculatorCommand
+from app.settings import reload_settings
+
+PING_PLUGIN = '''from app.commands import Command
+
+class PingCommand(Command):
+    def execute(self):
+        print("{reply}")
+'''
+
+DOUBLE_OPERATION = '''from app.plugins.calculator import Operation
+
+class Double(Operation):
+    symbol = 'dbl'
+    name = 'double'
+    arity = 1
+
+    def compute(self, a):
+        return a * {factor}
+'''
+
+def touch_later(path):
+    """Rewrite bumps mtime by at least a second so the bytecode cache is invalidated too."""
+    mtime = os.stat(path).st_mtime_ns + 2_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+@pytest.fixture
+def hot_package(tmp_path, monkeypatch):
+    """Creates an importable throwaway plugins package and removes it from sys.modules afterwards."""
+    package = tmp_path / "hotplugs"
+    (package / "ping").mkdir(parents=True)
+    (package / "calc").mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "ping" / "__init__.py").write_text(PING_PLUGIN.format(reply="pong"))
+    (package / "calc" / "__init__.py").write_text("")
+    (package / "calc" / "double.py").write_text(DOUBLE_OPERATION.format(factor=2))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    yield package
+    for name in [name for name in sys.modules if name.startswith('hotplugs')]:
+        del sys.modules[name]
+
+def test_reloader_swaps_changed_command(hot_package, capfd):
+    """An edited plugin package is re-imported and replaces the registered command."""
+    app = App()
+    app.register_plugin('ping', importlib.import_module('hotplugs.ping'))
+    reloader = PluginReloader(app, plugins_package='hotplugs')
+    old_command = app.command_handler.commands['ping']
+
+    assert reloader.check() == []  # Nothing changed yet
+
+    plugin_file = hot_package / "ping" / "__init__.py"
+    plugin_file.write_text(PING_PLUGIN.format(reply="pang"))
+    touch_later(plugin_file)
+    assert reloader.check() == ['ping']
+
+    assert app.command_handler.commands['ping'] is not old_command
+    app.command_handler.execute_command('ping')
+    old_command.execute()  # An in-flight reference keeps working on the old code
+    captured = capfd.readouterr()
+    assert captured.out == "pang\npong\n"
+
+def test_reloader_swaps_calculator_operations(hot_package):
+    """Changing an operation module swaps the operation table of the live calculator command."""
+    app = App()
+    calculator = CalculatorCommand(plugins_package='hotplugs.calc')
+    app.command_handler.register_command('calc', calculator)
+    reloader = PluginReloader(app, plugins_package='hotplugs')
+
+    operation_file = hot_package / "calc" / "double.py"
+    assert calculator.operations.evaluate('dbl', 2.0) == 4.0
+
+    operation_file.write_text(DOUBLE_OPERATION.format(factor=3))
+    touch_later(operation_file)
+    assert reloader.check() == ['calc']
+
+    assert app.command_handler.commands['calc'] is calculator
+    assert calculator.operations.evaluate('double', 2.0) == 6.0
+
+def test_reloader_keeps_old_version_on_broken_plugin(hot_package, caplog):
+    """A syntax error in an edited plugin is logged and the previous command stays registered."""
+    app = App()
+    app.register_plugin('ping', importlib.import_module('hotplugs.ping'))
+    reloader = PluginReloader(app, plugins_package='hotplugs')
+    old_command = app.command_handler.commands['ping']
+
+    plugin_file = hot_package / "ping" / "__init__.py"
+    plugin_file.write_text("class Broken(:\n")
+    touch_later(plugin_file)
+
+    assert reloader.check() == []
+    assert app.command_handler.commands['ping'] is old_command
+    assert "Error reloading plugin ping" in caplog.text
+
+def test_app_hot_reload_disabled_by_default(monkeypatch):
+    """The watcher thread only starts when HOT_RELOAD is enabled."""
+    monkeypatch.delenv('HOT_RELOAD', raising=False)
+    reload_settings()
+    app = App()
+    assert app.start_hot_reload() is None
+
+    monkeypatch.setenv('HOT_RELOAD', 'true')
+    monkeypatch.setenv('HOT_RELOAD_INTERVAL', '60')
+    reload_settings()
+    app = App()
+    reloader = app.start_hot_reload()
+    assert isinstance(reloader, PluginReloader)
+    reloader.stop()
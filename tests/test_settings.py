@@ -0,0 +1,66 @@
+"""Tests for the typed, cached settings"""
+import os
+import dataclasses
+import pytest
+from app import settings as settings_module
+from app.settings import Settings, get_settings, reload_settings
+
+@pytest.fixture
+def dotenv_file(tmp_path, monkeypatch):
+    """Points the settings loader at a throwaway .env file."""
+    path = tmp_path / ".env"
+    path.write_text("WORKER_COUNT=3\n")
+    monkeypatch.setattr(settings_module, '_dotenv_path', str(path))
+    monkeypatch.delenv('WORKER_COUNT', raising=False)
+    reload_settings()
+    yield path
+    os.environ.pop('WORKER_COUNT', None)  # Written by the loader, not by monkeypatch
+
+def test_settings_parse_types(monkeypatch):
+    """Values are converted to the field types and the object is immutable."""
+    settings = Settings.from_environ({'HOT_RELOAD': 'Yes', 'HISTORY_RECORDS': '10', 'HOT_RELOAD_INTERVAL': '0.5',
+                                      'DB_HOST': 'db', 'QUIET': '0'})
+    assert settings.hot_reload is True
+    assert settings.quiet is False
+    assert settings.history_records == 10
+    assert settings.hot_reload_interval == 0.5
+    assert settings.db_host == 'db'
+    assert settings.environment == 'DEVELOPMENT'
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.quiet = True
+
+def test_settings_invalid_value_uses_default(caplog):
+    """An unparseable number is logged and the default kept."""
+    settings = Settings.from_environ({'HISTORY_RECORDS': 'lots'})
+    assert settings.history_records == 50
+    assert "Ignoring invalid value for HISTORY_RECORDS" in caplog.text
+
+def test_get_settings_cached_until_reloaded(dotenv_file, monkeypatch):
+    """The same object is returned, without reading the environment, until reload_settings()."""
+    first = get_settings()
+    assert get_settings() is first
+    assert first.worker_count == 3
+
+    monkeypatch.setenv('LOG_LEVEL', 'WARNING')
+    assert get_settings() is first
+    second = reload_settings()
+    assert second is not first
+    assert get_settings() is second
+    assert second.log_level == 'WARNING'
+
+def test_get_settings_reparses_dotenv_on_mtime_change(dotenv_file, monkeypatch):
+    """Editing .env is picked up without restarting; an untouched .env is never re-read."""
+    monkeypatch.setattr(settings_module, 'DOTENV_CHECK_SECONDS', 0)  # Check on every call
+    assert get_settings().worker_count == 3
+    parsed = []
+    original = settings_module.dotenv_values
+    monkeypatch.setattr(settings_module, 'dotenv_values', lambda path: parsed.append(path) or original(path))
+
+    get_settings()
+    assert not parsed
+
+    dotenv_file.write_text("WORKER_COUNT=7\n")
+    mtime = os.stat(dotenv_file).st_mtime_ns + 1_000_000_000
+    os.utime(dotenv_file, ns=(mtime, mtime))
+    assert get_settings().worker_count == 7
+    assert parsed == [str(dotenv_file)]
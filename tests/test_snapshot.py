@@ -0,0 +1,66 @@
+"""Tests for the session snapshot"""
+import logging
+import pytest
+from app import App
+from app import snapshot as snapshot_module
+from app.commands import CommandHistoryManager, Singleton
+from app.settings import get_settings, reload_settings
+from app.snapshot import save_snapshot, load_snapshot
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    """Snapshots enabled, with the snapshot, history and singletons kept out of the real session."""
+    monkeypatch.setenv('SESSION_SNAPSHOT', 'true')
+    monkeypatch.setenv('SNAPSHOT_FILE', str(tmp_path / "session.snapshot"))
+    monkeypatch.setenv('HISTORY_FILE', str(tmp_path / "history.csv"))
+    reload_settings()
+    monkeypatch.setattr(Singleton, '_instances', {})
+    return tmp_path / "session.snapshot"
+
+def test_snapshot_round_trip(session):
+    """The state comes back as saved while sources, settings and history are unchanged."""
+    settings = get_settings()
+    save_snapshot(str(session), {'commands': ['greet', 'menu']}, settings)
+    assert load_snapshot(str(session), settings) == {'commands': ['greet', 'menu']}
+    assert load_snapshot(str(session.with_name("missing")), settings) is None
+
+def test_snapshot_stale_on_source_change(session, monkeypatch, caplog):
+    """Editing any source file makes the snapshot stale."""
+    settings = get_settings()
+    save_snapshot(str(session), {'commands': []}, settings)
+    digests = snapshot_module.source_digests()
+    digests['plugins/greet/__init__.py'] = 'edited'
+    monkeypatch.setattr(snapshot_module, 'source_digests', lambda: digests)
+    with caplog.at_level(logging.INFO):
+        assert load_snapshot(str(session), settings) is None
+    assert "sources changed" in caplog.text
+
+def test_snapshot_stale_on_history_change(session):
+    """A history file written since the snapshot (e.g. by another session) makes it stale."""
+    settings = get_settings()
+    save_snapshot(str(session), {'commands': []}, settings)
+    session.with_name("history.csv").write_text("Timestamp,Command\n2024-01-01 00:00:00,greet\n")
+    assert load_snapshot(str(session), settings) is None
+
+def test_snapshot_corrupt_falls_back(session, caplog):
+    """An unreadable snapshot is logged and ignored."""
+    session.write_bytes(b"not a snapshot")
+    assert load_snapshot(str(session), get_settings()) is None
+    assert "Ignoring unreadable session snapshot" in caplog.text
+
+def test_app_restores_session_without_discovery(session, monkeypatch, capfd):
+    """A second start restores commands and history from the snapshot instead of loading plugins."""
+    inputs = iter(['5', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    App().start()
+    assert session.exists()
+    capfd.readouterr()
+
+    monkeypatch.setattr(Singleton, '_instances', {})
+    monkeypatch.setattr(App, 'load_plugins', lambda self: pytest.fail("plugins were discovered"))
+    inputs = iter(['exit'])
+    app = App()
+    app.start()
+    assert app.command_handler.get_command_by_index(4) == 'greet'
+    assert 'greet' in CommandHistoryManager().get_history()
+    assert "5. greet" in capfd.readouterr().out
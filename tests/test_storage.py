@@ -0,0 +1,75 @@
+"""Tests for format-aware DataFrame storage"""
+import gzip
+import pandas as pd
+import pytest
+from app import storage
+from app.plugins.csv import CsvCommand
+
+@pytest.fixture
+def frame():
+    """A small frame with mixed column types."""
+    return pd.DataFrame({'State Name': ['Oregon', 'Texas'], 'Population': [4237256, 29145505], 'GDP': [0.3e12, 1.9e12]})
+
+@pytest.mark.parametrize("path, expected", [
+    ('out.csv', 'csv'),
+    ('out.CSV.GZ', 'csv.gz'),
+    ('data/out.csv.zst', 'csv.zst'),
+    ('out.parquet', 'parquet'),
+    ('out.feather', 'feather'),
+    ('out.txt', 'csv'),
+])
+def test_detect_format(path, expected):
+    """The format follows the file extension, defaulting to CSV."""
+    assert storage.detect_format(path) == expected
+
+def test_gzip_round_trip(tmp_path, frame):
+    """Compressed CSV is written compressed and read back transparently."""
+    path = storage.write_frame(frame, str(tmp_path / "out.csv.gz"))
+    assert path.endswith("out.csv.gz")
+    with gzip.open(path, 'rt') as handle:
+        assert handle.readline().strip() == "State Name,Population,GDP"
+    pd.testing.assert_frame_equal(storage.read_frame(path), frame)
+    assert list(storage.read_frame(path, columns=['GDP']).columns) == ['GDP']
+
+def test_columnar_format_falls_back_without_pyarrow(tmp_path, frame, monkeypatch, caplog):
+    """Asking for Parquet without pyarrow writes compressed CSV under a matching name."""
+    monkeypatch.setattr(storage, 'PYARROW_AVAILABLE', False)
+    monkeypatch.setattr(storage, 'ZSTD_AVAILABLE', False)
+    path = storage.write_frame(frame, str(tmp_path / "out.parquet"))
+    assert path == str(tmp_path / "out.csv.gz")
+    assert "pyarrow is not installed" in caplog.text
+    pd.testing.assert_frame_equal(storage.read_frame(path), frame)
+
+@pytest.mark.parametrize("file_format", ['parquet', 'feather'])
+def test_columnar_round_trip(tmp_path, frame, file_format):
+    """With pyarrow installed the columnar formats round-trip with projection."""
+    pytest.importorskip('pyarrow')
+    path = storage.write_frame(frame, str(tmp_path / "out.csv"), file_format)
+    assert path == str(tmp_path / f"out.{file_format}")
+    pd.testing.assert_frame_equal(storage.read_frame(path, columns=['Population']), frame[['Population']])
+
+def test_csv_command_compressed_input_and_output(tmp_path, frame, capfd):
+    """CsvCommand reads and writes compressed CSV and prints from memory."""
+    input_path = storage.write_frame(frame.assign(GDP=['0.3T', '1.9T']), str(tmp_path / "in.csv.gz"))
+    csv_command = CsvCommand(input_path=input_path, output_path=str(tmp_path / "out.csv"),
+                             columns=['State Name', 'GDP'], sort_by='GDP', ascending=False,
+                             output_format='csv.gz')
+    csv_command.execute()
+
+    assert csv_command.output_path == str(tmp_path / "out.csv.gz")
+    written = storage.read_frame(csv_command.output_path)
+    assert written['State Name'].tolist() == ['Texas', 'Oregon']
+    assert "Record 0: Texas: 1900000000000.0" in capfd.readouterr().out
+
+def test_atomic_write_replaces_only_on_success(tmp_path):
+    """A failed write leaves the previous file and no temporary file behind."""
+    path = tmp_path / "state.json"
+    with storage.atomic_write(str(path)) as file:
+        file.write("new")
+    assert path.read_text() == "new"
+    with pytest.raises(RuntimeError):
+        with storage.atomic_write(str(path)) as file:
+            file.write("partial")
+            raise RuntimeError()
+    assert path.read_text() == "new"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["state.json"]